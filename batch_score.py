@@ -0,0 +1,203 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.csv_loader import INPUT_FORMATS, chunk_to_records, input_format, iter_record_chunks
+from utils.entity_tagger import get_default_tagger, tag_records
+from utils.sentiment_analysis import analyze_sentiment
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_CHUNK_SIZE = 10_000 # Rows per work unit: scored by one worker, written to one part file, checkpointed once
+OUTPUT_FORMATS = ("parquet", "csv")
+MANIFEST_FILE = "_manifest.json" # Checkpoint in the output directory: input identity and finished chunks
+MAX_PENDING_PER_WORKER = 2 # Chunks queued per worker, so reading stays just ahead of scoring
+
+def _input_signature(input_path):
+    stat = os.stat(input_path)
+    return {"path": os.path.abspath(input_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def load_manifest(output_dir):
+    """
+    Returns the checkpoint manifest of an output directory, or None if there is none.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_manifest(output_dir, manifest):
+    # Written under a temporary name and moved into place, so an interruption never leaves half a manifest
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+def _score_chunk(records):
+    # Runs in a worker process: the tagger and the model are loaded there once, on the first chunk
+    scored = analyze_sentiment(tag_records(records, get_default_tagger()))
+    if records and not scored:
+        raise RuntimeError("Sentiment analysis returned no results (see the worker log).")
+    return scored
+
+def _write_part(records, path, output_format):
+    frame = pd.DataFrame(records, columns=['source', 'title', 'text', 'date', 'sentiment', 'score', 'entities'])
+    if output_format == "csv":
+        frame['entities'] = frame['entities'].map(lambda value: ';'.join(value) if isinstance(value, list) else '')
+        frame.to_csv(f"{path}.tmp", index=False, encoding='utf-8')
+    else:
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), f"{path}.tmp", compression='zstd')
+    os.replace(f"{path}.tmp", path)
+
+def _format_seconds(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m{seconds % 60:02d}s" if seconds >= 3600 else f"{seconds // 60}m{seconds % 60:02d}s"
+
+def score_file(input_path, output_dir, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, output_format="parquet",
+               file_format=None, restart=False):
+    """
+    Scores a file of records into a directory of part files, resuming an interrupted run.
+
+    The input is read in chunks of chunk_size rows. Each chunk is tagged and scored by one of
+    `workers` processes and written to its own part file (part-NNNNNN.parquet or .csv). The
+    manifest in the output directory records every finished chunk, so running the same command
+    again after an interruption skips those chunks and scores only the rest. The parts together
+    are the output: pandas.read_parquet(output_dir) reads a Parquet output as one frame.
+
+    Args:
+        input_path (str): CSV, JSON Lines or Parquet file with 'source', 'text' and 'date' ('title' optional).
+        output_dir (str): Directory for the part files and the manifest.
+        chunk_size (int): Rows per chunk. A resumed run must use the same value.
+        workers (int): Scoring processes. 1 scores in this process.
+        output_format (str): 'parquet' or 'csv'.
+        file_format (str, optional): One of INPUT_FORMATS. Inferred from the file name if not given.
+        restart (bool): Discard the parts and manifest of a previous run and start over.
+
+    Returns:
+        dict: Run statistics: 'rows', 'invalid', 'scored', 'chunks_scored', 'chunks_skipped', 'elapsed'.
+
+    Raises:
+        ValueError: If the output directory holds a run of a different input or configuration
+                    (and restart is not set), or an option is invalid.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}'. Choose one of {OUTPUT_FORMATS}.")
+    file_format = file_format or input_format(input_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    run_config = {"input": _input_signature(input_path), "input_format": file_format,
+                  "chunk_size": chunk_size, "output_format": output_format}
+    manifest = load_manifest(output_dir)
+    if manifest is not None and restart:
+        for file_name in os.listdir(output_dir):
+            if file_name.startswith("part-"):
+                os.remove(os.path.join(output_dir, file_name))
+        manifest = None
+    if manifest is not None and manifest["config"] != run_config:
+        raise ValueError(f"{output_dir} holds a run with a different input or configuration ({manifest['config']}). "
+                         f"Use --restart to discard it, or another output directory.")
+    if manifest is None:
+        manifest = {"config": run_config, "chunks": {}, "complete": False}
+        _write_manifest(output_dir, manifest)
+    finished_chunks = manifest["chunks"]
+    if finished_chunks:
+        logging.info(f"Resuming: {len(finished_chunks)} chunks ({sum(c['scored'] for c in finished_chunks.values())} records) "
+                     f"already scored in {output_dir}.")
+
+    total_rows = pq.ParquetFile(input_path).metadata.num_rows if file_format == "parquet" else None
+    read_stats = {}
+    stats = {"scored": 0, "chunks_scored": 0, "chunks_skipped": 0}
+    extension = "parquet" if output_format == "parquet" else "csv"
+    start_time = time.monotonic()
+    # Rows read per chunk, to report progress over the whole file (skipped chunks count as done)
+    chunk_rows = {}
+
+    def _finish(chunk_index, scored):
+        part_name = f"part-{chunk_index:06d}.{extension}"
+        _write_part(scored, os.path.join(output_dir, part_name), output_format)
+        finished_chunks[str(chunk_index)] = {"file": part_name, "scored": len(scored)}
+        _write_manifest(output_dir, manifest)
+        stats["scored"] += len(scored)
+        stats["chunks_scored"] += 1
+        elapsed = time.monotonic() - start_time
+        rate = stats["scored"] / elapsed if elapsed > 0 else 0.0
+        progress = f"{read_stats.get('rows', 0)} rows read"
+        if total_rows:
+            rows_done = sum(chunk_rows[int(index)] for index in finished_chunks if int(index) in chunk_rows)
+            remaining = max(total_rows - rows_done, 0)
+            eta = f", ETA {_format_seconds(remaining / rate)}" if rate > 0 else ""
+            progress = f"{rows_done}/{total_rows} rows ({rows_done / total_rows:.1%}){eta}"
+        logging.info(f"Chunk {chunk_index} done: {progress}, {stats['scored']} scored this run at {rate:.0f} rows/s.")
+
+    executor = None
+    if workers > 1:
+        # Spawned (not forked) workers: the model and its thread pools are never copied mid-state
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    pending = {}
+    try:
+        rows_before = 0
+        for chunk_index, chunk in enumerate(iter_record_chunks(input_path, chunk_size, stats=read_stats, file_format=file_format)):
+            chunk_rows[chunk_index] = read_stats["rows"] - rows_before
+            rows_before = read_stats["rows"]
+            if str(chunk_index) in finished_chunks:
+                stats["chunks_skipped"] += 1
+                continue
+            records = chunk_to_records(chunk)
+            del chunk
+            if executor is None:
+                _finish(chunk_index, _score_chunk(records))
+                continue
+            pending[executor.submit(_score_chunk, records)] = chunk_index
+            while len(pending) >= workers * MAX_PENDING_PER_WORKER:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _finish(pending.pop(future), future.result())
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _finish(pending.pop(future), future.result())
+    except KeyboardInterrupt:
+        logging.warning(f"Interrupted. {len(finished_chunks)} chunks are checkpointed in {output_dir}; run the same command to resume.")
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    manifest["complete"] = True
+    manifest["rows"] = read_stats.get("rows", 0)
+    manifest["invalid"] = read_stats.get("invalid", 0)
+    _write_manifest(output_dir, manifest)
+    stats.update(rows=read_stats.get("rows", 0), invalid=read_stats.get("invalid", 0),
+                 elapsed=round(time.monotonic() - start_time, 1))
+    logging.info(f"Batch scoring done: {stats['rows']} rows read ({stats['invalid']} invalid), {stats['scored']} scored in "
+                 f"{stats['chunks_scored']} chunks ({stats['chunks_skipped']} already done) in {stats['elapsed']}s.")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV, JSON Lines or Parquet file of records without the dashboard.")
+    parser.add_argument("input", help="Input file with 'source', 'text' and 'date' columns ('title' optional).")
+    parser.add_argument("output", help="Output directory for the scored part files and the checkpoint manifest.")
+    parser.add_argument("--input-format", default=None, choices=INPUT_FORMATS,
+                        help="Input format (inferred from the file name if not given).")
+    parser.add_argument("--format", default="parquet", choices=OUTPUT_FORMATS, help="Output format of the part files.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows per chunk; each chunk is scored, written and checkpointed as one unit.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Scoring processes (each loads its own copy of the model).")
+    parser.add_argument("--restart", action="store_true", help="Discard a previous run in the output directory and start over.")
+    args = parser.parse_args()
+
+    try:
+        score_file(args.input, args.output, chunk_size=args.chunk_size, workers=args.workers,
+                   output_format=args.format, file_format=args.input_format, restart=args.restart)
+    except KeyboardInterrupt:
+        raise SystemExit(130)
@@ -0,0 +1,274 @@
+import argparse
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main_app.py")
+DEFAULT_SIZES = (10_000, 100_000) # Records in the synthetic store, one benchmark per size
+DEFAULT_REPEATS = 5 # Times the interaction sequence is replayed per size, each in a new session
+DEFAULT_DAYS = 365 # Dates of the synthetic records are spread over this many days back from today
+SETUP_CHUNK_SIZE = 50_000 # Records generated, tagged, scored and stored at a time while building a store
+APP_TIMEOUT = 300 # Seconds one script run may take before AppTest gives up
+# Values the interactions cycle through, so replays are not all answered from the caches
+DATE_SPANS = (30, 90, 180, 365)
+KEYWORDS = ("road", "budget", "develop*", "highway OR street", "\"under review\"")
+
+def install_stub_model():
+    """
+    Replaces the sentiment model with a deterministic stub, so the benchmark measures the dashboard
+    rather than inference (and needs neither the model download nor transformers). A text is
+    labelled by the phrases the synthetic data is built from (see generate_test_data) and scored
+    from a hash of it.
+    """
+    from generate_test_data import NEGATIVE_PHRASES, POSITIVE_PHRASES
+
+    def classify(texts, **kwargs):
+        results = []
+        for text in texts:
+            label = ('POS' if any(phrase in text for phrase in POSITIVE_PHRASES) else
+                     'NEG' if any(phrase in text for phrase in NEGATIVE_PHRASES) else 'NEU')
+            results.append({'label': label, 'score': 0.5 + (zlib.crc32(text.encode('utf-8')) % 5000) / 10000})
+        return results
+
+    def pipeline(task, model=None, **kwargs):
+        return classify
+
+    if importlib.util.find_spec('transformers') is None:
+        stub_module = types.ModuleType('transformers')
+        stub_module.pipeline = pipeline
+        sys.modules['transformers'] = stub_module
+    from utils import sentiment_analysis
+    sentiment_analysis.sentiment_pipeline = classify
+
+def build_dataset(work_dir, rows, backend="sqlite", days=DEFAULT_DAYS, seed=42):
+    """
+    Writes a store of synthetic scored records where the dashboard looks for the ingestion store,
+    relative to work_dir. Records are generated as by generate_test_data, then tagged and scored
+    (by the stub model) and stored the way the ingestion daemon stores them.
+
+    Returns:
+        int: The number of records stored (exact duplicates are dropped by the store).
+    """
+    os.chdir(work_dir)
+    install_stub_model()
+    from generate_test_data import _build_text_pools, generate_sentiment_frame
+    from utils import record_store, sql_store
+    from utils.csv_loader import chunk_to_records
+    from utils.entity_tagger import get_default_tagger, tag_records
+    from utils.sentiment_analysis import analyze_sentiment
+
+    logging.getLogger().setLevel(logging.WARNING) # Per-batch scoring logs would drown the progress
+    rng = np.random.default_rng(seed)
+    text_pools = _build_text_pools(seed)
+    tagger = get_default_tagger()
+    stored = generated = 0
+    while generated < rows:
+        frame = generate_sentiment_frame(min(SETUP_CHUNK_SIZE, rows - generated), rng, text_pools,
+                                         days=days, recency_scale=max(days / 3, 1.0))
+        generated += len(frame)
+        records = analyze_sentiment(tag_records(chunk_to_records(frame), tagger))
+        if backend == "sqlite":
+            stored += sql_store.append_records(records, db_path=sql_store.DEFAULT_SQL_STORE_PATH)
+        else:
+            stored += record_store.append_records(records, store_path=record_store.DEFAULT_STORE_PATH)
+    return stored
+
+def _peak_rss_mb():
+    """Returns the process's lifetime peak RSS in MB, or None where it is not available (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _reset_peak_rss():
+    """Resets the kernel's peak RSS of the process (Linux); returns False where that is not possible."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def _status_peak_rss_mb():
+    # VmHWM: peak RSS since the process started or since _reset_peak_rss
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+class MemoryProbe:
+    """
+    Measures the peak memory of one interaction at a time. On Linux the kernel's peak RSS is reset
+    before each interaction, which costs nothing; elsewhere Python's traced allocations are used
+    (tracemalloc slows allocation-heavy code, so latencies read a little higher there).
+    """
+
+    def __init__(self):
+        self.uses_rss = _reset_peak_rss()
+        self.metric = "peak RSS" if self.uses_rss else "peak traced allocations"
+        if not self.uses_rss and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def start(self):
+        if self.uses_rss:
+            _reset_peak_rss()
+        else:
+            tracemalloc.reset_peak()
+
+    def peak_mb(self):
+        """Returns the peak (MB) since start."""
+        if self.uses_rss:
+            return _status_peak_rss_mb()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+
+# The scripted interaction sequence: (name, action). An action takes the session (None for the
+# first) and the replay number, performs one user interaction and returns the session.
+def _initial_load(at, replay):
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT).run()
+
+def _change_date_range(at, replay):
+    today = date.today()
+    return at.sidebar.date_input(key="date_input_range").set_value(
+        (today - timedelta(days=DATE_SPANS[replay % len(DATE_SPANS)]), today)).run()
+
+def _type_keyword(at, replay):
+    return at.sidebar.text_input(key="keyword_input").set_value(KEYWORDS[replay % len(KEYWORDS)]).run()
+
+def _toggle_sentiments(at, replay):
+    return at.sidebar.multiselect(key="sentiment_multiselect").unselect("Neutral").run()
+
+def _show_raw_table(at, replay):
+    return at.checkbox(key="show_raw_data_checkbox").check().run()
+
+INTERACTIONS = [
+    ("initial_load", _initial_load),
+    ("change_date_range", _change_date_range),
+    ("type_keyword", _type_keyword),
+    ("toggle_sentiments", _toggle_sentiments),
+    ("show_raw_table", _show_raw_table),
+]
+
+def run_interactions(work_dir, repeats=DEFAULT_REPEATS, cold=False):
+    """
+    Replays INTERACTIONS `repeats` times against the dashboard, headless, and times each one.
+
+    Every replay is a new session, as a new visitor would be; the process-wide caches are kept
+    between them unless `cold` is set. Run it in a fresh process, so the baseline is not inflated.
+
+    Returns:
+        dict: 'baseline_rss_mb' (peak RSS before the first run, None if unavailable), 'memory_metric'
+              (see MemoryProbe) and 'interactions': name -> {'latencies_ms', 'peak_memory_mb'
+              (highest peak measured during one run of the interaction), 'errors'}.
+    """
+    os.chdir(work_dir)
+    install_stub_model()
+    import streamlit as st
+    logging.getLogger().setLevel(logging.WARNING) # The app logs every filter and query at INFO
+    results = {name: {'latencies_ms': [], 'peak_memory_mb': 0.0, 'errors': 0} for name, _ in INTERACTIONS}
+    baseline_rss = _peak_rss_mb()
+    memory_probe = MemoryProbe()
+    for replay in range(repeats):
+        if cold:
+            st.cache_data.clear()
+            st.cache_resource.clear()
+        at = None
+        for name, action in INTERACTIONS:
+            memory_probe.start()
+            started = time.perf_counter()
+            at = action(at, replay)
+            elapsed = (time.perf_counter() - started) * 1000
+            result = results[name]
+            result['latencies_ms'].append(round(elapsed, 1))
+            result['peak_memory_mb'] = round(max(result['peak_memory_mb'], memory_probe.peak_mb()), 1)
+            if at.exception:
+                result['errors'] += 1
+                logging.error(f"{name} (replay {replay}) raised: {at.exception[0].value}")
+    return {'baseline_rss_mb': round(baseline_rss, 1) if baseline_rss is not None else None,
+            'memory_metric': memory_probe.metric, 'interactions': results}
+
+def benchmark_size(rows, backend="sqlite", repeats=DEFAULT_REPEATS, days=DEFAULT_DAYS, cold=False, work_dir=None):
+    """
+    Builds a synthetic store of `rows` records and measures the dashboard's interactions on it.
+    The store is built and the interactions are replayed in two separate fresh processes, so the
+    memory figures are not inflated by the setup or by an earlier size.
+
+    Returns:
+        dict: 'rows', 'stored', 'backend', 'setup_s' plus the result of run_interactions.
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix=f"dashboard_bench_{rows}_")
+    spawn = multiprocessing.get_context("spawn")
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+        stored = executor.submit(build_dataset, work_dir, rows, backend, days).result()
+    setup_seconds = round(time.monotonic() - started, 1)
+    logging.info(f"Built a {backend} store of {stored} records in {work_dir} in {setup_seconds}s.")
+    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+        measured = executor.submit(run_interactions, work_dir, repeats, cold).result()
+    return {'rows': rows, 'stored': stored, 'backend': backend, 'setup_s': setup_seconds, 'work_dir': work_dir, **measured}
+
+def summarize(result):
+    """
+    Returns per-interaction statistics of a benchmark_size result: p50/p95/max latency in
+    milliseconds and the interaction's peak memory in MB (see MemoryProbe).
+    """
+    rows = []
+    for name, measured in result['interactions'].items():
+        p50, p95 = np.percentile(measured['latencies_ms'], [50, 95])
+        rows.append({'interaction': name, 'p50_ms': round(float(p50), 1), 'p95_ms': round(float(p95), 1),
+                     'max_ms': max(measured['latencies_ms']), 'peak_memory_mb': measured['peak_memory_mb'],
+                     'errors': measured['errors']})
+    return rows
+
+def print_report(result):
+    baseline = f"{result['baseline_rss_mb']:.0f} MB" if result['baseline_rss_mb'] is not None else "n/a"
+    print(f"\n{result['stored']:,} records ({result['backend']}), {len(next(iter(result['interactions'].values()))['latencies_ms'])} "
+          f"replays, baseline RSS {baseline}; memory per interaction is its {result['memory_metric']}")
+    print(f"{'interaction':<20}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'peak MB':>10}{'errors':>8}")
+    for row in summarize(result):
+        print(f"{row['interaction']:<20}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['max_ms']:>10.1f}"
+              f"{row['peak_memory_mb']:>10.1f}{row['errors']:>8}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure end-to-end dashboard interaction latency and memory, headless, "
+                                                 "on synthetic stores of several sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Records in the synthetic store, one run per size.")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Replays of the interaction sequence per size.")
+    parser.add_argument("--backend", default="sqlite", choices=("sqlite", "parquet"), help="Store the dashboard reads from.")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Spread record dates over this many days back from today.")
+    parser.add_argument("--cold", action="store_true", help="Clear the dashboard's caches before every replay.")
+    parser.add_argument("--json", metavar="FILE", help="Also write the raw latencies and summaries to this JSON file.")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the synthetic stores instead of deleting them.")
+    args = parser.parse_args()
+
+    all_results = []
+    for size in args.sizes:
+        size_result = benchmark_size(size, backend=args.backend, repeats=args.repeats, days=args.days, cold=args.cold)
+        if not args.keep_data:
+            shutil.rmtree(size_result['work_dir'], ignore_errors=True)
+        size_result['summary'] = summarize(size_result)
+        print_report(size_result)
+        all_results.append(size_result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(all_results, f, indent=1)
+        print(f"\nWrote {args.json}")
@@ -1,6 +1,124 @@
 import pandas as pd
+import numpy as np
 from datetime import date, timedelta
+import argparse
 import random
+import time
+
+SOURCES = ["RSS", "Twitter", "Facebook", "Instagram", "TikTok"]
+
+# Common keywords and sentiment indicators
+POSITIVE_PHRASES = [
+    "fantastic progress", "great initiative", "improving lives", "commendable effort",
+    "visionary leadership", "huge success", "transformative impact", "excellent work"
+]
+NEGATIVE_PHRASES = [
+    "serious concerns", "disappointing outcome", "needs urgent attention", "facing challenges",
+    "insufficient progress", "poor implementation", "frustrating delays", "unacceptable conditions"
+]
+NEUTRAL_PHRASES = [
+    "under review", "ongoing discussions", "updates provided", "current status",
+    "awaiting further details", "being monitored", "analysis in progress", "reports indicate"
+]
+
+# Combine phrases with keywords for realistic text generation (five templates per sentiment)
+TEMPLATES = [
+    # Positive
+    "Governor Umo Eno announced {positive_phrase} in {keyword_type} projects.",
+    "The recent {keyword_type} {positive_phrase} shows significant {keyword_dev} under Governor Eno.",
+    "Excited to see the state continue to {keyword_build} and achieve {positive_phrase} in {keyword_dev}.",
+    "The new {keyword_type} {positive_phrase} reflects careful {keyword_budget} planning.",
+    "Our state is experiencing {positive_phrase} on the {keyword_road} network.",
+    # Negative
+    "Residents express {negative_phrase} regarding {keyword_type} maintenance. Needs urgent {keyword_dev}.",
+    "Concerns raised about {negative_phrase} in {keyword_dev} due to current {keyword_budget} limitations.",
+    "The pace to {keyword_build} new {keyword_type} is {negative_phrase}.",
+    "Questions arise over the allocation of {keyword_budget} with {negative_phrase} results.",
+    "The {keyword_road} infrastructure is facing {negative_phrase}.",
+    # Neutral
+    "Discussions on the next phase of {keyword_dev} projects are {neutral_phrase}.",
+    "The {keyword_budget} review for {keyword_type} infrastructure is {neutral_phrase}.",
+    "Updates on the state's plan to {keyword_build} are {neutral_phrase}.",
+    "Report on {keyword_type} network {keyword_dev} indicates {neutral_phrase}.",
+    "Status of the {keyword_road} construction remains {neutral_phrase}."
+]
+
+KEYWORDS = {
+    "build": ["build", "construct", "erect"],
+    "road": ["road", "highway", "avenue", "street"],
+    "development": ["development", "progress", "growth", "advancement"],
+    "budget": ["budget", "funds", "allocation", "spending"]
+}
+
+# Assign specific sentiment to phrases for better control
+SENTIMENT_PHRASES = {
+    "Positive": POSITIVE_PHRASES,
+    "Negative": NEGATIVE_PHRASES,
+    "Neutral": NEUTRAL_PHRASES
+}
+
+TITLE_PREFIX = {
+    "RSS": "News Update:",
+    "Twitter": "Tweet by @AkwaIbom",
+    "Facebook": "Facebook Post:",
+    "Instagram": "IG Update:",
+    "TikTok": "Trending Clip:"
+}
+
+# Local government areas of Akwa Ibom, appended to generated texts to vary them
+LOCATIONS = [
+    "Abak", "Eastern Obolo", "Eket", "Esit Eket", "Essien Udim", "Etim Ekpo", "Etinan", "Ibeno",
+    "Ibesikpo Asutan", "Ibiono-Ibom", "Ika", "Ikono", "Ikot Abasi", "Ikot Ekpene", "Ini", "Itu",
+    "Mbo", "Mkpat-Enin", "Nsit-Atai", "Nsit-Ibom", "Nsit-Ubium", "Obot Akara", "Okobo", "Onna",
+    "Oron", "Oruk Anam", "Udung-Uko", "Ukanafun", "Uruan", "Urue-Offong/Oruko", "Uyo"
+]
+
+# --- Skew used by the large-scale generator ---
+SOURCE_WEIGHTS = {"Twitter": 0.45, "RSS": 0.2, "Facebook": 0.2, "Instagram": 0.1, "TikTok": 0.05}
+SENTIMENT_WEIGHTS = {"Neutral": 0.45, "Positive": 0.3, "Negative": 0.25}
+TEXT_POOL_SIZE = 5000 # Texts rendered per sentiment before vectorized sampling
+DEFAULT_CHUNK_SIZE = 100_000
+
+def _render_text(rng, sentiment_type, template_choices=TEMPLATES):
+    """
+    Renders one text for a sentiment by filling a template with phrases and keywords.
+
+    Args:
+        rng (random.Random): The random generator to draw from.
+        sentiment_type (str): 'Positive', 'Negative' or 'Neutral'.
+        template_choices (list): Templates to choose from.
+
+    Returns:
+        str: The rendered text.
+    """
+    phrase = rng.choice(SENTIMENT_PHRASES[sentiment_type])
+
+    keyword_types = list(KEYWORDS.keys())
+    keyword_type_chosen_1 = rng.choice(keyword_types)
+    keyword_chosen_1 = rng.choice(KEYWORDS[keyword_type_chosen_1])
+
+    # Ensure a second keyword is different from the first, if possible
+    available_second_keywords = [k for k in keyword_types if k != keyword_type_chosen_1]
+    keyword_type_chosen_2 = rng.choice(available_second_keywords) if available_second_keywords else keyword_type_chosen_1
+    keyword_chosen_2 = rng.choice(KEYWORDS[keyword_type_chosen_2])
+
+    text_template = rng.choice(template_choices)
+
+    # Replace placeholders with chosen words
+    text = text_template.replace("{positive_phrase}", phrase)\
+                        .replace("{negative_phrase}", phrase)\
+                        .replace("{neutral_phrase}", phrase)\
+                        .replace("{keyword_type}", keyword_chosen_1)\
+                        .replace("{keyword_dev}", keyword_chosen_2)\
+                        .replace("{keyword_build}", rng.choice(KEYWORDS["build"])) \
+                        .replace("{keyword_road}", rng.choice(KEYWORDS["road"])) \
+                        .replace("{keyword_budget}", rng.choice(KEYWORDS["budget"]))
+
+    # Ensure "Umo Eno" or "Governor Eno" is present in roughly half the articles
+    if rng.random() < 0.6:
+        gov_name = "Governor Umo Eno" if rng.random() < 0.5 else "Governor Eno"
+        text = f"{gov_name} {text[0].lower()}{text[1:]}" if text.startswith(text[0].upper()) else f"{gov_name}'s administration {text}"
+    return text
 
 def generate_random_sentiment_data(num_records=10):
     """
@@ -14,100 +132,15 @@ def generate_random_sentiment_data(num_records=10):
         list: A list of dictionaries, each representing an article/post.
     """
     data = []
-    sources = ["RSS", "Twitter", "Facebook", "Instagram", "TikTok"]
-    
-    # Common keywords and sentiment indicators
-    positive_phrases = [
-        "fantastic progress", "great initiative", "improving lives", "commendable effort",
-        "visionary leadership", "huge success", "transformative impact", "excellent work"
-    ]
-    negative_phrases = [
-        "serious concerns", "disappointing outcome", "needs urgent attention", "facing challenges",
-        "insufficient progress", "poor implementation", "frustrating delays", "unacceptable conditions"
-    ]
-    neutral_phrases = [
-        "under review", "ongoing discussions", "updates provided", "current status",
-        "awaiting further details", "being monitored", "analysis in progress", "reports indicate"
-    ]
-
-    # Combine phrases with keywords for realistic text generation
-    templates = [
-        # Positive
-        "Governor Umo Eno announced {positive_phrase} in {keyword_type} projects.",
-        "The recent {keyword_type} {positive_phrase} shows significant {keyword_dev} under Governor Eno.",
-        "Excited to see the state continue to {keyword_build} and achieve {positive_phrase} in {keyword_dev}.",
-        "The new {keyword_type} {positive_phrase} reflects careful {keyword_budget} planning.",
-        "Our state is experiencing {positive_phrase} on the {keyword_road} network.",
-        # Negative
-        "Residents express {negative_phrase} regarding {keyword_type} maintenance. Needs urgent {keyword_dev}.",
-        "Concerns raised about {negative_phrase} in {keyword_dev} due to current {keyword_budget} limitations.",
-        "The pace to {keyword_build} new {keyword_type} is {negative_phrase}.",
-        "Questions arise over the allocation of {keyword_budget} with {negative_phrase} results.",
-        "The {keyword_road} infrastructure is facing {negative_phrase}.",
-        # Neutral
-        "Discussions on the next phase of {keyword_dev} projects are {neutral_phrase}.",
-        "The {keyword_budget} review for {keyword_type} infrastructure is {neutral_phrase}.",
-        "Updates on the state's plan to {keyword_build} are {neutral_phrase}.",
-        "Report on {keyword_type} network {keyword_dev} indicates {neutral_phrase}.",
-        "Status of the {keyword_road} construction remains {neutral_phrase}."
-    ]
-
-    keywords = {
-        "build": ["build", "construct", "erect"],
-        "road": ["road", "highway", "avenue", "street"],
-        "development": ["development", "progress", "growth", "advancement"],
-        "budget": ["budget", "funds", "allocation", "spending"]
-    }
-
-    # Assign specific sentiment to phrases for better control
-    sentiment_phrases = {
-        "Positive": positive_phrases,
-        "Negative": negative_phrases,
-        "Neutral": neutral_phrases
-    }
 
     # Ensure a mix of sentiments and keywords
     for i in range(num_records):
-        source = random.choice(sources)
+        source = random.choice(SOURCES)
         current_date = date.today() - timedelta(days=random.randint(0, 15)) # Data from today to 15 days ago
 
-        sentiment_type = random.choice(list(sentiment_phrases.keys()))
-        phrase = random.choice(sentiment_phrases[sentiment_type])
-        
-        keyword_types = list(keywords.keys())
-        keyword_type_chosen_1 = random.choice(keyword_types)
-        keyword_chosen_1 = random.choice(keywords[keyword_type_chosen_1])
-
-        # Ensure a second keyword is different from the first, if possible
-        available_second_keywords = [k for k in keyword_types if k != keyword_type_chosen_1]
-        keyword_type_chosen_2 = random.choice(available_second_keywords) if available_second_keywords else keyword_type_chosen_1
-        keyword_chosen_2 = random.choice(keywords[keyword_type_chosen_2])
-
-        text_template = random.choice(templates)
-        
-        # Replace placeholders with chosen words
-        text = text_template.replace("{positive_phrase}", phrase)\
-                            .replace("{negative_phrase}", phrase)\
-                            .replace("{neutral_phrase}", phrase)\
-                            .replace("{keyword_type}", keyword_chosen_1)\
-                            .replace("{keyword_dev}", keyword_chosen_2)\
-                            .replace("{keyword_build}", random.choice(keywords["build"])) \
-                            .replace("{keyword_road}", random.choice(keywords["road"])) \
-                            .replace("{keyword_budget}", random.choice(keywords["budget"]))
-
-        # Ensure "Umo Eno" or "Governor Eno" is present in roughly half the articles
-        if random.random() < 0.6:
-            gov_name = "Governor Umo Eno" if random.random() < 0.5 else "Governor Eno"
-            text = f"{gov_name} {text[0].lower()}{text[1:]}" if text.startswith(text[0].upper()) else f"{gov_name}'s administration {text}"
-
-        title_prefix = {
-            "RSS": "News Update:",
-            "Twitter": "Tweet by @AkwaIbom",
-            "Facebook": "Facebook Post:",
-            "Instagram": "IG Update:",
-            "TikTok": "Trending Clip:"
-        }
-        title = f"{title_prefix[source]} {text[:60]}..."
+        sentiment_type = random.choice(list(SENTIMENT_PHRASES.keys()))
+        text = _render_text(random, sentiment_type)
+        title = f"{TITLE_PREFIX[source]} {text[:60]}..."
 
         data.append({
             'source': source,
@@ -117,17 +150,153 @@ def generate_random_sentiment_data(num_records=10):
         })
     return data
 
+def _build_text_pools(seed):
+    """
+    Renders a fixed pool of texts per sentiment, using only that sentiment's templates.
+
+    Returns:
+        dict: Sentiment -> numpy object array of texts.
+    """
+    rng = random.Random(seed)
+    templates_per_sentiment = len(TEMPLATES) // len(SENTIMENT_PHRASES)
+    pools = {}
+    for position, sentiment_type in enumerate(SENTIMENT_PHRASES):
+        sentiment_templates = TEMPLATES[position * templates_per_sentiment:(position + 1) * templates_per_sentiment]
+        pools[sentiment_type] = np.array(
+            [_render_text(rng, sentiment_type, sentiment_templates) for _ in range(TEXT_POOL_SIZE)], dtype=object
+        )
+    return pools
+
+def _date_weights(days, recency_scale):
+    """
+    Probability of each day offset (0 = today): recent days dominate, weekends are quieter.
+    """
+    offsets = np.arange(days)
+    weights = np.exp(-offsets / recency_scale)
+    weekdays = np.array([(date.today() - timedelta(days=int(offset))).weekday() for offset in offsets])
+    weights *= np.where(weekdays >= 5, 0.6, 1.0)
+    return weights / weights.sum()
+
+def generate_sentiment_frame(num_records, rng, text_pools, days=365, recency_scale=60.0, duplicate_rate=0.05):
+    """
+    Generates one chunk of synthetic records with vectorized NumPy sampling.
+
+    Sources, sentiments and dates are drawn from skewed distributions (SOURCE_WEIGHTS,
+    SENTIMENT_WEIGHTS, recency-weighted days), texts are sampled from per-sentiment
+    pools, and a duplicate_rate fraction of rows are exact copies of earlier rows in the
+    chunk, as reposts and syndicated articles are in real data.
+
+    Args:
+        num_records (int): The number of records in the chunk.
+        rng (numpy.random.Generator): Seeded generator.
+        text_pools (dict): Output of _build_text_pools.
+        days (int): Dates are spread over this many days back from today.
+        recency_scale (float): Larger values flatten the recency skew.
+        duplicate_rate (float): Fraction of rows copied from an earlier row.
+
+    Returns:
+        pandas.DataFrame: Columns 'source', 'title', 'text' and 'date' (datetime64).
+    """
+    sources = np.array(list(SOURCE_WEIGHTS), dtype=object)
+    sentiments = list(SENTIMENT_WEIGHTS)
+
+    source_idx = rng.choice(len(sources), size=num_records, p=list(SOURCE_WEIGHTS.values()))
+    sentiment_idx = rng.choice(len(sentiments), size=num_records, p=list(SENTIMENT_WEIGHTS.values()))
+    day_offsets = rng.choice(days, size=num_records, p=_date_weights(days, recency_scale))
+
+    texts = np.empty(num_records, dtype=object)
+    for position, sentiment_type in enumerate(sentiments):
+        mask = sentiment_idx == position
+        pool = text_pools[sentiment_type]
+        texts[mask] = pool[rng.integers(0, len(pool), size=mask.sum())]
+
+    # Most posts mention a place; the template pools alone would repeat texts too often at scale
+    location_suffixes = np.array([f" ({location})" for location in LOCATIONS] + [""], dtype=object)
+    texts = (pd.Series(texts, dtype=object) + location_suffixes[rng.integers(0, len(location_suffixes), size=num_records)]).to_numpy(dtype=object, copy=True)
+
+    # Duplicates point back to a uniformly chosen earlier row of the chunk
+    duplicate_rows = np.flatnonzero(rng.random(num_records) < duplicate_rate)
+    duplicate_rows = duplicate_rows[duplicate_rows > 0]
+    original_rows = (rng.random(len(duplicate_rows)) * duplicate_rows).astype(np.int64)
+    source_idx[duplicate_rows] = source_idx[original_rows]
+    day_offsets[duplicate_rows] = day_offsets[original_rows]
+    texts[duplicate_rows] = texts[original_rows]
+
+    source_values = sources[source_idx]
+    text_series = pd.Series(texts, dtype=object)
+    title_prefixes = pd.Series(np.array([TITLE_PREFIX[source] for source in sources], dtype=object)[source_idx])
+    today = np.datetime64(date.today(), 'D')
+
+    return pd.DataFrame({
+        'source': source_values,
+        'title': title_prefixes + " " + text_series.str[:60] + "...",
+        'text': text_series,
+        'date': (today - day_offsets.astype('timedelta64[D]')).astype('datetime64[ns]')
+    })
+
+def write_sentiment_data(output_file, num_records, chunk_size=DEFAULT_CHUNK_SIZE, seed=42, file_format=None, **frame_kwargs):
+    """
+    Streams num_records synthetic records to CSV or Parquet, one chunk at a time.
+
+    Memory use is bounded by chunk_size regardless of num_records. Output is
+    reproducible for a given seed and chunk_size.
+
+    Args:
+        output_file (str): Destination path.
+        num_records (int): Total records to write.
+        chunk_size (int): Records generated and written per chunk.
+        seed (int): Seed for all random draws.
+        file_format (str, optional): 'csv' or 'parquet'. Inferred from the extension if not given.
+        **frame_kwargs: Passed to generate_sentiment_frame (days, recency_scale, duplicate_rate).
+
+    Returns:
+        int: The number of records written.
+    """
+    file_format = file_format or ('parquet' if output_file.endswith('.parquet') else 'csv')
+    rng = np.random.default_rng(seed)
+    text_pools = _build_text_pools(seed)
+    parquet_writer = None
+    written = 0
+
+    try:
+        while written < num_records:
+            chunk = generate_sentiment_frame(min(chunk_size, num_records - written), rng, text_pools, **frame_kwargs)
+            if file_format == 'parquet':
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                chunk['date'] = chunk['date'].dt.date
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(output_file, table.schema, compression='zstd')
+                parquet_writer.write_table(table)
+            else:
+                chunk['date'] = chunk['date'].dt.strftime('%Y-%m-%d')
+                chunk.to_csv(output_file, index=False, encoding='utf-8', mode='w' if written == 0 else 'a', header=written == 0)
+            written += len(chunk)
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+    return written
+
 if __name__ == "__main__":
-    generated_data = generate_random_sentiment_data(num_records=20) # Generate more records for better variety
-    df = pd.DataFrame(generated_data)
-    
-    # FIX: Convert the 'date' column which contains datetime.date objects to strings
-    # astype(str) will correctly format datetime.date objects to 'YYYY-MM-DD' strings by default.
-    df['date'] = df['date'].astype(str)
-
-    output_file = "sample_sentiment_data.csv"
-    df.to_csv(output_file, index=False, encoding='utf-8')
-    print(f"Generated {len(generated_data)} records and saved to {output_file}")
-    print("\nSample of generated data:")
-    print(df.head())
-    print("\nData generation complete.")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate synthetic sentiment data.")
+    parser.add_argument("--rows", type=int, default=20, help="Number of records to generate.")
+    parser.add_argument("--output", default="sample_sentiment_data.csv", help="Output file (.csv or .parquet).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records generated per chunk.")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed (random if not given).")
+    parser.add_argument("--days", type=int, default=15, help="Spread dates over this many days back from today.")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Fraction of records that duplicate an earlier one.")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    start = time.perf_counter()
+    written = write_sentiment_data(args.output, args.rows, chunk_size=args.chunk_size, seed=seed,
+                                   days=args.days, recency_scale=max(args.days / 3, 1.0),
+                                   duplicate_rate=args.duplicate_rate)
+    elapsed = time.perf_counter() - start
+    print(f"Generated {written} records (seed {seed}) and saved to {args.output} in {elapsed:.2f}s "
+          f"({written / max(elapsed, 1e-9):,.0f} records/s).")
+    if args.output.endswith('.csv'):
+        print("\nSample of generated data:")
+        print(pd.read_csv(args.output, nrows=5))
+    print("\nData generation complete.")
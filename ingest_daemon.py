@@ -0,0 +1,176 @@
+import argparse
+import logging
+import os
+import signal
+import threading
+import time
+
+from utils.pipeline import run_pipeline
+from utils.csv_loader import CSV_CHUNK_SIZE, iter_scored_csv_batches
+from utils.entity_tagger import get_default_tagger
+from utils import record_store, sql_store
+from utils.sources import available_sources
+from utils.trend_detector import load_detector, save_detector, trends_path
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_POLL_INTERVAL = 900 # Seconds between ingestion cycles
+DEFAULT_SOURCES = ["RSS", "Twitter"]
+# 'sqlite' (indexed, queried by the dashboard with SQL) or 'parquet' (partitioned files)
+STORE_BACKENDS = {
+    "sqlite": sql_store.DEFAULT_SQL_STORE_PATH,
+    "parquet": record_store.DEFAULT_STORE_PATH,
+}
+DEFAULT_BACKEND = os.getenv('SENTIMENT_STORE_BACKEND', 'sqlite')
+DEFAULT_RETENTION_DAYS = int(os.getenv('SENTIMENT_RETENTION_DAYS', 90)) # Days of raw records kept before rollup
+COMPACTION_INTERVAL = 24 * 3600 # Seconds between compaction runs
+
+def _store_batch(scored_batch, store_path, seen_keys, backend):
+    if backend == "sqlite":
+        return sql_store.append_records(scored_batch, db_path=store_path)
+    return record_store.append_records(scored_batch, store_path=store_path, seen_keys=seen_keys)
+
+def compact(store_path=None, backend=DEFAULT_BACKEND, retention_days=DEFAULT_RETENTION_DAYS):
+    """
+    Rolls raw records older than retention_days up into daily counts and score histograms,
+    drops them and merges small files (see the backend's compact_store).
+
+    Returns:
+        dict: Compaction statistics from the backend.
+    """
+    store_path = store_path or STORE_BACKENDS[backend]
+    if backend == "sqlite":
+        return sql_store.compact_store(store_path, retention_days=retention_days)
+    return record_store.compact_store(store_path, retention_days=retention_days)
+
+def run_ingestion_cycle(source_names, store_path, seen_keys, backend=DEFAULT_BACKEND, detector=None):
+    """
+    Fetches the given sources once, scores new items and appends them to the store.
+
+    Twitter is polled incrementally (since_id), so only tweets newer than the previous
+    cycle are fetched and scored. Records already in the store are skipped.
+
+    Args:
+        source_names (list): Registered source names to poll.
+        store_path (str): Path to the record store.
+        seen_keys (set): Keys of records already stored. Updated in place (Parquet backend only;
+                         the SQL store rejects duplicate keys itself).
+        backend (str): 'sqlite' or 'parquet'.
+        detector (TrendDetector, optional): Fed every scored batch, for trend and spike alerts.
+
+    Returns:
+        int: The number of new records stored.
+    """
+    source_kwargs = {"Twitter": {"incremental": True}}
+    pipeline_stats = {}
+    stored = 0
+    for scored_batch in run_pipeline(source_names, source_kwargs=source_kwargs, stats=pipeline_stats):
+        stored += _store_batch(scored_batch, store_path, seen_keys, backend)
+        if detector is not None:
+            detector.update(scored_batch)
+    logging.info(f"Ingestion cycle done: fetched {pipeline_stats.get('fetched')}, scored {pipeline_stats.get('scored')}, "
+                 f"stored {stored} new records in {pipeline_stats.get('elapsed')}s.")
+    return stored
+
+def ingest_csv_file(file_path, store_path=None, backend=DEFAULT_BACKEND, chunk_size=CSV_CHUNK_SIZE):
+    """
+    Scores a CSV of records into the store, one chunk at a time.
+
+    Args:
+        file_path (str): CSV with 'source', 'text' and 'date' columns ('title' optional).
+        store_path (str, optional): Path to the record store. Defaults to the backend's path.
+        backend (str): 'sqlite' or 'parquet'.
+        chunk_size (int): Rows read, scored and stored at a time.
+
+    Returns:
+        int: The number of new records stored.
+    """
+    store_path = store_path or STORE_BACKENDS[backend]
+    seen_keys = record_store.load_record_keys(store_path, window_days=None) if backend == "parquet" else set()
+    detector = load_detector(trends_path(store_path))
+    csv_stats = {}
+    stored = 0
+    start_time = time.monotonic()
+    for scored_batch in iter_scored_csv_batches(file_path, chunk_size, tagger=get_default_tagger(), stats=csv_stats):
+        stored += _store_batch(scored_batch, store_path, seen_keys, backend)
+        detector.update(scored_batch)
+        logging.info(f"{file_path}: {csv_stats['rows']} rows read, {csv_stats['scored']} scored, {stored} stored.")
+    logging.info(f"CSV import done: {csv_stats.get('rows', 0)} rows in {csv_stats.get('chunks', 0)} chunks, "
+                 f"{csv_stats.get('invalid', 0)} invalid, {stored} new records stored in {time.monotonic() - start_time:.1f}s.")
+    save_detector(detector, trends_path(store_path))
+    return stored
+
+def run_daemon(source_names, store_path=None, interval=DEFAULT_POLL_INTERVAL, once=False, backend=DEFAULT_BACKEND,
+               retention_days=DEFAULT_RETENTION_DAYS):
+    """
+    Polls the sources on a fixed schedule until interrupted (SIGINT/SIGTERM).
+
+    Args:
+        source_names (list): Registered source names to poll.
+        store_path (str, optional): Path to the record store the dashboard reads. Defaults to the backend's path.
+        interval (float): Seconds between the starts of consecutive cycles.
+        once (bool): Run a single cycle and exit.
+        backend (str): 'sqlite' or 'parquet'.
+        retention_days (int): Days of raw records kept; the store is compacted every COMPACTION_INTERVAL.
+    """
+    store_path = store_path or STORE_BACKENDS[backend]
+    stop_event = threading.Event()
+
+    def _request_stop(signum, frame):
+        logging.info(f"Received signal {signum}. Stopping after the current cycle.")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+
+    seen_keys = record_store.load_record_keys(store_path) if backend == "parquet" else set()
+    # Trends are updated from each scored batch and saved next to the store for the dashboard
+    detector = load_detector(trends_path(store_path))
+    logging.info(f"Ingestion daemon started for {source_names}, storing to {backend} store {store_path}.")
+
+    last_compaction = None
+    while not stop_event.is_set():
+        cycle_start = time.monotonic()
+        try:
+            run_ingestion_cycle(source_names, store_path, seen_keys, backend=backend, detector=detector)
+        except Exception as e:
+            logging.exception(f"Ingestion cycle failed: {e}")
+        try:
+            save_detector(detector, trends_path(store_path))
+        except OSError as e:
+            logging.error(f"Could not save trend state: {e}")
+        if not once and (last_compaction is None or cycle_start - last_compaction >= COMPACTION_INTERVAL):
+            last_compaction = cycle_start
+            try:
+                compact(store_path, backend=backend, retention_days=retention_days)
+            except Exception as e:
+                logging.exception(f"Compaction failed: {e}")
+        if once:
+            break
+        stop_event.wait(max(0.0, interval - (time.monotonic() - cycle_start)))
+    logging.info("Ingestion daemon stopped.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless ingestion and scoring daemon for the sentiment dashboard.")
+    parser.add_argument("--sources", nargs="+", default=DEFAULT_SOURCES, choices=available_sources(),
+                        help="Sources to poll on each cycle.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between ingestion cycles.")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=sorted(STORE_BACKENDS),
+                        help="Record store format (default from SENTIMENT_STORE_BACKEND, else sqlite).")
+    parser.add_argument("--store", default=None, help="Path to the record store. Defaults to the backend's path.")
+    parser.add_argument("--once", action="store_true", help="Run a single ingestion cycle and exit.")
+    parser.add_argument("--csv", metavar="FILE", help="Score a CSV of records into the store and exit.")
+    parser.add_argument("--chunk-size", type=int, default=CSV_CHUNK_SIZE, help="Rows per chunk when importing --csv.")
+    parser.add_argument("--retention-days", type=int, default=DEFAULT_RETENTION_DAYS,
+                        help="Days of raw records to keep; older ones are rolled up (default from SENTIMENT_RETENTION_DAYS, else 90).")
+    parser.add_argument("--compact", action="store_true", help="Compact the store once and exit.")
+    args = parser.parse_args()
+
+    if args.csv:
+        ingest_csv_file(args.csv, store_path=args.store, backend=args.backend, chunk_size=args.chunk_size)
+    elif args.compact:
+        compact(args.store, backend=args.backend, retention_days=args.retention_days)
+    else:
+        run_daemon(args.sources, store_path=args.store, interval=args.interval, once=args.once, backend=args.backend,
+                   retention_days=args.retention_days)
@@ -3,10 +3,11 @@ import pandas as pd
 from datetime import date, timedelta, datetime
 import logging
 import os # Import os to check for file existence
-from fpdf import FPDF
 # Ensure the utils directory is in the Python path
 import sys
-import io
+import threading
+import uuid
+from collections import OrderedDict
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 # Configure logging for the main app
@@ -181,7 +182,19 @@ st.markdown(
 # Import necessary utility functions
 # Only sentiment_analysis and visualize are strictly needed for the CSV loading path
 from utils.sentiment_analysis import analyze_sentiment
-from utils.visualize import show_charts
+from utils.visualize import build_charts, render_charts
+from utils.record_store import DEFAULT_STORE_PATH, READ_ATTEMPTS, cube_complete, list_data_files, load_records, read_rollups, rollup_sentiment_counts, store_version
+from utils import sql_store
+from utils.circuit_breaker import breaker_statuses
+from utils.entity_tagger import get_default_tagger
+from utils.csv_loader import iter_scored_csv_batches
+from utils.filter_engine import RecordFrame, sort_positions, to_view_frame
+from utils.data_table import render_paginated_table
+from utils.export_writer import EXPORT_FORMATS, iter_frame_chunks, prepare_export
+from utils.pdf_report import frame_row_source, get_report, request_report
+from utils.trend_detector import WINDOW_DAYS, TrendDetector, load_detector, save_detector, trends_path
+from utils.approx_metrics import APPROX_MIN_ROWS, approximate_view, get_exact, request_exact
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 
 # --- Header Section ---
 st.markdown("<h1 style='text-align: center; color: #0c6a38;'>📊 Akwa Ibom Governor Sentiment Tracker 📊</h1>", unsafe_allow_html=True)
@@ -219,7 +232,8 @@ keyword_filter = st.sidebar.text_input(
     "Filter by Keyword (case-insensitive)",
     placeholder="e.g., road, development, budget",
     key="keyword_input",
-    help="Only show items containing this keyword in their text/description."
+    help="Only show items whose text contains all of these words. Use OR between alternatives, "
+         "\"double quotes\" for an exact phrase and a trailing * for word prefixes (e.g. develop*)."
 )
 
 sentiment_filter = st.sidebar.multiselect(
@@ -230,171 +244,496 @@ sentiment_filter = st.sidebar.multiselect(
     help="Include or exclude specific sentiment categories."
 )
 
+entity_tagger = get_default_tagger()
+entity_filter = st.sidebar.multiselect(
+    "Filter by Entity",
+    list(entity_tagger.watchlist),
+    format_func=entity_tagger.entity_name,
+    key="entity_multiselect",
+    help="Only show items mentioning at least one of these tracked people, agencies or projects."
+)
+
+approximate_large_views = st.sidebar.checkbox(
+    "Fast approximate metrics for large views",
+    value=True,
+    key="approximate_metrics_checkbox",
+    help=f"Views of {APPROX_MIN_ROWS:,}+ items that have to be aggregated row by row (keyword or entity filters) "
+         "are first shown from a stratified sample, with 95% confidence intervals, while the exact "
+         "figures are computed in the background."
+)
+
+# Circuit breaker state of the live sources (populated once live data has been fetched in this process)
+source_health = breaker_statuses()
+if source_health:
+    with st.sidebar.expander("Source Health", expanded=any(status['state'] != 'closed' for status in source_health)):
+        st.dataframe(pd.DataFrame(source_health), hide_index=True)
+
 # --- Initial Data Load & Sentiment Analysis (Always run on first load and reruns) ---
-# Initialize session state for data storage unconditionally at the top level
-if 'analyzed_data_raw' not in st.session_state:
-    st.session_state.analyzed_data_raw = [] # Will hold raw hardcoded data initially
+# Stored datasets are loaded once per version and date range and shared by every session (see load_shared_store);
+# a session only keeps the live data it fetched itself, plus index arrays into the shared data
 if 'analyzed_data' not in st.session_state:
-    st.session_state.analyzed_data = [] # Will hold sentiment-analyzed data
+    st.session_state.analyzed_data = [] # Will hold sentiment-analyzed live data
 
 # Path to the generated CSV file
 DATA_CSV_FILE = "sample_sentiment_data.csv"
+# Optional list of RSS feeds to monitor (one URL per line, or a JSON list)
+RSS_FEEDS_FILE = "rss_feeds.txt"
+# Scored records written by the background ingestion daemon (ingest_daemon.py)
+STORE_PATH = DEFAULT_STORE_PATH
+SQL_STORE_PATH = sql_store.DEFAULT_SQL_STORE_PATH
+# Scored copy of DATA_CSV_FILE, rebuilt whenever the file changes
+CSV_STORE_PATH = os.path.join('data', 'sample_records.sqlite3')
+
+# Derived views (metrics, charts, exports) are memoized per dataset version and filter combination
+DERIVED_CACHE_TTL = 15 * 60 # Seconds a memoized view is kept before it is recomputed
+DERIVED_CACHE_ENTRIES = 16 # Memoized views kept per stage
+SHARED_WINDOWS = 4 # Date range and source windows of the ingestion store kept loaded for all sessions
+REPORT_POLL_SECONDS = 1 # How often the export region checks on a PDF report being built
+EXACT_POLL_SECONDS = 1 # How often an approximate overview checks on its exact metrics
+MAX_SHOWN_ALERTS = 3 # Most recent trend alerts shown above the metrics
+
+# Date bounds pushed down into the stores
+if date_range and len(date_range) == 2:
+    store_start_date, store_end_date = date_range[0], date_range[1]
+elif date_range and len(date_range) == 1:
+    store_start_date = store_end_date = date_range[0]
+else:
+    store_start_date = store_end_date = None
+
+# Shared datasets are process-wide: every session gets the same objects, not copies
+@st.cache_resource(show_spinner=False)
+def dataset_lock(name):
+    """Returns the process-wide lock serializing the load of one dataset across sessions."""
+    return threading.Lock()
+
+@st.cache_resource(show_spinner=False)
+def shared_store(store_path):
+    """
+    Returns the process-wide windows loaded from an ingestion store: (start date, end date, sources) ->
+    the window's RecordFrame, the files it was read from and the store version, least recently used first.
+    """
+    return OrderedDict()
+
+def load_shared_store(store_path, version, start_date=None, end_date=None, sources=None):
+    """
+    Brings the shared RecordFrame of one window of the ingestion store (a date range and source list)
+    up to a store version and returns it. Only the partitions of the window are read.
+
+    Only the data files written into the window since its last load are read and appended, so the
+    frame's indexes are extended rather than rebuilt; the window is read in full on first use, or when
+    compaction replaced files already loaded. The SHARED_WINDOWS most recently used windows are kept.
+    """
+    windows = shared_store(store_path)
+    window = (start_date, end_date, tuple(sorted(sources)) if sources is not None else None)
+    with dataset_lock(store_path):
+        loaded = windows.get(window)
+        if loaded is None or loaded['version'] != version:
+            for attempt in range(READ_ATTEMPTS):
+                data_files = list_data_files(store_path, start_date, end_date, sources)
+                file_paths = {file_path for _, _, file_path in data_files}
+                try:
+                    if loaded is None or not loaded['data_files'] <= file_paths:
+                        loaded = {'record_frame': RecordFrame(load_records(store_path, data_files=data_files))}
+                        logging.info(f"Loaded shared dataset '{store_path}' {window} version {version}: {len(loaded['record_frame'])} records.")
+                    else:
+                        new_files = [entry for entry in data_files if entry[2] not in loaded['data_files']]
+                        loaded['record_frame'].append(load_records(store_path, data_files=new_files))
+                        logging.info(f"Updated shared dataset '{store_path}' {window} to version {version}: "
+                                     f"{len(new_files)} new files, {len(loaded['record_frame'])} records.")
+                    break
+                except FileNotFoundError:
+                    if attempt == READ_ATTEMPTS - 1:
+                        raise # Compaction removed the listed files each time
+            loaded.update(data_files=file_paths, version=version)
+            windows[window] = loaded
+        windows.move_to_end(window)
+        while len(windows) > SHARED_WINDOWS:
+            windows.popitem(last=False)
+        return loaded['record_frame']
+
+@st.cache_resource(show_spinner=False, ttl=DERIVED_CACHE_TTL, max_entries=DERIVED_CACHE_ENTRIES)
+def shared_view(view_key, _record_frame, _filters):
+    """
+    Filters a dataset once per view for all sessions. The returned frame is shared: read it, never modify it.
+    """
+    logging.info(f"Applying filters: {_filters}")
+    return _record_frame.filter(**_filters)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_trend_state(path, mtime_ns):
+    """
+    Reads the trend state written next to a store by whoever scores into it, once per change.
+
+    Returns:
+        tuple: (list of recent alerts, list of per-series metrics); see utils.trend_detector.
+    """
+    detector = load_detector(path)
+    return list(detector.alerts), detector.snapshot()
 
-# Load data from CSV if available, otherwise prompt to generate
-if not st.session_state.analyzed_data or not os.path.exists(DATA_CSV_FILE):
-    st.info(f"Loading data from '{DATA_CSV_FILE}'...")
+@st.cache_data(show_spinner=False, ttl=DERIVED_CACHE_TTL, max_entries=32)
+def query_sql_counts(db_path, version, filters):
+    """
+    Counts the raw records matching the dashboard filters in the ingestion database, per sentiment
+    and per mentioned entity and sentiment, once per database version and filter combination.
+    No rows are read into Python.
+
+    Returns:
+        tuple: (dict of sentiment -> count, DataFrame of entity_id, sentiment, count).
+    """
+    return sql_store.count_by_sentiment(db_path, **filters), sql_store.count_by_entity(db_path, **filters)
+
+@st.cache_data(show_spinner=False, ttl=DERIVED_CACHE_TTL, max_entries=DERIVED_CACHE_ENTRIES)
+def query_sql_cells(db_path, version, filters):
+    """
+    Groups the records matching keyword or entity filters into rollup cells in SQL
+    (see utils.sql_store.aggregate_records), once per database version and filter combination.
+    """
+    return sql_store.aggregate_records(db_path, **filters)
+
+@st.cache_data(show_spinner=False, ttl=DERIVED_CACHE_TTL, max_entries=DERIVED_CACHE_ENTRIES)
+def query_sql_page(db_path, version, filters, sort_by, descending, offset, limit):
+    """
+    Reads one page of the filtered records from the SQL store, once per database version,
+    filter combination, sort order and page.
+    """
+    return to_view_frame(sql_store.query_page(db_path, sort_by=sort_by, descending=descending,
+                                              offset=offset, limit=limit, **filters))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_rollup_snapshot(backend, store_path, version, start_date, end_date, sources, sentiments):
+    """
+    Reads the cells of the store's rollup cube (daily counts per source, sentiment and score bin)
+    once per store version and filter combination.
+    """
+    if backend == "sqlite":
+        return sql_store.query_rollups(store_path, start_date=start_date, end_date=end_date,
+                                       sources=list(sources), sentiments=list(sentiments))
+    return read_rollups(store_path, start_date=start_date, end_date=end_date, sources=list(sources), sentiments=list(sentiments))
+
+# The derived stages below take the filtered view as an unhashed argument (leading underscore):
+# `view_key` (dataset version, frame generation + filter values) identifies it, so the frame is never hashed.
+@st.cache_data(show_spinner=False, ttl=DERIVED_CACHE_TTL, max_entries=DERIVED_CACHE_ENTRIES)
+def compute_overview(view_key, _filtered_df, _sentiment_counts=None, _entity_counts=None):
+    """
+    Counts sentiments and entity mentions of a filtered view, once per view. Counts already
+    aggregated by the SQL store (_entity_counts: entity_id, sentiment, count) are used as they are.
+
+    Returns:
+        tuple: (dict of sentiment -> count, DataFrame of mentions per entity and sentiment or None).
+    """
+    if _sentiment_counts is None:
+        _sentiment_counts = _filtered_df['sentiment'].value_counts().to_dict()
+    entity_breakdown = None
+    if _entity_counts is not None:
+        if not _entity_counts.empty:
+            entity_breakdown = _entity_counts.pivot_table(index='entity_id', columns='sentiment', values='count',
+                                                          aggfunc='sum', fill_value=0)
+            entity_breakdown.columns.name = None
+            entity_breakdown.index = entity_breakdown.index.map(get_default_tagger().entity_name)
+            entity_breakdown['Total'] = entity_breakdown.sum(axis=1)
+            entity_breakdown = entity_breakdown.sort_values('Total', ascending=False)
+    elif not _filtered_df.empty:
+        df_entities = _filtered_df[['entities', 'sentiment']].explode('entities', ignore_index=True).dropna(subset=['entities'])
+        if not df_entities.empty:
+            entity_breakdown = pd.crosstab(df_entities['entities'], df_entities['sentiment'])
+            entity_breakdown.index = entity_breakdown.index.map(get_default_tagger().entity_name)
+            entity_breakdown['Total'] = entity_breakdown.sum(axis=1)
+            entity_breakdown = entity_breakdown.sort_values('Total', ascending=False)
+    return dict(_sentiment_counts), entity_breakdown
+
+# Charts are kept as objects (not pickled copies), so a cache hit costs nothing but rendering
+@st.cache_resource(show_spinner=False, ttl=DERIVED_CACHE_TTL, max_entries=DERIVED_CACHE_ENTRIES)
+def compute_chart_sections(view_key, _filtered_df, _rollups=None):
+    """
+    Builds the chart sections (see utils.visualize.build_charts) of a filtered view, once per view.
+
+    Returns:
+        tuple: (list of sections, error message or None).
+    """
+    try:
+        return build_charts(_filtered_df, rollups=_rollups), None
+    except ValueError as e:
+        return [], str(e)
+
+@st.cache_resource(show_spinner=False, ttl=DERIVED_CACHE_TTL, max_entries=DERIVED_CACHE_ENTRIES)
+def compute_approximation(view_key, _filtered_df, _text_hashes=None):
+    """
+    Estimates the overview metrics and charts of a large view from a stratified sample
+    (see utils.approx_metrics.approximate_view), once per view.
+
+    Returns:
+        dict: The estimates, with the entity breakdown named and totalled like compute_overview's
+              and 'chart_sections' drawn from the estimated cells.
+    """
+    approximation = approximate_view(_filtered_df, hashes=_text_hashes)
+    entity_breakdown = approximation['entity_breakdown']
+    if entity_breakdown is not None:
+        entity_breakdown.index = entity_breakdown.index.map(get_default_tagger().entity_name)
+        entity_breakdown['Total'] = entity_breakdown.sum(axis=1)
+        approximation['entity_breakdown'] = entity_breakdown.sort_values('Total', ascending=False)
+    try:
+        approximation['chart_sections'] = build_charts(_filtered_df.iloc[0:0], rollups=approximation['cells'])
+    except ValueError as e:
+        logging.error(f"Approximate charts failed: {e}")
+        approximation['chart_sections'] = []
+    logging.info(f"Approximated a view of {approximation['total']} items from {approximation['sample_rows']} sampled.")
+    return approximation
+
+# Prefer the daemon's SQL database: filters run as indexed queries, so no rows are preloaded.
+# Live data fetched with the button below takes over until the page is reloaded.
+current_sql_version = sql_store.store_version(SQL_STORE_PATH)
+use_sql_store = current_sql_version is not None and not st.session_state.get('live_data_active')
+current_store_version = store_version(STORE_PATH)
+if use_sql_store:
+    logging.info(f"Querying the ingestion database '{SQL_STORE_PATH}' (version {current_sql_version}).")
+
+# Then the daemon's Parquet store: it is already scored, so it is only read, once per version for all sessions
+elif current_store_version is not None and not st.session_state.get('live_data_active'):
+    if st.session_state.get('store_version_loaded') != current_store_version:
+        st.session_state.store_version_loaded = current_store_version
+        st.success(f"Loaded {len(load_shared_store(STORE_PATH, current_store_version, store_start_date, store_end_date, source_option))} "
+                   f"scored items for the selected dates and sources from the ingestion store '{STORE_PATH}'.")
+
+# Otherwise score the sample CSV into its own SQL database, once per version of the file, and query that.
+# The file is streamed in typed chunks, so memory stays bounded however large it is. The lock makes
+# sessions arriving together wait for the first one's import instead of scoring the file again.
+elif not st.session_state.get('live_data_active'):
     if os.path.exists(DATA_CSV_FILE):
+        csv_stat = os.stat(DATA_CSV_FILE)
+        csv_signature = f"{os.path.abspath(DATA_CSV_FILE)}|{csv_stat.st_size}|{csv_stat.st_mtime_ns}"
         try:
-            # Read CSV and ensure 'date' column is parsed as datetime.date
-            df_loaded = pd.read_csv(DATA_CSV_FILE)
-            df_loaded['date'] = pd.to_datetime(df_loaded['date']).dt.date
-            
-            st.session_state.analyzed_data_raw = df_loaded.to_dict('records')
-            st.write(f"DEBUG: Loaded {len(st.session_state.analyzed_data_raw)} items from CSV.")
-
-            st.write(f"Processing {len(st.session_state.analyzed_data_raw)} items for sentiment analysis...")
-            st.session_state.analyzed_data = analyze_sentiment(st.session_state.analyzed_data_raw)
-            st.write(f"DEBUG: Sentiment analysis performed. Resulting items: {len(st.session_state.analyzed_data)}")
-
-            st.markdown("### 🛠️ Debug Preview: Analyzed Data Snapshot (CSV Load)")
-            st.write(f"📅 Today is: {datetime.today().date()}")
-            if st.session_state.analyzed_data:
-                debug_df_initial = pd.DataFrame(st.session_state.analyzed_data)
-                st.dataframe(debug_df_initial[['date', 'source', 'sentiment', 'score', 'text']].head(10))
-                st.write(f"Type of 'date' column in analyzed data: {debug_df_initial['date'].dtype}")
-            else:
+            with dataset_lock(CSV_STORE_PATH):
+                if sql_store.get_meta(CSV_STORE_PATH, 'source_file') != csv_signature:
+                    st.info(f"Loading data from '{DATA_CSV_FILE}'...")
+                    sql_store.reset_store(CSV_STORE_PATH)
+                    csv_detector = TrendDetector()
+                    csv_stats = {}
+                    stored_count = 0
+                    progress_text = st.empty()
+                    for scored_batch in iter_scored_csv_batches(DATA_CSV_FILE, tagger=entity_tagger, stats=csv_stats):
+                        stored_count += sql_store.append_records(scored_batch, db_path=CSV_STORE_PATH)
+                        csv_detector.update(scored_batch)
+                        progress_text.write(f"Scored {csv_stats['scored']} of {csv_stats['rows']} rows read so far...")
+                    save_detector(csv_detector, trends_path(CSV_STORE_PATH))
+                    sql_store.set_meta(CSV_STORE_PATH, 'source_file', csv_signature)
+                    st.write(f"DEBUG: Read {csv_stats['rows']} rows from CSV in {csv_stats['chunks']} chunks "
+                             f"({csv_stats['invalid']} invalid rows skipped), stored {stored_count} scored items.")
+                    st.success("Analysis complete! Data loaded from CSV. View the insights below.")
+            SQL_STORE_PATH = CSV_STORE_PATH
+            current_sql_version = sql_store.store_version(CSV_STORE_PATH)
+            use_sql_store = current_sql_version is not None
+            if not use_sql_store:
                 st.info("⚠️ No data returned from sentiment analysis for CSV input. Check sentiment_analysis.py or CSV content.")
-            st.success("Analysis complete! Data loaded from CSV. View the insights below.")
-
         except Exception as e:
             st.error(f"Error loading or processing data from {DATA_CSV_FILE}: {e}")
             st.warning("Please ensure the CSV file is correctly formatted. If the issue persists, try regenerating it.")
-            st.session_state.analyzed_data_raw = []
-            st.session_state.analyzed_data = []
+            with dataset_lock(CSV_STORE_PATH):
+                sql_store.reset_store(CSV_STORE_PATH)
+        st.session_state.analyzed_data = []
     else:
         st.warning(f"'{DATA_CSV_FILE}' not found. Please run `generate_test_data.py` to create it.")
-        st.session_state.analyzed_data_raw = []
         st.session_state.analyzed_data = []
 
+rss_dummy_fallback = st.sidebar.checkbox(
+    "Use sample RSS articles if no feed responds",
+    value=False,
+    key="rss_dummy_fallback_checkbox",
+    help="For demos without network access: the live analysis then shows built-in sample articles instead of no RSS data."
+)
+
 # This button explicitly triggers fetching from utils functions
 if st.sidebar.button("🔄 Re-Run Analysis (Using Live Data Sources)", key="rerun_live_data_button"):
     st.info("Re-running analysis using selected live data sources. This will replace current data.")
-    all_raw_data_live = []
+    st.session_state.live_data_active = True
+    use_sql_store = False
     with st.status("Fetching live data and performing sentiment analysis...", expanded=True) as status_message:
-        # Import utilities here, as they are only needed when this button is clicked
-        from utils.fetch_rss import get_rss_articles
-        from utils.scrape_twitter import get_twitter_data
-        from utils.scrape_facebook import get_facebook_data
-        from utils.scrape_instagram import get_instagram_data
-        from utils.scrape_tiktok import get_tiktok_data
-
-        if "RSS" in source_option:
-            st.write("Fetching RSS articles...")
-            rss_fetched_data = get_rss_articles()
-            all_raw_data_live.extend(rss_fetched_data)
-            st.write(f"  Fetched {len(rss_fetched_data)} RSS items.")
-        if "Twitter" in source_option:
-            st.write("Fetching Twitter data...")
-            twitter_fetched_data = get_twitter_data(query="Umo Eno Akwa Ibom", max_results=50)
-            all_raw_data_live.extend(twitter_fetched_data)
-            st.write(f"  Fetched {len(twitter_fetched_data)} Twitter items.")
-        if "Facebook" in source_option:
-            st.write("Fetching Facebook data (dummy from utils)...")
-            facebook_fetched_data = get_facebook_data(query="Akwa Ibom Governor", max_results=20)
-            all_raw_data_live.extend(facebook_fetched_data)
-            st.write(f"  Fetched {len(facebook_fetched_data)} Facebook items.")
-        if "Instagram" in source_option:
-            st.write("Fetching Instagram data (dummy from utils)...")
-            instagram_fetched_data = get_instagram_data(query="Umo Eno Akwa Ibom", max_results=20)
-            all_raw_data_live.extend(instagram_fetched_data)
-            st.write(f"  Fetched {len(instagram_fetched_data)} Instagram items.")
-        if "TikTok" in source_option:
-            st.write("Fetching TikTok data (dummy from utils)...")
-            tiktok_fetched_data = get_tiktok_data(query="Akwa Ibom Governor", max_results=20)
-            all_raw_data_live.extend(tiktok_fetched_data)
-            st.write(f"  Fetched {len(tiktok_fetched_data)} TikTok items.")
-
-        st.write(f"Total raw live data collected: {len(all_raw_data_live)} items.")
-
-        if not all_raw_data_live:
+        # Import the pipeline here, as it is only needed when this button is clicked
+        from utils.pipeline import run_pipeline
+
+        # Sources are fetched concurrently and scored in micro-batches while the others are still fetching
+        rss_feed_stats = []
+        source_kwargs = {
+            "RSS": {
+                "config_path": RSS_FEEDS_FILE if os.path.exists(RSS_FEEDS_FILE) else None,
+                "feed_stats": rss_feed_stats,
+                "fallback_to_dummy": rss_dummy_fallback
+            }
+        }
+        pipeline_stats = {}
+        analyzed_data_live = []
+        st.session_state.trend_detector = TrendDetector() # Live data replaces the dataset, so its trends start over
+        st.write(f"Fetching from {', '.join(source_option)} and scoring as records arrive...")
+        progress_text = st.empty()
+        for scored_batch in run_pipeline(source_option, source_kwargs=source_kwargs, stats=pipeline_stats):
+            analyzed_data_live.extend(scored_batch)
+            st.session_state.trend_detector.update(scored_batch)
+            progress_text.write(f"  Scored {len(analyzed_data_live)} items so far...")
+
+        for source_name, fetched_count in pipeline_stats.get('fetched', {}).items():
+            st.write(f"  Fetched {fetched_count} {source_name} items.")
+        if rss_feed_stats:
+            failed_feeds = sum(1 for stats in rss_feed_stats if stats['error'])
+            st.write(f"  RSS: {len(rss_feed_stats) - failed_feeds}/{len(rss_feed_stats)} feeds fetched successfully.")
+            st.dataframe(pd.DataFrame(rss_feed_stats))
+
+        st.write(f"Total live data collected and analyzed: {len(analyzed_data_live)} items.")
+
+        if not analyzed_data_live:
             status_message.update(label="No live data fetched!", state="error", expanded=False)
             st.warning("No live data fetched from the selected sources. Please check your selections or API keys.")
             st.session_state.analyzed_data = []
-            st.session_state.analyzed_data_raw = [] # Clear raw data too
         else:
-            st.write(f"Processing {len(all_raw_data_live)} items for sentiment analysis...")
-            st.session_state.analyzed_data = analyze_sentiment(all_raw_data_live)
-            st.session_state.analyzed_data_raw = all_raw_data_live # Store raw live data too if needed for later debug
-            st.write(f"Sentiment analysis completed for {len(st.session_state.analyzed_data)} items.")
+            st.session_state.analyzed_data = analyzed_data_live
+            st.write(f"Sentiment analysis completed for {len(st.session_state.analyzed_data)} items in {pipeline_stats['elapsed']}s.")
             status_message.update(label="Live analysis complete!", state="complete", expanded=False)
             st.success("Live analysis complete! View the insights below.")
 
 
-# Always apply filters to the currently available analyzed_data from session_state
-filtered_data = list(st.session_state.analyzed_data) # Create a copy to modify during filtering
-
-# --- DEBUGGING OUTPUTS (Final Filter Checks) ---
-st.info(f"DEBUG: Data before filtering: {len(filtered_data)} items")
-
-
-# Apply Keyword Filter
-if keyword_filter:
-    logging.info(f"Applying keyword filter: '{keyword_filter}'")
-    original_count = len(filtered_data)
-    filtered_data = [
-        item for item in filtered_data
-        if 'text' in item and isinstance(item['text'], str) and keyword_filter.lower() in item['text'].lower()
-    ]
-    st.info(f"DEBUG: Data after Keyword Filter ('{keyword_filter}'): {len(filtered_data)} items (from {original_count})")
-
-
-# Apply Sentiment Filter
-if sentiment_filter and set(sentiment_filter) != {"Positive", "Neutral", "Negative"}:
-    logging.info(f"Applying sentiment filter: {sentiment_filter}")
-    original_count = len(filtered_data)
-    filtered_data = [
-        item for item in filtered_data
-        if 'sentiment' in item and item['sentiment'] in sentiment_filter
-    ]
-    st.info(f"DEBUG: Data after Sentiment Filter ({sentiment_filter}): {len(filtered_data)} items (from {original_count})")
-
-
-# Apply Date Range Filter
-if date_range and len(date_range) == 2 and all(isinstance(d, date) for d in date_range):
-    start_date, end_date = date_range[0], date_range[1]
-    logging.info(f"Applying date range filter: {start_date} to {end_date}")
-    original_count = len(filtered_data)
-    filtered_data = [
-        item for item in filtered_data
-        if 'date' in item and isinstance(item['date'], date) and start_date <= item['date'] <= end_date
-    ]
-    st.info(f"DEBUG: Data after Date Range Filter ({start_date} to {end_date}): {len(filtered_data)} items (from {original_count})")
-elif date_range and len(date_range) == 1 and isinstance(date_range[0], date):
-    selected_date = date_range[0]
-    logging.info(f"Applying single date filter: {selected_date}")
-    original_count = len(filtered_data)
-    filtered_data = [
-        item for item in filtered_data
-        if 'date' in item and isinstance(item['date'], date) and item['date'] == selected_date
-    ]
-    st.info(f"DEBUG: Data after Single Date Filter ({selected_date}): {len(filtered_data)} items (from {original_count})")
-
-
-st.info(f"DEBUG: Final data count after all filters: {len(filtered_data)} items")
-
-
-if not filtered_data:
-    st.info("No data available to display after applying filters. Adjust your selections or click 'Re-Run Analysis (Using Live Data Sources)'.")
+# Always apply filters to the currently available data. The result is one DataFrame view
+# (see utils/filter_engine.VIEW_COLUMNS) shared by the metrics, charts and exports.
+sentiment_counts = None # Filled by the SQL store or the rollup cube; otherwise counted from the filtered rows
+entity_counts = None # Per entity and sentiment, counted by the SQL store
+filter_params = dict(start_date=store_start_date, end_date=store_end_date, sources=list(source_option),
+                     sentiments=list(sentiment_filter), keyword=keyword_filter or None, entities=list(entity_filter))
+if use_sql_store:
+    # Every filter is compiled into SQL and only counts come back: the rows stay in the database and
+    # are read a page (table, PDF) or a chunk (export) at a time
+    filtered_df = to_view_frame([])
+    sentiment_counts, entity_counts = query_sql_counts(SQL_STORE_PATH, current_sql_version, filter_params)
+    row_count = sum(sentiment_counts.values())
+    dataset_version = f"sqlite:{os.path.abspath(SQL_STORE_PATH)}:{current_sql_version}"
+    view_generation = None
+    st.info(f"DEBUG: SQL query matched {row_count} items in '{SQL_STORE_PATH}'")
 else:
-    # --- Key Metrics ---
-    st.subheader("Overview Metrics")
-    total_items = len(filtered_data)
-    
-    df_metrics = pd.DataFrame(filtered_data)
-    if 'sentiment' in df_metrics.columns and not df_metrics.empty:
-        sentiment_counts = df_metrics['sentiment'].value_counts()
+    if current_store_version is not None and not st.session_state.get('live_data_active'):
+        record_frame = load_shared_store(STORE_PATH, current_store_version, store_start_date, store_end_date, source_option)
+        dataset_version = f"parquet:{os.path.abspath(STORE_PATH)}:{current_store_version}"
     else:
-        sentiment_counts = pd.Series(dtype='int64')
+        # Live data belongs to this session. Its columnar frame is built once; if the same list has
+        # only grown, the new records are appended so the entity and keyword indexes are extended
+        data_identity = (id(st.session_state.analyzed_data), len(st.session_state.analyzed_data))
+        previous_identity = st.session_state.get('record_frame_identity')
+        if previous_identity != data_identity:
+            if previous_identity and previous_identity[0] == data_identity[0] and previous_identity[1] < data_identity[1]:
+                st.session_state.record_frame.append(st.session_state.analyzed_data[previous_identity[1]:])
+            else:
+                st.session_state.record_frame = RecordFrame(st.session_state.analyzed_data)
+            st.session_state.record_frame_identity = data_identity
+            st.session_state.dataset_version = f"memory:{uuid.uuid4().hex}"
+        record_frame = st.session_state.record_frame
+        dataset_version = st.session_state.dataset_version
+
+    # Each rerun only slices and masks the frame, once per view for every session looking at it
+    # (the frame's generation changes if an append reorders its rows, see RecordFrame.append)
+    view_generation = record_frame.generation
+    view_key = (dataset_version, view_generation) + tuple(str(value) for value in filter_params.values())
+    filtered_df = shared_view(view_key, record_frame, filter_params)
+    row_count = len(filtered_df)
+    st.info(f"DEBUG: Filtered {len(record_frame)} items down to {row_count}")
+
+# Metrics and charts are answered from the rollup cube (daily counts per source, sentiment and
+# score bin, kept up to date as records are stored) when the filters allow it: the work depends on
+# the number of cells, not rows, and compacted days are included. Keyword and entity filters need
+# the raw text, so they are aggregated from the filtered rows (by the SQL store itself when it backs the view).
+cube_rollups = None
+history_rollups = None # Parquet stores written before the cube only have rollups of compacted days
+if use_sql_store and (keyword_filter or entity_filter):
+    cube_rollups = query_sql_cells(SQL_STORE_PATH, current_sql_version, filter_params)
+    if cube_rollups.empty:
+        cube_rollups = None
+elif not keyword_filter and not entity_filter:
+    cube_filters = (store_start_date, store_end_date, tuple(sorted(source_option)), tuple(sorted(sentiment_filter)))
+    if use_sql_store:
+        cube_rollups = load_rollup_snapshot("sqlite", SQL_STORE_PATH, current_sql_version, *cube_filters)
+    elif st.session_state.get('live_data_active'):
+        cube_rollups = record_frame.rollups(start_date=store_start_date, end_date=store_end_date,
+                                            sources=list(source_option), sentiments=list(sentiment_filter))
+    elif current_store_version is not None:
+        store_rollups = load_rollup_snapshot("parquet", STORE_PATH, current_store_version, *cube_filters)
+        if cube_complete(STORE_PATH):
+            cube_rollups = store_rollups
+        elif not store_rollups.empty:
+            history_rollups = store_rollups
+    if cube_rollups is not None and cube_rollups.empty:
+        cube_rollups = None
+
+if cube_rollups is not None:
+    sentiment_counts = rollup_sentiment_counts(cube_rollups)
+    total_items = int(cube_rollups['count'].sum())
+    compacted_items = max(total_items - row_count, 0)
+    chart_data, chart_rollups = filtered_df.iloc[0:0], cube_rollups
+else:
+    total_items = row_count
+    compacted_items = int(history_rollups['count'].sum()) if history_rollups is not None else 0
+    chart_data, chart_rollups = filtered_df, history_rollups
+aggregate_source = 'cube' if cube_rollups is not None else 'history' if history_rollups is not None else 'rows'
+
+
+# Key of the current filtered view: the memoized stages below are looked up by it
+view_key = (dataset_version, view_generation) + tuple(str(value) for value in filter_params.values()) + (aggregate_source,)
+
+# Large views aggregated from rows are first shown from a stratified sample (SQL views are always
+# aggregated by the database, so this is the Parquet and live data path). The exact metrics and
+# charts are computed by a background thread shared by every session (warming the memoized stages
+# above) and replace the estimates once ready; a failed exact run falls back to computing in line.
+approximation = None
+if approximate_large_views and not use_sql_store and aggregate_source == 'rows' and row_count >= APPROX_MIN_ROWS:
+    exact_job = get_exact(view_key)
+    if exact_job is None or exact_job.state == 'running':
+        approximation = compute_approximation(view_key, filtered_df, record_frame.text_hashes_at(filtered_df.index.to_numpy(), filtered_df.attrs.get('generation')))
+    if exact_job is None: # Started after the estimates, so it does not slow the first paint
+        request_exact(
+            view_key,
+            lambda: (compute_overview(view_key, filtered_df, sentiment_counts), compute_chart_sections(view_key, chart_data, chart_rollups)),
+            thread_hook=add_script_run_ctx
+        )
+
+# Each page region is a fragment: a widget inside one reruns only that region, and every region
+# reads its derived data from the memoized stages above instead of recomputing it.
+@st.fragment(run_every=EXACT_POLL_SECONDS)
+def render_exact_progress(view_key):
+    """Shown only while the exact metrics of an approximate view are computed: reruns the page once they are ready."""
+    exact_job = get_exact(view_key)
+    if exact_job is not None and exact_job.state == 'running':
+        st.caption("⏳ Computing the exact figures in the background; they will replace these estimates automatically.")
+    else:
+        st.rerun()
+
+def render_approximate_overview(view_key, approximation):
+    """Renders the estimated overview metrics with their 95% confidence intervals."""
+    st.subheader("Overview Metrics (approximate)")
+    st.caption(f"Estimated from a stratified sample of {approximation['sample_rows']:,} of {approximation['total']:,} items "
+               f"({approximation['strata']:,} day × source strata). Margins are 95% confidence intervals.")
+    shares, item_counts = approximation['shares'], approximation['sentiment_counts']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(label="Total Items", value=approximation['total'], delta_color="off")
+    for column, sentiment, color in ((col2, 'Positive', '#2ca02c'), (col3, 'Negative', '#d62728'), (col4, 'Neutral', '#1f77b4')):
+        share, margin = shares[sentiment]
+        approximate = "≈" if margin else ""
+        with column:
+            st.metric(label=f"{sentiment} Sentiment", value=f"{approximate}{share * 100:.1f}%" + (f" ± {margin * 100:.1f}" if margin else ""),
+                      delta_color="off")
+            st.markdown(f"<p style='text-align: center; color: {color}; font-size: 0.9em; margin-top: -15px;'>"
+                        f"({approximate}{item_counts[sentiment]} items)</p>", unsafe_allow_html=True)
+    quantiles = approximation['score_quantiles']
+    if quantiles[0.5] is not None:
+        st.caption(f"Confidence score median ≈ {quantiles[0.5]:.3f}, 90th percentile ≈ {quantiles[0.9]:.3f} (t-digest). "
+                   f"Distinct texts ≈ {approximation['distinct_texts']:,} (HyperLogLog).")
+    render_exact_progress(view_key)
+
+    if approximation['entity_breakdown'] is not None:
+        with st.expander("Mentions by Entity (approximate)", expanded=False):
+            st.dataframe(approximation['entity_breakdown'])
+
+@st.fragment
+def render_overview(view_key, filtered_df, total_items, sentiment_counts, entity_counts=None, approximation=None):
+    """Renders the overview metrics and the per-entity mention breakdown (estimated if an approximation is given)."""
+    if approximation is not None:
+        render_approximate_overview(view_key, approximation)
+        return
+    st.subheader("Overview Metrics")
+    sentiment_counts, entity_breakdown = compute_overview(view_key, filtered_df, sentiment_counts, entity_counts)
 
     positive_count = sentiment_counts.get('Positive', 0)
     negative_count = sentiment_counts.get('Negative', 0)
@@ -417,85 +756,202 @@ else:
         st.metric(label="Neutral Sentiment", value=f"{neutral_percent:.1f}%", delta_color="off")
         st.markdown(f"<p style='text-align: center; color: #1f77b4; font-size: 0.9em; margin-top: -15px;'>({neutral_count} items)</p>", unsafe_allow_html=True)
 
-    st.markdown("---")
+    # --- Mentions per tracked entity ---
+    if entity_breakdown is not None:
+        with st.expander("Mentions by Entity", expanded=False):
+            st.dataframe(entity_breakdown)
 
-    # --- Show Charts ---
+@st.fragment
+def render_chart_region(view_key, chart_data, chart_rollups, compacted_items, approximation=None):
+    """Renders the sentiment charts from raw rows and/or rollup cells, or from a sample's estimated counts."""
     st.subheader(f"Sentiment Trends and Distribution")
-    show_charts(filtered_data)
-
+    if approximation is not None:
+        st.caption("Approximate: counts are estimated from the stratified sample until the exact charts are ready.")
+        render_charts(approximation['chart_sections'])
+        return
+    if compacted_items:
+        st.caption(f"Includes {compacted_items} older items from compacted history, kept as daily counts.")
+    chart_sections, chart_error = compute_chart_sections(view_key, chart_data, chart_rollups)
+    if chart_error:
+        st.error(f"Error: {chart_error}")
+    else:
+        render_charts(chart_sections)
+
+@st.fragment(run_every=REPORT_POLL_SECONDS)
+def render_report_progress(view_key):
+    """Shown only while a PDF report is being built: polls it and reruns the page once it is ready."""
+    report = get_report(view_key)
+    if report is not None and report.state == 'running':
+        st.info("Preparing the PDF report...")
+    else:
+        st.rerun()
 
-    # --- Export Functionality ---
+@st.fragment
+def render_export_region(view_key, filtered_df, row_count, filter_params, total_items, sentiment_counts, source_rollups, sql_source=None):
+    """
+    Renders the data export and the PDF report. Both are only built when asked for. The export is
+    written chunk by chunk to a compressed file and the report's detail rows are fetched a page at
+    a time (both read from the SQL store when it backs the view, sql_source being its
+    (db_path, version, filters)); the export is kept on disk per view and format. The
+    report is built in a background worker shared by every session; while it is being built this
+    region polls on its own so the rest of the page stays interactive.
+    """
     st.subheader("Data Export")
-    df_export = pd.DataFrame(filtered_data)
-    
-    if 'score' in df_export.columns:
-        df_export['score'] = df_export['score'].round(4)
-
     col_csv, col_pdf = st.columns(2)
 
     with col_csv:
-        csv_data = df_export.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="Download Data as CSV 💾",
-            data=csv_data,
-            file_name="sentiment_analysis_data.csv",
-            mime="text/csv",
-            key="download_csv_button"
-        )
-
-    with col_pdf:
-        try:
-            if not df_export.empty:
-                pdf = FPDF()
-                pdf.add_page()
-                pdf.set_font("Arial", size=12)
-
-                # Title
-                pdf.set_font("Arial", style="B", size=14)
-                pdf.cell(200, 10, txt="Sentiment Analysis Report", ln=True, align="C")
-                pdf.ln(10)
-
-                # Add table header
-                pdf.set_font("Arial", style="B", size=10)
-                headers = list(df_export.columns)
-                for header in headers:
-                    pdf.cell(40, 10, txt=header[:15], border=1)
-                pdf.ln()
-
-                # Add rows
-                pdf.set_font("Arial", size=9)
-                for _, row in df_export.iterrows():
-                    for item in row:
-                        item_str = str(item)
-                        pdf.cell(40, 10, txt=item_str[:15], border=1)
-                    pdf.ln()
-
-                # Export
-                pdf_buffer = io.BytesIO()
-                pdf.output(pdf_buffer)
-                pdf_buffer.seek(0)
-
+        export_format = st.selectbox("Export format", list(EXPORT_FORMATS), key="export_format_select")
+        export_key = (view_key, export_format)
+        if st.button("Prepare Data Export 💾", key="prepare_export_button"):
+            if sql_source:
+                db_path, _, filters = sql_source
+                chunk_factory = lambda: map(to_view_frame, sql_store.iter_query_chunks(db_path, **filters))
+            else:
+                chunk_factory = lambda: iter_frame_chunks(filtered_df)
+            try:
+                with st.spinner("Writing the export..."):
+                    st.session_state.export_file = (export_key, prepare_export(view_key, export_format, chunk_factory))
+            except Exception as e:
+                logging.error(f"Export failed: {e}")
+                st.error(f"Export failed: {e}")
+        export_file = st.session_state.get('export_file')
+        if export_file and export_file[0] == export_key and os.path.exists(export_file[1]):
+            _, _, extension, mime = EXPORT_FORMATS[export_format]
+            with open(export_file[1], 'rb') as f:
                 st.download_button(
-                    label="Download Data as PDF 📄",
-                    data=pdf_buffer,
-                    file_name="sentiment_analysis_data.pdf",
-                    mime="application/pdf",
-                    key="download_pdf_button"
+                    label=f"Download Data as {export_format} 💾",
+                    data=f,
+                    file_name=f"sentiment_analysis_data.{extension}",
+                    mime=mime,
+                    key="download_export_button"
                 )
+
+    with col_pdf:
+        if not row_count and source_rollups is None:
+            st.info("No data to export to PDF.")
+            return
+        report = get_report(view_key)
+        if report is None or report.state == 'failed':
+            if report is not None:
+                st.error(f"PDF export failed: {report.error}")
+            if not st.button("Prepare PDF Report 📄", key="prepare_pdf_button"):
+                return
+            if source_rollups is not None:
+                source_counts = source_rollups.groupby('source', observed=True)['count'].sum().to_dict()
             else:
-                st.info("No data to export to PDF.")
-        except Exception as e:
-            st.error(f"PDF export failed: {e}")
+                source_counts = filtered_df['source'].value_counts().to_dict()
+            summary = {
+                'filters': [
+                    ("Date range", f"{filter_params['start_date']} to {filter_params['end_date']}"),
+                    ("Sources", ", ".join(filter_params['sources']) or "All"),
+                    ("Sentiments", ", ".join(filter_params['sentiments']) or "All"),
+                    ("Keyword", filter_params['keyword'] or "None"),
+                    ("Entities", ", ".join(map(get_default_tagger().entity_name, filter_params['entities'])) or "None"),
+                ],
+                'total_items': total_items,
+                'sentiment_counts': compute_overview(view_key, filtered_df, sentiment_counts)[0],
+                'source_counts': source_counts,
+            }
+            if sql_source:
+                db_path, _, filters = sql_source
+                fetch_rows = lambda offset, limit: to_view_frame(
+                    sql_store.query_page(db_path, sort_by='date', descending=True, offset=offset, limit=limit, **filters))
+            else:
+                fetch_rows = frame_row_source(filtered_df)
+            report = request_report(view_key, summary, fetch_rows, row_count)
+
+        if report.state == 'running':
+            render_report_progress(view_key)
+        elif report.state == 'done':
+            st.download_button(
+                label="Download Report as PDF 📄",
+                data=report.result,
+                file_name="sentiment_analysis_report.pdf",
+                mime="application/pdf",
+                key="download_pdf_button"
+            )
+
+@st.fragment
+def render_raw_table(view_key, filtered_df, row_count, sql_source=None):
+    """
+    Renders the raw data table behind its toggle; toggling it reruns only this region.
+    Only the visible page is sent to the browser: from the SQL store when it backs the view
+    (sql_source is its (db_path, version, filters)), otherwise from the filtered frame through a
+    sort order kept per view.
+    """
+    def fetch_sql_page(sort_by, descending, offset, limit):
+        return query_sql_page(*sql_source, sort_by, descending, offset, limit)
 
-    st.markdown("---")
+    def fetch_frame_page(sort_by, descending, offset, limit):
+        order_key = (view_key, sort_by, descending)
+        if st.session_state.get('table_order_key') != order_key:
+            st.session_state.table_order = sort_positions(filtered_df, sort_by, descending)
+            st.session_state.table_order_key = order_key
+        return filtered_df.iloc[st.session_state.table_order[offset:offset + limit]]
 
-    # --- Show Raw Data Table (Toggle) ---
-    st.markdown("---")
     if st.checkbox("Show Raw Data Table", key="show_raw_data_checkbox"):
-        if filtered_data:
+        if row_count:
             st.subheader("Filtered Raw Data")
-            st.dataframe(pd.DataFrame(filtered_data))
+            render_paginated_table(fetch_sql_page if sql_source else fetch_frame_page, row_count, key="raw_table")
         else:
             st.info("No raw data to display after filtering.")
     else:
-        st.info("Check the box to view the raw data table. This shows the original data before sentiment analysis and filtering.")
\ No newline at end of file
+        st.info("Check the box to view the raw data table. This shows the original data before sentiment analysis and filtering.")
+
+def render_trend_alerts(trend_alerts, trend_metrics):
+    """Shows the latest negative-spike alerts and the streaming trend metrics of each series."""
+    if not trend_metrics:
+        return
+
+    def series_label(name):
+        kind, _, value = name.partition(':')
+        if name == 'all':
+            return "All sources"
+        return get_default_tagger().entity_name(value) if kind == 'entity' else value
+
+    for alert in trend_alerts[-MAX_SHOWN_ALERTS:][::-1]:
+        st.warning(f"🚨 Negative sentiment spike for {series_label(alert['series'])} on {alert['date']}: "
+                   f"{alert['negative']} negative items vs {alert['expected']} expected (z = {alert['z']}).")
+    with st.expander("Trend Monitor", expanded=False):
+        st.caption(f"Updated as records are scored, over all incoming data (the filters do not apply). "
+                   f"Net index = (positive − negative) / total over the last {WINDOW_DAYS} days.")
+        metrics_frame = pd.DataFrame(trend_metrics)
+        metrics_frame['series'] = metrics_frame['series'].map(series_label)
+        st.dataframe(metrics_frame.rename(columns={
+            'series': 'Series', 'date': 'Latest Day', 'negative_today': 'Negative (Latest Day)',
+            'expected_negative': 'Expected Negative', 'z': 'Z-Score', 'net_index_window': 'Net Index',
+            'records_window': f'Items ({WINDOW_DAYS}d)', 'daily_rate_ewma': 'Items/Day (EWMA)',
+            'negative_share_ewma': 'Negative Share (EWMA)'
+        }), hide_index=True)
+
+# Trend alerts come from the streaming detector fed as records are scored, not from a scan of the data:
+# the session's own detector for live data, otherwise the state saved next to the store
+if st.session_state.get('live_data_active'):
+    live_detector = st.session_state.get('trend_detector')
+    trend_alerts, trend_metrics = (list(live_detector.alerts), live_detector.snapshot()) if live_detector else ([], [])
+else:
+    trend_file = trends_path(SQL_STORE_PATH if use_sql_store else STORE_PATH)
+    trend_alerts, trend_metrics = load_trend_state(trend_file, os.stat(trend_file).st_mtime_ns) if os.path.exists(trend_file) else ([], [])
+render_trend_alerts(trend_alerts, trend_metrics)
+
+if not row_count and chart_rollups is None:
+    st.info("No data available to display after applying filters. Adjust your selections or click 'Re-Run Analysis (Using Live Data Sources)'.")
+else:
+    # --- Key Metrics ---
+    render_overview(view_key, filtered_df, total_items, sentiment_counts, entity_counts, approximation)
+
+    st.markdown("---")
+
+    # --- Show Charts ---
+    render_chart_region(view_key, chart_data, chart_rollups, compacted_items, approximation)
+
+
+    # --- Export Functionality ---
+    render_export_region(view_key, filtered_df, row_count, filter_params, total_items, sentiment_counts, cube_rollups,
+                         (SQL_STORE_PATH, current_sql_version, filter_params) if use_sql_store else None)
+
+    st.markdown("---")
+
+    # --- Show Raw Data Table (Toggle) ---
+    st.markdown("---")
+    render_raw_table(view_key, filtered_df, row_count, (SQL_STORE_PATH, current_sql_version, filter_params) if use_sql_store else None)
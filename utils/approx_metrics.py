@@ -0,0 +1,271 @@
+# utils/approx_metrics.py
+import math
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from utils.background_jobs import JobRegistry
+from utils.filter_engine import SENTIMENT_CATEGORIES, text_hashes
+from utils.record_store import score_bins
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+APPROX_MIN_ROWS = 200_000 # Views aggregated from at least this many rows are shown from a sample first
+SAMPLE_SIZE = 50_000 # Rows in the stratified sample, allocated to strata in proportion to their size
+MIN_PER_STRATUM = 5 # Rows sampled from every (day, source) stratum however small, so each has a variance
+CONFIDENCE_Z = 1.96 # Normal quantile of the 95% confidence intervals
+HLL_PRECISION = 12 # 2**12 one-byte registers: about 1.6% standard error on distinct counts
+TDIGEST_COMPRESSION = 200 # Centroid budget of the score quantile sketch (about half as many centroids)
+MAX_EXACT_JOBS = 8 # Finished exact computations tracked (oldest forgotten first)
+EXACT_TTL = 15 * 60 # Seconds a finished exact computation is reused before it is redone on request
+
+class HyperLogLog:
+    """
+    Distinct-count sketch: 2**precision registers, each keeping the longest run of leading zero
+    bits seen among the hashes routed to it. Sketches of the same precision merge by maximum.
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, hashes):
+        """Adds an array of 64-bit hashes (see utils.filter_engine.text_hashes)."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(hashes):
+            return
+        buckets = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        # The remaining bits, top-aligned; frexp of their leading 53 bits gives the bit length exactly
+        remaining = ((hashes << np.uint64(self.precision)) >> np.uint64(11)).astype(np.float64)
+        ranks = (54 - np.frexp(remaining)[1]).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def merge(self, other):
+        """Folds another sketch of the same precision into this one."""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self):
+        """Returns the estimated number of distinct hashes added."""
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros) # Linear counting is more accurate for small cardinalities
+        return int(round(estimate))
+
+class TDigest:
+    """
+    Quantile sketch: weighted centroids, small at the tails and larger in the middle (the k1 scale
+    function bounds each centroid to one unit of k = compression / (2 pi) * asin(2q - 1)). Adding
+    values or merging digests re-clusters the sorted centroids in one vectorized pass.
+    """
+
+    def __init__(self, compression=TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = self.max = None
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(self.compression / (2 * math.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.r_[True, np.diff(k) != 0])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def add(self, values, weights=None):
+        """Adds an array of values, optionally weighted (e.g. by sampling weights)."""
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        keep = ~np.isnan(values)
+        values, weights = values[keep], weights[keep]
+        if not len(values):
+            return
+        self.min = float(values.min()) if self.min is None else min(self.min, float(values.min()))
+        self.max = float(values.max()) if self.max is None else max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+
+    def merge(self, other):
+        """Folds another digest into this one."""
+        if len(other.weights):
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def quantile(self, q):
+        """Returns the estimated q-quantile (0 <= q <= 1), or None if the digest is empty."""
+        if not len(self.weights):
+            return None
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centers, self.weights.sum()]
+        return float(np.interp(q * self.weights.sum(), positions, np.r_[self.min, self.means, self.max]))
+
+def stratify(frame):
+    """
+    Returns the (day, source) stratum of each row as dense integer ids, plus the number of rows per id.
+    """
+    days = frame['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    source_codes, _ = pd.factorize(frame['source'], sort=False)
+    source_count = max(int(source_codes.max()) + 1, 1) if len(source_codes) else 1
+    strata = (days - (days.min() if len(days) else 0)) * source_count + source_codes
+    return strata, np.bincount(strata)
+
+def stratified_sample(frame, sample_size=SAMPLE_SIZE, seed=0):
+    """
+    Draws a stratified random sample of a view frame, stratified by day and source.
+
+    Each stratum gets a share of sample_size in proportion to its rows (at least MIN_PER_STRATUM).
+    Within a stratum the rows with the smallest random keys are kept: the same sample a reservoir
+    of that size would hold after seeing the stratum's rows, drawn in one vectorized pass.
+
+    Args:
+        frame (pandas.DataFrame): View frame with 'date' and 'source' columns.
+        sample_size (int): Target number of sampled rows.
+        seed (int): Seed of the random keys, so a view is always sampled the same way.
+
+    Returns:
+        tuple: (row positions of the sample, their stratum ids, rows per stratum, rows sampled per stratum).
+    """
+    strata, stratum_rows = stratify(frame)
+    quota = np.ceil(stratum_rows * min(sample_size / max(len(frame), 1), 1.0))
+    quota = np.minimum(np.maximum(quota, MIN_PER_STRATUM), stratum_rows).astype(np.int64)
+    keys = np.random.default_rng(seed).random(len(frame))
+    # A stratum's smallest keys are almost surely below a threshold a few standard deviations past
+    # its quota, so only rows under it are sorted (a stratum short of candidates takes all its rows)
+    threshold = np.minimum((quota + 4 * np.sqrt(quota) + 10) / np.maximum(stratum_rows, 1), 1.0)
+    candidates = np.flatnonzero(keys < threshold[strata])
+    short = np.bincount(strata[candidates], minlength=len(stratum_rows)) < quota
+    if short.any():
+        threshold[short] = 1.0
+        candidates = np.flatnonzero(keys < threshold[strata])
+    candidate_strata = strata[candidates]
+    order = np.lexsort((keys[candidates], candidate_strata))
+    candidate_rows = np.bincount(candidate_strata, minlength=len(stratum_rows))
+    stratum_starts = np.r_[0, np.cumsum(candidate_rows)[:-1]]
+    sorted_strata = candidate_strata[order]
+    keep = (np.arange(len(order)) - stratum_starts[sorted_strata]) < quota[sorted_strata]
+    positions = np.sort(candidates[order[keep]])
+    return positions, strata[positions], stratum_rows, quota
+
+def _share_estimates(sample_strata, sample_sentiments, stratum_rows, quota):
+    # Stratified estimator of each sentiment's share, with its variance (finite population corrected)
+    total = stratum_rows.sum()
+    stratum_weight = stratum_rows / total
+    estimates = {}
+    for sentiment in SENTIMENT_CATEGORIES:
+        hits = np.bincount(sample_strata, weights=(sample_sentiments == sentiment), minlength=len(stratum_rows))
+        sampled = np.maximum(quota, 1)
+        share = hits / sampled
+        correction = np.where(stratum_rows > 0, 1 - quota / np.maximum(stratum_rows, 1), 0)
+        variance = np.where(quota > 1, share * (1 - share) / np.maximum(quota - 1, 1), 0) * correction
+        estimates[sentiment] = (float(np.sum(stratum_weight * share)), float(np.sum(stratum_weight ** 2 * variance)))
+    return estimates
+
+def approximate_view(frame, sample_size=SAMPLE_SIZE, hashes=None, seed=0):
+    """
+    Estimates a view's overview metrics and chart inputs from a stratified sample (see stratified_sample).
+
+    Args:
+        frame (pandas.DataFrame): View frame (see utils.filter_engine.VIEW_COLUMNS).
+        sample_size (int): Target number of sampled rows.
+        hashes (numpy.ndarray, optional): Text hashes of the frame's rows (see text_hashes). Hashed
+                                          here if not given; the distinct count needs every row.
+        seed (int): Seed of the sample.
+
+    Returns:
+        dict: 'total' (exact row count), 'sample_rows', 'strata', 'shares' (sentiment -> (share,
+              margin of error) at 95% confidence), 'sentiment_counts' (sentiment -> estimated count),
+              'cells' (estimated rollup cells for utils.visualize.build_charts), 'entity_breakdown'
+              (estimated mentions per entity id and sentiment, or None), 'score_quantiles'
+              (0.5 and 0.9 -> score, from a TDigest) and 'distinct_texts' (from a HyperLogLog).
+    """
+    total = len(frame)
+    positions, sample_strata, stratum_rows, quota = stratified_sample(frame, sample_size, seed)
+    sample = frame.iloc[positions]
+    weights = (stratum_rows / np.maximum(quota, 1))[sample_strata]
+    sentiments = sample['sentiment'].astype(str).to_numpy()
+
+    shares = {sentiment: (share, CONFIDENCE_Z * math.sqrt(variance))
+              for sentiment, (share, variance) in _share_estimates(sample_strata, sentiments, stratum_rows, quota).items()}
+    scores = pd.to_numeric(sample['score'], errors='coerce').fillna(0.0)
+    cells = (pd.DataFrame({'date': sample['date'].dt.normalize().to_numpy(), 'source': sample['source'].astype(str).to_numpy(),
+                           'sentiment': sentiments, 'score_bin': score_bins(scores), 'count': weights})
+             .groupby(['date', 'source', 'sentiment', 'score_bin'], as_index=False)['count'].sum())
+    cells['count'] = cells['count'].round().astype(np.int64)
+
+    entity_breakdown = None
+    entities = pd.DataFrame({'entities': sample['entities'].to_numpy(), 'sentiment': sentiments, 'weight': weights})
+    entities = entities.explode('entities', ignore_index=True).dropna(subset=['entities'])
+    if not entities.empty:
+        entity_breakdown = pd.crosstab(entities['entities'], entities['sentiment'], values=entities['weight'], aggfunc='sum')
+        entity_breakdown = entity_breakdown.fillna(0).round().astype(np.int64)
+
+    digest = TDigest()
+    digest.add(scores.to_numpy(), weights)
+    sketch = HyperLogLog()
+    sketch.add(text_hashes(frame['text']) if hashes is None else hashes)
+
+    return {
+        'total': total,
+        'sample_rows': len(positions),
+        'strata': int(np.count_nonzero(stratum_rows)),
+        'shares': shares,
+        'sentiment_counts': {sentiment: int(round(share * total)) for sentiment, (share, _) in shares.items()},
+        'cells': cells,
+        'entity_breakdown': entity_breakdown,
+        'score_quantiles': {q: digest.quantile(q) for q in (0.5, 0.9)},
+        'distinct_texts': sketch.count(),
+    }
+
+# Process-wide jobs, so every session and rerun showing the same view shares one exact computation
+_EXACT_JOBS = JobRegistry(ttl=EXACT_TTL, max_finished=MAX_EXACT_JOBS, thread_name="exact-metrics", label="Exact metrics")
+
+def get_exact(key):
+    """
+    Returns the exact job for a key (dataset version plus filters), or None if there is none or it expired.
+    """
+    return _EXACT_JOBS.get(key)
+
+def request_exact(key, compute, thread_hook=None):
+    """
+    Starts an exact computation in a background thread unless one for the key is running or done.
+    Failed and expired ones are started again.
+
+    Args:
+        key (hashable): Dataset version plus filters.
+        compute (callable): Takes no arguments and returns the exact result.
+        thread_hook (callable, optional): Called with the thread before it starts (e.g. to attach a context).
+
+    Returns:
+        BackgroundJob: The job for the key.
+    """
+    return _EXACT_JOBS.request(key, compute, thread_hook=thread_hook)
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    from datetime import date, timedelta
+    rng = np.random.default_rng(7)
+    rows = 1_000_000
+    sample_frame = pd.DataFrame({
+        'source': rng.choice(['RSS', 'Twitter', 'Facebook'], rows),
+        'text': [f"Item {i % 300_000} about the new road in Uyo" for i in range(rows)],
+        'date': pd.to_datetime(date.today()) - pd.to_timedelta(rng.integers(0, 365, rows), unit='D'),
+        'sentiment': rng.choice(SENTIMENT_CATEGORIES, rows, p=[0.5, 0.3, 0.2]),
+        'score': rng.beta(5, 2, rows),
+        'entities': [['umo_eno'] if i % 7 == 0 else [] for i in range(rows)],
+    })
+    started = time.perf_counter()
+    approximation = approximate_view(sample_frame)
+    print(f"Approximated {rows} rows in {time.perf_counter() - started:.2f}s from {approximation['sample_rows']} sampled "
+          f"in {approximation['strata']} strata")
+    exact_shares = sample_frame['sentiment'].value_counts(normalize=True)
+    for sentiment, (share, margin) in approximation['shares'].items():
+        print(f"  {sentiment}: {share:.4f} ± {margin:.4f} (exact {exact_shares[sentiment]:.4f})")
+    print(f"  Score quantiles {approximation['score_quantiles']} (exact {sample_frame['score'].quantile([0.5, 0.9]).round(4).tolist()})")
+    print(f"  Distinct texts ≈ {approximation['distinct_texts']} (exact {sample_frame['text'].nunique()})")
@@ -0,0 +1,109 @@
+# utils/background_jobs.py
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class BackgroundJob:
+    """
+    A computation running in a background thread. `state` is 'running', 'done' or 'failed';
+    `result` holds the return value once done and `error` the message if it failed.
+    """
+
+    def __init__(self, key, ttl):
+        self.key = key
+        self.ttl = ttl
+        self.state = 'running'
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+    def expired(self):
+        return self.finished_at is not None and time.time() - self.finished_at > self.ttl
+
+    def _run(self, compute, label):
+        started = time.perf_counter()
+        try:
+            self.result = compute()
+            self.state = 'done'
+            logging.info(f"{label} finished in the background in {time.perf_counter() - started:.2f}s.")
+        except Exception as e:
+            logging.error(f"{label} failed: {e}")
+            self.error = str(e)
+            self.state = 'failed'
+        self.finished_at = time.time()
+
+class JobRegistry:
+    """
+    Process-wide background jobs by key, so every session and rerun asking for the same result
+    shares one computation. Finished jobs are served for `ttl` seconds; the `max_finished` most
+    recently used are kept (running jobs are never evicted).
+    """
+
+    def __init__(self, ttl, max_finished, thread_name, label):
+        """
+        Args:
+            ttl (float): Seconds a finished job is served before it is redone on request.
+            max_finished (int): Finished jobs kept in memory (oldest evicted first).
+            thread_name (str): Name of the worker threads.
+            label (str): What the jobs compute, for the log.
+        """
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self.thread_name = thread_name
+        self.label = label
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the job for a key, or None if there is none or it expired.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.expired():
+                return None
+            self._jobs.move_to_end(key)
+            return job
+
+    def request(self, key, compute, thread_hook=None):
+        """
+        Starts a job in a background thread unless one for the key is running or done.
+        Failed and expired jobs are started again.
+
+        Args:
+            key (hashable): Identifies the result (e.g. dataset version plus filters).
+            compute (callable): Takes no arguments and returns the result.
+            thread_hook (callable, optional): Called with the thread before it starts (e.g. to attach a context).
+
+        Returns:
+            BackgroundJob: The job for the key.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.state != 'failed' and not job.expired():
+                self._jobs.move_to_end(key)
+                return job
+            job = BackgroundJob(key, self.ttl)
+            self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            # Evict the oldest finished jobs beyond the cap (running ones finish first)
+            finished = [old_key for old_key, old_job in self._jobs.items() if old_job.state != 'running' and old_key != key]
+            for old_key in finished[:max(0, len(self._jobs) - self.max_finished)]:
+                del self._jobs[old_key]
+        thread = threading.Thread(target=job._run, args=(compute, self.label), name=self.thread_name, daemon=True)
+        if thread_hook is not None:
+            thread_hook(thread)
+        thread.start()
+        return job
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    registry = JobRegistry(ttl=60, max_finished=2, thread_name="example-job", label="Example sum")
+    job = registry.request('sum', lambda: sum(range(1_000_000)))
+    while job.state == 'running':
+        time.sleep(0.01)
+    print(f"Job {job.state}: {job.result}; same job on request: {registry.request('sum', lambda: 0) is job}")
@@ -0,0 +1,170 @@
+# utils/circuit_breaker.py
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+BREAKER_FAILURE_THRESHOLD = 3 # Consecutive failures before a source is considered down
+BREAKER_RECOVERY_TIMEOUT = 120.0 # Seconds a tripped breaker waits before probing the source again
+MAX_LAST_GOOD = 8 # Distinct calls per breaker whose last good result is kept (least recently used evicted)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a source whose breaker is open.
+    Carries the last successful result for the same call (or None) as last_good.
+    """
+    def __init__(self, message, last_good=None):
+        super().__init__(message)
+        self.last_good = last_good
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for one data source.
+
+    While closed, calls go through and consecutive failures are counted. After
+    failure_threshold failures the breaker opens and calls fail fast with
+    CircuitOpenError (carrying the last good result) instead of waiting on the
+    source. Once recovery_timeout has passed, the next call starts one probe of
+    the same call in a background thread (half-open) and still fails fast; a
+    successful probe closes the breaker and refreshes the last good result.
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, recovery_timeout=BREAKER_RECOVERY_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._last_good = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _call_key(func, args, kwargs):
+        return f"{func.__qualname__}{args!r}{sorted(kwargs.items())!r}"
+
+    def _record_success(self, key, result):
+        with self._lock:
+            if self.state != CLOSED:
+                logging.info(f"Circuit '{self.name}' closed: source recovered.")
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.last_error = None
+            if key is not None:
+                self._last_good[key] = result
+                self._last_good.move_to_end(key)
+                if len(self._last_good) > MAX_LAST_GOOD:
+                    self._last_good.popitem(last=False)
+
+    def _record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logging.warning(f"Circuit '{self.name}' opened after {self.failures} failures: {error}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def _probe(self, key, func, args, kwargs):
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            logging.warning(f"Recovery probe for '{self.name}' failed: {e}")
+            self._record_failure(e)
+        else:
+            self._record_success(key, result)
+
+    def call(self, func, *args, remember=True, **kwargs):
+        """
+        Calls func(*args, **kwargs) through the breaker.
+
+        Args:
+            remember (bool): Keep the result as the last good result of this call. Pass False for
+                             calls that are never repeated with the same arguments (e.g. polls
+                             for items newer than a moving id), whose results would only pile up.
+
+        Returns:
+            The result of func.
+
+        Raises:
+            CircuitOpenError: If the breaker is open or a recovery probe is in flight.
+            Exception: Whatever func raised (the failure is recorded first).
+        """
+        key = self._call_key(func, args, kwargs) if remember else None
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = HALF_OPEN
+                logging.info(f"Circuit '{self.name}' half-open: probing the source in the background.")
+                threading.Thread(target=self._probe, args=(key, func, args, kwargs),
+                                 name=f"probe-{self.name}", daemon=True).start()
+            if self.state != CLOSED:
+                raise CircuitOpenError(f"Circuit '{self.name}' is {self.state} (last error: {self.last_error}).",
+                                       last_good=self._last_good.get(key) if key is not None else None)
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        self._record_success(key, result)
+        return result
+
+    def last_good(self, func, *args, **kwargs):
+        """
+        Returns the last successful result of the same call, or None.
+        """
+        with self._lock:
+            return self._last_good.get(self._call_key(func, args, kwargs))
+
+    def status(self):
+        """
+        Returns a dictionary describing the breaker's current state.
+        """
+        with self._lock:
+            return {'source': self.name, 'state': self.state, 'failures': self.failures, 'last_error': self.last_error}
+
+# Process-wide breakers, so Streamlit reruns and daemon cycles share source health
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+def get_breaker(name, **breaker_kwargs):
+    """
+    Returns the process-wide breaker for a source, creating it on first use.
+    """
+    with _BREAKERS_LOCK:
+        if name not in _BREAKERS:
+            _BREAKERS[name] = CircuitBreaker(name, **breaker_kwargs)
+        return _BREAKERS[name]
+
+def breaker_statuses():
+    """
+    Returns the status of every breaker created so far.
+    """
+    with _BREAKERS_LOCK:
+        breakers = list(_BREAKERS.values())
+    return [breaker.status() for breaker in breakers]
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    def flaky_source():
+        raise ConnectionError("source unreachable")
+
+    breaker = CircuitBreaker("demo", failure_threshold=2, recovery_timeout=1.0)
+    for attempt in range(4):
+        try:
+            breaker.call(flaky_source)
+        except CircuitOpenError as e:
+            print(f"Attempt {attempt + 1}: short-circuited ({e})")
+        except ConnectionError as e:
+            print(f"Attempt {attempt + 1}: failed ({e})")
+    print(breaker.status())
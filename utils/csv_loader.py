@@ -0,0 +1,203 @@
+# utils/csv_loader.py
+import logging
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.sentiment_analysis import analyze_sentiment
+from utils.entity_tagger import tag_records
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+CSV_CHUNK_SIZE = 50_000 # Rows read, validated and scored at a time
+REQUIRED_CSV_COLUMNS = ['source', 'text', 'date']
+# Explicit dtypes: repeated source names share one categorical code table, and text stays in
+# Arrow buffers instead of one Python object per cell
+CSV_DTYPES = {
+    'source': 'category',
+    'title': 'string[pyarrow]',
+    'text': 'string[pyarrow]',
+    'date': 'string[pyarrow]', # Parsed to datetime64 during validation so bad values can be counted
+}
+MAX_REPORTED_INVALID_ROWS = 5 # Line numbers of invalid rows logged per chunk
+INPUT_FORMATS = ('csv', 'jsonl', 'parquet') # Record file formats iter_record_chunks reads
+
+def validate_chunk(chunk, first_line=2):
+    """
+    Drops rows that cannot be scored or stored and parses the date column.
+
+    A row is invalid if its source or text is missing/blank or its date cannot be parsed.
+
+    Args:
+        chunk (pandas.DataFrame): Rows as read from the CSV (see CSV_DTYPES).
+        first_line (int): File line number of the chunk's first row (for log messages).
+
+    Returns:
+        tuple: (valid rows with 'date' as datetime64, number of invalid rows).
+    """
+    chunk = chunk.reset_index(drop=True)
+    chunk['date'] = pd.to_datetime(chunk['date'], errors='coerce', format='ISO8601')
+    text_ok = chunk['text'].notna() & (chunk['text'].str.strip().str.len() > 0)
+    valid = text_ok & chunk['source'].notna() & chunk['date'].notna()
+
+    invalid_count = int((~valid).sum())
+    if invalid_count:
+        invalid_lines = (chunk.index[~valid][:MAX_REPORTED_INVALID_ROWS] + first_line).tolist()
+        logging.warning(f"Skipping {invalid_count} invalid CSV rows (missing source/text or bad date), e.g. lines {invalid_lines}.")
+        chunk = chunk[valid]
+    if 'title' in chunk.columns:
+        chunk['title'] = chunk['title'].fillna('')
+    else:
+        chunk['title'] = pd.Series('', index=chunk.index, dtype='string[pyarrow]')
+    return chunk, invalid_count
+
+def iter_csv_chunks(file_path, chunk_size=CSV_CHUNK_SIZE, stats=None):
+    """
+    Reads a CSV of records in typed chunks, validating each one.
+
+    Args:
+        file_path (str): CSV with 'source', 'text' and 'date' columns ('title' optional).
+        chunk_size (int): Rows per chunk.
+        stats (dict, optional): Filled with 'rows', 'invalid' and 'chunks' counts.
+
+    Yields:
+        pandas.DataFrame: Valid rows of one chunk, with categorical 'source', datetime64 'date'
+                          and Arrow-backed string 'title'/'text'.
+
+    Raises:
+        ValueError: If required columns are missing from the file.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, invalid=0, chunks=0)
+
+    header = pd.read_csv(file_path, nrows=0).columns
+    missing_columns = [column for column in REQUIRED_CSV_COLUMNS if column not in header]
+    if missing_columns:
+        raise ValueError(f"CSV file {file_path} is missing required columns: {missing_columns}")
+    columns = [column for column in CSV_DTYPES if column in header]
+
+    first_line = 2 # Line 1 is the header
+    reader = pd.read_csv(file_path, usecols=columns, dtype={column: CSV_DTYPES[column] for column in columns},
+                         chunksize=chunk_size)
+    for chunk in reader:
+        rows_read = len(chunk)
+        valid_chunk, invalid_count = validate_chunk(chunk, first_line)
+        first_line += rows_read
+        stats['rows'] += rows_read
+        stats['invalid'] += invalid_count
+        stats['chunks'] += 1
+        if not valid_chunk.empty:
+            yield valid_chunk
+
+def input_format(file_path):
+    """
+    Infers the record file format from its name: 'jsonl', 'parquet' or (otherwise) 'csv'.
+    """
+    name = file_path.lower()
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if name.endswith(('.parquet', '.pq')):
+        return 'parquet'
+    return 'csv'
+
+def iter_record_chunks(file_path, chunk_size=CSV_CHUNK_SIZE, stats=None, file_format=None):
+    """
+    Reads a CSV, JSON Lines or Parquet file of records in validated chunks.
+
+    Args:
+        file_path (str): File with 'source', 'text' and 'date' columns/fields ('title' optional).
+        chunk_size (int): Rows per chunk (Parquet is read in record batches of this size).
+        stats (dict, optional): Filled with 'rows', 'invalid' and 'chunks' counts.
+        file_format (str, optional): One of INPUT_FORMATS. Inferred from the file name if not given.
+
+    Yields:
+        pandas.DataFrame: Valid rows of one chunk (see iter_csv_chunks for the dtypes).
+
+    Raises:
+        ValueError: If the format is unknown or required columns are missing.
+    """
+    file_format = file_format or input_format(file_path)
+    if file_format not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format '{file_format}'. Choose one of {INPUT_FORMATS}.")
+    if file_format == 'csv':
+        yield from iter_csv_chunks(file_path, chunk_size, stats)
+        return
+
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, invalid=0, chunks=0)
+    if file_format == 'parquet':
+        parquet_file = pq.ParquetFile(file_path)
+        header = parquet_file.schema_arrow.names
+        columns = [column for column in CSV_DTYPES if column in header]
+        reader = (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns))
+    else:
+        header = None
+        reader = pd.read_json(file_path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False)
+
+    first_line = 1 if file_format == 'jsonl' else 0 # Parquet has no lines; rows are counted from 0
+    for chunk in reader:
+        missing_columns = [column for column in REQUIRED_CSV_COLUMNS if column not in (header or chunk.columns)]
+        if missing_columns:
+            raise ValueError(f"Input file {file_path} is missing required columns: {missing_columns}")
+        columns = [column for column in CSV_DTYPES if column in chunk.columns]
+        chunk = chunk[columns].astype({column: CSV_DTYPES[column] for column in columns if column != 'date'})
+        rows_read = len(chunk)
+        valid_chunk, invalid_count = validate_chunk(chunk, first_line)
+        first_line += rows_read
+        stats['rows'] += rows_read
+        stats['invalid'] += invalid_count
+        stats['chunks'] += 1
+        if not valid_chunk.empty:
+            yield valid_chunk
+
+def chunk_to_records(chunk):
+    """
+    Converts a validated chunk into record dictionaries (with 'date' as datetime.date),
+    the shape the tagger, the sentiment model and the stores take.
+    """
+    records = chunk.assign(date=chunk['date'].dt.date, source=chunk['source'].astype(str)).to_dict('records')
+    for record in records:
+        record['title'] = str(record['title'])
+        record['text'] = str(record['text'])
+    return records
+
+def iter_scored_csv_batches(file_path, chunk_size=CSV_CHUNK_SIZE, tagger=None, stats=None):
+    """
+    Streams a CSV through entity tagging and sentiment scoring one chunk at a time,
+    so only one chunk of records is in memory while a file of any size is processed.
+
+    Args:
+        file_path (str): CSV of records (see iter_csv_chunks).
+        chunk_size (int): Rows per chunk.
+        tagger (EntityTagger, optional): Tagger for the 'entities' field. Records are not tagged if not given.
+        stats (dict, optional): Filled with 'rows', 'invalid', 'chunks' and 'scored' counts.
+
+    Yields:
+        list: The scored records of one chunk.
+
+    Raises:
+        RuntimeError: If sentiment analysis returns nothing for a non-empty chunk (e.g. the model
+                      failed to load), so a failed run is never taken for a scored file.
+    """
+    stats = stats if stats is not None else {}
+    scored_total = 0
+    for chunk in iter_csv_chunks(file_path, chunk_size, stats):
+        records = chunk_to_records(chunk)
+        del chunk
+        if tagger is not None:
+            tag_records(records, tagger)
+        scored = analyze_sentiment(records)
+        if records and not scored:
+            raise RuntimeError("Sentiment analysis returned no results (see the log).")
+        scored_total += len(scored)
+        stats['scored'] = scored_total
+        yield scored
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    load_stats = {}
+    for batch in iter_csv_chunks("sample_sentiment_data.csv", chunk_size=5, stats=load_stats):
+        print(batch.dtypes.to_dict())
+        print(batch.head(2))
+    print(f"Load stats: {load_stats}")
@@ -0,0 +1,70 @@
+# utils/data_table.py
+import math
+import logging
+
+import streamlit as st
+
+from utils.filter_engine import SORTABLE_COLUMNS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+PAGE_SIZES = [25, 50, 100, 250] # Rows per page offered to the user
+DEFAULT_PAGE_SIZE = 50
+
+def render_paginated_table(fetch_page, total_rows, key, sort_columns=SORTABLE_COLUMNS):
+    """
+    Displays a sortable table one page at a time. Only the visible page is fetched and sent to the
+    browser, so the payload stays the same size however many rows match.
+
+    Args:
+        fetch_page (callable): fetch_page(sort_by, descending, offset, limit) -> pandas.DataFrame
+                               of at most `limit` rows, read from the backing store or frame.
+        total_rows (int): Number of rows across all pages.
+        key (str): Prefix for the widget keys, unique per table on the page.
+        sort_columns (list): Columns the user can sort by.
+    """
+    if total_rows <= 0:
+        st.info("No rows to display.")
+        return
+
+    col_sort, col_order, col_size, col_page = st.columns([2, 1, 1, 1])
+    with col_sort:
+        sort_by = st.selectbox("Sort by", sort_columns, key=f"{key}_sort_by")
+    with col_order:
+        descending = st.selectbox("Order", ["Ascending", "Descending"], key=f"{key}_order") == "Descending"
+    with col_size:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key}_page_size")
+
+    page_count = max(1, math.ceil(total_rows / page_size))
+    page_key = f"{key}_page"
+    # Clamp before the widget is created: the filters or page size may have shrunk the page count
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    with col_page:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key=page_key)
+
+    offset = (int(page) - 1) * page_size
+    page_frame = fetch_page(sort_by, descending, offset, page_size)
+    logging.info(f"Table '{key}': showing rows {offset + 1}-{offset + len(page_frame)} of {total_rows} sorted by {sort_by}.")
+    st.dataframe(page_frame, hide_index=True, use_container_width=True)
+    st.caption(f"Rows {offset + 1}–{offset + len(page_frame)} of {total_rows}")
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    import pandas as pd
+    from datetime import date, timedelta
+    from utils.filter_engine import sort_positions
+    sample_frame = pd.DataFrame({
+        'date': [date.today() - timedelta(days=i % 30) for i in range(1000)],
+        'source': ['RSS', 'Twitter'] * 500,
+        'sentiment': ['Positive', 'Neutral', 'Negative', 'Positive'] * 250,
+        'score': [(i % 97) / 97 for i in range(1000)],
+        'title': [f"Item {i}" for i in range(1000)],
+    })
+
+    def fetch_sample_page(sort_by, descending, offset, limit):
+        order = sort_positions(sample_frame, sort_by, descending)
+        return sample_frame.iloc[order[offset:offset + limit]]
+
+    render_paginated_table(fetch_sample_page, len(sample_frame), key="sample_table")
@@ -0,0 +1,191 @@
+# utils/entity_tagger.py
+import os
+import json
+from collections import deque
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Optional JSON watchlist overriding DEFAULT_WATCHLIST, in the same shape
+ENTITY_WATCHLIST_FILE = os.getenv('ENTITY_WATCHLIST_FILE', 'entities.json')
+
+# Entity id -> display name and aliases (matched case-insensitively on word boundaries)
+DEFAULT_WATCHLIST = {
+    'umo_eno': {
+        'name': 'Umo Eno',
+        'aliases': ['Governor Eno', 'Gov. Eno', 'Gov Eno', 'Pastor Umo Eno', 'Umo Bassey Eno', '#UmoEno']
+    },
+    'akon_eyakenyi': {
+        'name': 'Akon Eyakenyi',
+        'aliases': ['Deputy Governor Eyakenyi', 'Senator Akon Eyakenyi']
+    },
+    'akwa_ibom_government': {
+        'name': 'Akwa Ibom State Government',
+        'aliases': ['AKSG', 'Akwa Ibom government', 'Akwa Ibom State government']
+    },
+    'arise_agenda': {
+        'name': 'ARISE Agenda',
+        'aliases': ['#ARISEAgenda']
+    },
+    'ibom_air': {
+        'name': 'Ibom Air',
+        'aliases': ['IbomAir', '#IbomAir']
+    },
+    'ibom_deep_seaport': {
+        'name': 'Ibom Deep Seaport',
+        'aliases': ['Ibom Deep Sea Port', 'Ibom seaport']
+    },
+    'victor_attah_airport': {
+        'name': 'Victor Attah International Airport',
+        'aliases': ['Victor Attah Airport', 'Uyo airport']
+    },
+    'ministry_of_works': {
+        'name': 'Ministry of Works',
+        'aliases': ['Works Ministry', 'Commissioner for Works']
+    },
+    'ministry_of_health': {
+        'name': 'Ministry of Health',
+        'aliases': ['Health Ministry', 'Commissioner for Health']
+    },
+    'ministry_of_education': {
+        'name': 'Ministry of Education',
+        'aliases': ['Education Ministry', 'Commissioner for Education']
+    },
+}
+
+def load_watchlist(watchlist_path=ENTITY_WATCHLIST_FILE):
+    """
+    Loads the entity watchlist from a JSON file, or returns DEFAULT_WATCHLIST if it does not exist.
+
+    Args:
+        watchlist_path (str): Path to a JSON object mapping entity ids to {'name', 'aliases'}.
+
+    Returns:
+        dict: Entity id -> {'name': str, 'aliases': list}.
+    """
+    if not os.path.exists(watchlist_path):
+        return DEFAULT_WATCHLIST
+    with open(watchlist_path, 'r', encoding='utf-8') as f:
+        watchlist = json.load(f)
+    logging.info(f"Loaded {len(watchlist)} watchlist entities from {watchlist_path}.")
+    return watchlist
+
+class EntityTagger:
+    """
+    Aho-Corasick automaton over every name and alias in a watchlist.
+
+    tag() finds all watched entities in a text in a single pass over its
+    characters, independent of how many entities and aliases are watched.
+    """
+
+    def __init__(self, watchlist):
+        self.watchlist = watchlist
+        self._goto = [{}] # State -> {character: next state}
+        self._fail = [0] # State -> failure link
+        self._output = [[]] # State -> [(entity_id, alias length)] ending at this state
+        for entity_id, spec in watchlist.items():
+            for alias in [spec['name']] + list(spec.get('aliases', [])):
+                if alias:
+                    self._add_alias(alias.lower(), entity_id)
+        self._build_failure_links()
+
+    def _add_alias(self, alias, entity_id):
+        state = 0
+        for char in alias:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((entity_id, len(alias)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def tag(self, text):
+        """
+        Returns the ids of the watched entities mentioned in a text.
+
+        Matches are case-insensitive and must start and end on word boundaries, so
+        'Eno' does not match inside 'Enough'.
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            list: Matched entity ids, in order of first mention, without repeats.
+        """
+        if not isinstance(text, str) or not text:
+            return []
+        lowered = text.lower()
+        matched = {}
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for entity_id, length in self._output[state]:
+                start = position - length + 1
+                before_ok = start == 0 or not lowered[start - 1].isalnum()
+                after_ok = position + 1 == len(lowered) or not lowered[position + 1].isalnum()
+                if before_ok and after_ok and entity_id not in matched:
+                    matched[entity_id] = start
+        return sorted(matched, key=matched.get)
+
+    def entity_name(self, entity_id):
+        """
+        Returns the display name of an entity id (the id itself if unknown).
+        """
+        return self.watchlist.get(entity_id, {}).get('name', entity_id)
+
+def tag_records(records, tagger):
+    """
+    Adds an 'entities' list (matched entity ids) to each record, in place.
+
+    Both 'title' and 'text' are scanned.
+
+    Args:
+        records (list): Record dictionaries.
+        tagger (EntityTagger): The compiled watchlist.
+
+    Returns:
+        list: The same records.
+    """
+    for record in records:
+        record['entities'] = tagger.tag(f"{record.get('title') or ''}\n{record.get('text') or ''}")
+    return records
+
+_default_tagger = None
+
+def get_default_tagger():
+    """
+    Returns a process-wide tagger compiled from load_watchlist(), building it on first use.
+    """
+    global _default_tagger
+    if _default_tagger is None:
+        _default_tagger = EntityTagger(load_watchlist())
+    return _default_tagger
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    tagger = get_default_tagger()
+    sample_texts = [
+        "Governor Umo Eno flags off the Ibom Air maintenance hangar in Uyo.",
+        "Residents question the Ministry of Works over delays at the Ibom Deep Seaport road.",
+        "Enough is enough: no entity should match in this sentence.",
+    ]
+    for sample_text in sample_texts:
+        print(f"{tagger.tag(sample_text)} <- {sample_text}")
@@ -0,0 +1,156 @@
+# utils/export_writer.py
+import os
+import uuid
+import hashlib
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_EXPORT_DIR = os.path.join('data', 'exports')
+EXPORT_CHUNK_ROWS = 50000 # Rows read, converted and written per step
+MAX_EXPORT_FILES = 16 # Prepared exports kept on disk (least recently used removed first)
+
+# Label shown to the user -> (writer, compression, file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV (gzip)': ('csv', 'gzip', 'csv.gz', 'application/gzip'),
+    'CSV (zstd)': ('csv', 'zstd', 'csv.zst', 'application/zstd'),
+    'Parquet': ('parquet', 'zstd', 'parquet', 'application/vnd.apache.parquet'),
+    'JSON Lines (gzip)': ('jsonl', 'gzip', 'jsonl.gz', 'application/gzip'),
+}
+
+EXPORT_SCHEMA = pa.schema([
+    ('source', pa.string()),
+    ('title', pa.string()),
+    ('text', pa.string()),
+    ('date', pa.date32()),
+    ('sentiment', pa.string()),
+    ('score', pa.float64()),
+    ('entities', pa.list_(pa.string())),
+])
+
+def iter_frame_chunks(frame, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Yields consecutive slices of an in-memory view frame (slices share the frame's data).
+    """
+    for start in range(0, len(frame), chunk_size):
+        yield frame.iloc[start:start + chunk_size]
+
+def _export_table(chunk):
+    # Same values as the dashboard view: calendar dates and scores rounded to 4 places
+    dates = pa.array(pd.to_datetime(chunk['date'], errors='coerce'), from_pandas=True)
+    columns = {name: pa.array(chunk[name].astype(object), type=pa.string(), from_pandas=True)
+               for name in ('source', 'title', 'text', 'sentiment')}
+    columns['date'] = dates.cast(pa.date32(), safe=False)
+    columns['score'] = pa.array(chunk['score'].astype(float).round(4), type=pa.float64(), from_pandas=True)
+    columns['entities'] = pa.array([list(value) if isinstance(value, (list, tuple)) else [] for value in chunk['entities']],
+                                   type=pa.list_(pa.string()))
+    return pa.table({field.name: columns[field.name] for field in EXPORT_SCHEMA}, schema=EXPORT_SCHEMA)
+
+def write_export(chunks, path, format_label):
+    """
+    Writes the rows of an iterable of view-frame chunks to a compressed export file, one chunk at
+    a time. The file is written under a temporary name and moved into place when complete.
+
+    Args:
+        chunks (iterable): pandas.DataFrame chunks with the view columns.
+        path (str): Destination file.
+        format_label (str): A key of EXPORT_FORMATS.
+
+    Returns:
+        int: Number of rows written.
+
+    Raises:
+        ValueError: If format_label is not a known export format.
+    """
+    if format_label not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{format_label}'. Choose one of {list(EXPORT_FORMATS)}.")
+    writer_kind, compression, _, _ = EXPORT_FORMATS[format_label]
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp" # Unique, so concurrent sessions never share one
+    rows = 0
+    try:
+        if writer_kind == 'parquet':
+            with pq.ParquetWriter(tmp_path, EXPORT_SCHEMA, compression=compression) as writer:
+                for chunk in chunks:
+                    writer.write_table(_export_table(chunk))
+                    rows += len(chunk)
+        else:
+            with pa.CompressedOutputStream(tmp_path, compression) as sink:
+                if writer_kind == 'csv':
+                    # CSV has no list type, so entity ids are joined with ';'
+                    csv_schema = EXPORT_SCHEMA.set(EXPORT_SCHEMA.get_field_index('entities'), pa.field('entities', pa.string()))
+                    with pacsv.CSVWriter(sink, csv_schema) as writer:
+                        for chunk in chunks:
+                            table = _export_table(chunk)
+                            entities = pa.array([';'.join(value) for value in table['entities'].to_pylist()], type=pa.string())
+                            writer.write_table(table.set_column(table.schema.get_field_index('entities'), 'entities', entities))
+                            rows += len(chunk)
+                else:
+                    for chunk in chunks:
+                        table = _export_table(chunk)
+                        # ISO date strings, then one vectorized JSON encode per chunk
+                        table = table.set_column(table.schema.get_field_index('date'), 'date', table['date'].cast(pa.string()))
+                        if table.num_rows:
+                            sink.write(table.to_pandas().to_json(orient='records', lines=True, force_ascii=False).rstrip('\n').encode('utf-8') + b'\n')
+                        rows += len(chunk)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return rows
+
+def _prune_exports(export_dir, keep_path):
+    files = [os.path.join(export_dir, name) for name in os.listdir(export_dir) if not name.endswith('.tmp')]
+    files.sort(key=os.path.getmtime, reverse=True)
+    for old_path in [path for path in files if path != keep_path][MAX_EXPORT_FILES - 1:]:
+        try:
+            os.remove(old_path)
+        except OSError as e:
+            logging.warning(f"Could not remove old export '{old_path}': {e}")
+
+def prepare_export(key, format_label, chunk_factory, export_dir=DEFAULT_EXPORT_DIR):
+    """
+    Returns the export file for a view, writing it first unless it was already prepared.
+
+    Args:
+        key (hashable): Dataset version plus filters; exports are kept on disk under a hash of it.
+        format_label (str): A key of EXPORT_FORMATS.
+        chunk_factory (callable): Returns a fresh iterable of view-frame chunks (see write_export).
+        export_dir (str): Directory holding prepared exports.
+
+    Returns:
+        str: Path of the export file.
+    """
+    _, _, extension, _ = EXPORT_FORMATS[format_label]
+    os.makedirs(export_dir, exist_ok=True)
+    digest = hashlib.sha1(repr((key, format_label)).encode('utf-8')).hexdigest()[:16]
+    path = os.path.join(export_dir, f"export_{digest}.{extension}")
+    if os.path.exists(path):
+        os.utime(path) # Mark as recently used
+        return path
+    rows = write_export(chunk_factory(), path, format_label)
+    logging.info(f"Prepared {format_label} export of {rows} rows: '{path}' ({os.path.getsize(path)} bytes).")
+    _prune_exports(export_dir, path)
+    return path
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    from datetime import date, timedelta
+    sample_frame = pd.DataFrame({
+        'source': ['RSS', 'Twitter'] * 500,
+        'title': [f"Item {i}" for i in range(1000)],
+        'text': [f"Item {i} about the new road in Uyo" for i in range(1000)],
+        'date': pd.to_datetime([date.today() - timedelta(days=i % 30) for i in range(1000)]),
+        'sentiment': ['Positive', 'Neutral', 'Negative', 'Positive'] * 250,
+        'score': [(i % 97) / 97 for i in range(1000)],
+        'entities': [['umo_eno'] if i % 5 == 0 else [] for i in range(1000)],
+    })
+    for sample_format in EXPORT_FORMATS:
+        sample_path = prepare_export('sample', sample_format, lambda: iter_frame_chunks(sample_frame, 300))
+        print(f"{sample_format}: {sample_path} ({os.path.getsize(sample_path)} bytes)")
@@ -1,10 +1,66 @@
 # utils/fetch_rss.py
 import feedparser
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date, timedelta
 import logging
 
+from utils.http_cache import cached_get
+from utils.circuit_breaker import CircuitOpenError, get_breaker
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Nigerian outlets monitored by default when no feed list/config file is supplied.
+DEFAULT_RSS_FEEDS = [
+    "https://punchng.com/feed/",
+    "https://www.vanguardngr.com/feed/",
+    "https://guardian.ng/feed/",
+    "https://www.premiumtimesng.com/feed",
+    "https://dailypost.ng/feed/",
+    "https://www.thisdaylive.com/index.php/feed/",
+    "https://www.channelstv.com/feed/",
+    "https://thenationonlineng.net/feed/",
+]
+
+RSS_FETCH_TIMEOUT = 10 # Seconds allowed per feed before it is reported as failed
+RSS_MAX_WORKERS = 16 # Upper bound on feeds fetched in parallel
+RSS_USER_AGENT = "Mozilla/5.0 (compatible; AkwaIbomSentimentTracker/1.0)"
+
+def _parse_feed_entries(feed):
+    """
+    Converts the entries of a parsed feed into article dictionaries.
+
+    Args:
+        feed (feedparser.FeedParserDict): A feed returned by feedparser.parse.
+
+    Returns:
+        list: A list of (dedup_key, link, article) tuples. The dedup key is the entry's
+              guid/id, falling back to its link and then its title.
+    """
+    parsed_articles = []
+    for entry in feed.entries:
+        try:
+            published_date = None
+            if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                # Ensure it's a date object
+                published_date = datetime(*entry.published_parsed[:6]).date()
+            else:
+                published_date = date.today() - timedelta(days=5) # Default to a recent past date
+                logging.warning(f"No publish date found for RSS entry: {entry.title}. Using a default past date.")
+
+            dedup_key = entry.get('id') or entry.get('link') or entry.title
+            parsed_articles.append((dedup_key, entry.get('link'), {
+                'source': 'RSS',
+                'title': entry.title,
+                'text': entry.summary if hasattr(entry, 'summary') else entry.title,
+                'date': published_date
+            }))
+        except Exception as e:
+            logging.error(f"Error processing RSS entry '{entry.title if hasattr(entry, 'title') else 'N/A'}': {e}")
+            continue
+    return parsed_articles
+
 def get_rss_articles(rss_feed_url="https://punchng.com/feed/"):
     """
     Fetches articles from an RSS feed and formats them.
@@ -18,45 +74,204 @@ def get_rss_articles(rss_feed_url="https://punchng.com/feed/"):
         list: A list of dictionaries, where each dictionary represents an RSS article
               with 'source', 'title', 'text', and 'date' fields.
     """
-    articles = []
-    
     # --- Attempt to fetch real RSS data ---
     try:
         logging.info(f"Attempting to fetch RSS articles from: {rss_feed_url}")
-        feed = feedparser.parse(rss_feed_url)
-        if feed.bozo:
-            logging.warning(f"Bozo bit set for RSS feed {rss_feed_url}: {feed.bozo_exception}")
-
-        if feed.entries:
-            for entry in feed.entries:
-                try:
-                    published_date = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        # Ensure it's a date object
-                        published_date = datetime(*entry.published_parsed[:6]).date()
-                    else:
-                        published_date = date.today() - timedelta(days=5) # Default to a recent past date
-                        logging.warning(f"No publish date found for RSS entry: {entry.title}. Using a default past date.")
-
-                    articles.append({
-                        'source': 'RSS',
-                        'title': entry.title,
-                        'text': entry.summary if hasattr(entry, 'summary') else entry.title,
-                        'date': published_date
-                    })
-                except Exception as e:
-                    logging.error(f"Error processing RSS entry '{entry.title if hasattr(entry, 'title') else 'N/A'}': {e}")
-                    continue
-            if articles: # Only return if actual articles were fetched
-                logging.info(f"Successfully fetched {len(articles)} articles from RSS.")
-                return articles
-            else:
-                logging.warning("No valid entries found in the fetched RSS feed, falling back to dummy.")
+        parsed_articles = get_breaker(f"RSS {rss_feed_url}").call(_download_feed, rss_feed_url, RSS_FETCH_TIMEOUT)
+        articles = [article for _, _, article in parsed_articles]
+        if articles: # Only return if actual articles were fetched
+            logging.info(f"Successfully fetched {len(articles)} articles from RSS.")
+            return articles
+        else:
+            logging.warning("No valid entries found in the fetched RSS feed, falling back to dummy.")
 
+    except CircuitOpenError as e:
+        # The feed is known to be down: skip the request and serve the last good articles if any
+        logging.warning(f"Skipping RSS feed {rss_feed_url}: {e}")
+        if e.last_good:
+            return [article for _, _, article in e.last_good]
     except Exception as e:
         logging.error(f"Failed to fetch or parse RSS feed from {rss_feed_url}: {e}. Falling back to dummy data.")
 
     # --- Fallback to richer dummy data if real fetch fails or yields no entries ---
+    return _get_dummy_rss_articles()
+
+def load_feed_list(config_path):
+    """
+    Loads a list of RSS feed URLs from a config file.
+
+    Two formats are supported: a JSON file holding a list of URLs (or of objects
+    with a 'url' key), and a plain text file with one URL per line where blank
+    lines and lines starting with '#' are ignored.
+
+    Args:
+        config_path (str): Path to the feed list file.
+
+    Returns:
+        list: The feed URLs, in file order and without duplicates.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    if config_path.lower().endswith('.json'):
+        entries = json.loads(content)
+        feeds = [entry['url'] if isinstance(entry, dict) else entry for entry in entries]
+    else:
+        feeds = [line.strip() for line in content.splitlines()
+                 if line.strip() and not line.strip().startswith('#')]
+
+    feeds = list(dict.fromkeys(feeds)) # Drop repeated URLs, keep order
+    logging.info(f"Loaded {len(feeds)} RSS feeds from {config_path}.")
+    return feeds
+
+def _download_feed(rss_feed_url, timeout):
+    """
+    Downloads and parses one feed.
+
+    Args:
+        rss_feed_url (str): The URL of the RSS feed.
+        timeout (float): Connect/read timeout in seconds for the HTTP request.
+
+    Returns:
+        list: The output of _parse_feed_entries.
+
+    Raises:
+        Exception: If the request fails or the response is not a parseable feed.
+    """
+    response = cached_get(rss_feed_url, timeout=timeout, headers={'User-Agent': RSS_USER_AGENT})
+    response.raise_for_status()
+    feed = feedparser.parse(response.content)
+    if feed.bozo:
+        if not feed.entries:
+            raise ValueError(f"Unparseable feed: {feed.bozo_exception}")
+        logging.warning(f"Bozo bit set for RSS feed {rss_feed_url}: {feed.bozo_exception}")
+    return _parse_feed_entries(feed)
+
+def _fetch_single_feed(rss_feed_url, timeout):
+    """
+    Downloads and parses one feed through its circuit breaker, timing the round trip.
+
+    If the feed's breaker is open the request is skipped and the feed's last good
+    entries (if any) are returned, with the error recorded in the stats.
+
+    Args:
+        rss_feed_url (str): The URL of the RSS feed.
+        timeout (float): Connect/read timeout in seconds for the HTTP request.
+
+    Returns:
+        tuple: (parsed_articles, stats) where parsed_articles is the output of
+               _parse_feed_entries and stats describes the fetch.
+    """
+    stats = {'feed': rss_feed_url, 'entries': 0, 'latency': None, 'error': None}
+    parsed_articles = []
+    start = time.perf_counter()
+    try:
+        parsed_articles = get_breaker(f"RSS {rss_feed_url}").call(_download_feed, rss_feed_url, timeout)
+    except CircuitOpenError as e:
+        logging.warning(f"Skipping RSS feed {rss_feed_url}: {e}")
+        stats['error'] = str(e)
+        parsed_articles = e.last_good or []
+    except Exception as e:
+        logging.error(f"Failed to fetch or parse RSS feed from {rss_feed_url}: {e}")
+        stats['error'] = str(e)
+    stats['entries'] = len(parsed_articles)
+    stats['latency'] = round(time.perf_counter() - start, 3)
+    return parsed_articles, stats
+
+def iter_rss_feed_results(feeds, max_workers=RSS_MAX_WORKERS, timeout=RSS_FETCH_TIMEOUT):
+    """
+    Fetches a set of feeds concurrently and yields each feed's result as soon as it completes.
+
+    Args:
+        feeds (list): RSS feed URLs.
+        max_workers (int): Maximum number of feeds fetched in parallel.
+        timeout (float): Per-feed HTTP timeout in seconds.
+
+    Yields:
+        tuple: (parsed_articles, stats) for each feed, in completion order.
+    """
+    if not feeds:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(feeds)))) as executor:
+        futures = [executor.submit(_fetch_single_feed, url, timeout) for url in feeds]
+        for future in as_completed(futures):
+            yield future.result()
+
+def iter_rss_articles_from_feeds(feeds=None, config_path=None, max_workers=RSS_MAX_WORKERS,
+                                 timeout=RSS_FETCH_TIMEOUT, fallback_to_dummy=True, feed_stats=None):
+    """
+    Fetches articles from many RSS feeds concurrently, yielding each feed's new
+    articles as soon as that feed completes.
+
+    Feeds are fetched with bounded parallelism, so wall time grows with
+    len(feeds) / max_workers rather than with the number of feeds. Entries
+    carried by more than one outlet are deduplicated by guid and link.
+
+    Args:
+        feeds (list, optional): RSS feed URLs. Defaults to DEFAULT_RSS_FEEDS.
+        config_path (str, optional): Feed list file (see load_feed_list). Used when feeds is not given.
+        max_workers (int): Maximum number of feeds fetched in parallel.
+        timeout (float): Per-feed HTTP timeout in seconds.
+        fallback_to_dummy (bool): Yield the dummy articles if no feed yields any entries.
+        feed_stats (list, optional): If given, one dictionary per feed holding 'feed', 'entries',
+                                     'duplicates', 'latency' (seconds) and 'error' is appended to it.
+
+    Yields:
+        dict: An article with 'source', 'title', 'text' and 'date' fields.
+    """
+    if feeds is None:
+        feeds = load_feed_list(config_path) if config_path else DEFAULT_RSS_FEEDS
+    if feed_stats is None:
+        feed_stats = []
+
+    logging.info(f"Fetching {len(feeds)} RSS feeds with up to {max_workers} workers (timeout {timeout}s).")
+    start = time.perf_counter()
+    article_count = 0
+    seen_keys = set()
+
+    for parsed_articles, stats in iter_rss_feed_results(feeds, max_workers=max_workers, timeout=timeout):
+        duplicates = 0
+        for dedup_key, link, article in parsed_articles:
+            if dedup_key in seen_keys or (link and link in seen_keys):
+                duplicates += 1
+                continue
+            seen_keys.add(dedup_key)
+            if link:
+                seen_keys.add(link)
+            article_count += 1
+            yield article
+        stats['duplicates'] = duplicates
+        feed_stats.append(stats)
+
+    failed = sum(1 for stats in feed_stats if stats['error'])
+    logging.info(f"Fetched {article_count} unique RSS articles from {len(feeds) - failed}/{len(feeds)} feeds "
+                 f"in {time.perf_counter() - start:.2f}s.")
+
+    if not article_count and fallback_to_dummy:
+        logging.warning("No entries fetched from any RSS feed, falling back to dummy.")
+        yield from _get_dummy_rss_articles()
+
+def get_rss_articles_from_feeds(feeds=None, config_path=None, max_workers=RSS_MAX_WORKERS,
+                                timeout=RSS_FETCH_TIMEOUT, fallback_to_dummy=True):
+    """
+    Fetches articles from many RSS feeds concurrently and merges them.
+    See iter_rss_articles_from_feeds for the arguments.
+
+    Returns:
+        tuple: (articles, feed_stats). articles is a list of dictionaries with 'source',
+               'title', 'text' and 'date' fields. feed_stats is a list with one dictionary
+               per feed holding 'feed', 'entries', 'duplicates', 'latency' (seconds) and 'error'.
+    """
+    feed_stats = []
+    articles = list(iter_rss_articles_from_feeds(feeds, config_path=config_path, max_workers=max_workers,
+                                                 timeout=timeout, fallback_to_dummy=fallback_to_dummy,
+                                                 feed_stats=feed_stats))
+    return articles, feed_stats
+
+def _get_dummy_rss_articles():
+    """
+    Returns the dummy RSS articles used when real fetching fails.
+    """
     logging.info("Falling back to richer dummy RSS data for testing.")
     today = date.today()
     dummy_articles = [
@@ -129,3 +344,10 @@ if __name__ == "__main__":
     sample_articles = get_rss_articles()
     for article in sample_articles[:10]: # Print first 10 for brevity
         print(f"Source: {article['source']}, Date: {article['date']}, Title: {article['title'][:70]}...")
+
+    print("\nFetching from the default multi-outlet feed set...")
+    merged_articles, stats_per_feed = get_rss_articles_from_feeds()
+    for stats in stats_per_feed:
+        print(f"Feed: {stats['feed']}, Entries: {stats['entries']}, Duplicates: {stats['duplicates']}, "
+              f"Latency: {stats['latency']}s, Error: {stats['error']}")
+    print(f"Total unique articles: {len(merged_articles)}")
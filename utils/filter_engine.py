@@ -0,0 +1,270 @@
+# utils/filter_engine.py
+from datetime import timedelta
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.inverted_index import InvertedIndex
+from utils.record_store import ROLLUP_KEY_COLUMNS, filter_rollups, rollup_frame
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Columns of the filtered view handed to metrics, charts and exports
+VIEW_COLUMNS = ['source', 'title', 'text', 'date', 'sentiment', 'score', 'entities']
+SENTIMENT_CATEGORIES = ['Positive', 'Neutral', 'Negative']
+SORTABLE_COLUMNS = ['date', 'source', 'sentiment', 'score', 'title'] # Columns a paged table can be ordered by
+
+def to_view_frame(data):
+    """
+    Converts records (or a frame of them) into the column layout of a filtered view:
+    VIEW_COLUMNS, with 'date' as datetime64 and 'entities' as lists.
+    """
+    frame = pd.DataFrame(data) if not isinstance(data, pd.DataFrame) else data.copy()
+    for column in VIEW_COLUMNS:
+        if column not in frame.columns:
+            frame[column] = [[] for _ in range(len(frame))] if column == 'entities' else None
+    frame['date'] = pd.to_datetime(frame['date'], errors='coerce')
+    frame['entities'] = frame['entities'].map(lambda value: list(value) if isinstance(value, (list, tuple, np.ndarray)) else [])
+    return frame[VIEW_COLUMNS]
+
+def text_hashes(texts):
+    """
+    Returns a 64-bit hash of each text (numpy.uint64 array), e.g. for distinct-count sketches.
+    """
+    return pd.util.hash_pandas_object(pd.Series(texts).fillna('').astype(str), index=False).to_numpy()
+
+def sort_positions(frame, sort_by='date', descending=False):
+    """
+    Returns the row positions of a view frame ordered by one column (stable; missing values last),
+    so a page of it can be taken without sorting the frame itself.
+
+    Raises:
+        ValueError: If sort_by is not one of SORTABLE_COLUMNS.
+    """
+    if sort_by not in SORTABLE_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort_by}'. Choose one of {SORTABLE_COLUMNS}.")
+    values = frame[sort_by].reset_index(drop=True)
+    return values.sort_values(ascending=not descending, kind='stable', na_position='last').index.to_numpy()
+
+class RecordFrame:
+    """
+    Columnar, filter-ready copy of a set of scored records.
+
+    Built once per dataset: rows are sorted by date so a date range is a binary-searched slice,
+    source and sentiment are categoricals (filters compare integer codes), each entity id maps to
+    the sorted row positions that mention it, and keyword queries go through an inverted index of
+    the text (built on the first keyword query, then kept up to date by append). Aggregates come
+    from a rollup cube of the rows (see utils.record_store.rollup_frame), also kept up to date.
+
+    A frame may be shared by several threads: appends, filters and the lazy builds hold self.lock.
+    Row positions stay valid until generation changes (an append of older records reorders the rows).
+    """
+
+    def __init__(self, records):
+        self.lock = threading.RLock()
+        self.generation = 0
+        frame = to_view_frame(records)
+        frame = frame[frame['date'].notna()].sort_values('date', kind='stable').reset_index(drop=True)
+        frame['source'] = frame['source'].astype(str).astype('category')
+        frame['sentiment'] = pd.Categorical(frame['sentiment'], categories=SENTIMENT_CATEGORIES)
+        self.frame = frame
+        self.dates = frame['date'].to_numpy()
+        self.entity_rows = {}
+        self._index_entities(frame['entities'], 0)
+        self._keyword_index = None
+        self._doc_rows = None # Row position of each keyword index doc id, once rows were reordered
+        self._cube = None
+        self._text_hashes = None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _index_entities(self, entity_lists, first_position):
+        new_rows = {}
+        for position, entity_ids in enumerate(entity_lists, start=first_position):
+            for entity_id in entity_ids:
+                new_rows.setdefault(entity_id, []).append(position)
+        for entity_id, rows in new_rows.items():
+            rows = np.asarray(rows, dtype=np.int64)
+            existing = self.entity_rows.get(entity_id)
+            self.entity_rows[entity_id] = rows if existing is None else np.concatenate([existing, rows])
+
+    @property
+    def keyword_index(self):
+        """The InvertedIndex of the text column (doc ids are row positions, see _doc_rows), built on first use."""
+        if self._keyword_index is None:
+            with self.lock:
+                if self._keyword_index is None:
+                    self._doc_rows = None
+                    self._keyword_index = InvertedIndex(self.frame['text'].fillna('').astype(str).tolist())
+                    logging.info(f"Built keyword index: {len(self._keyword_index.postings)} tokens over {len(self.frame)} rows.")
+        return self._keyword_index
+
+    @property
+    def cube(self):
+        """Rollup cells (date, source, sentiment, score bin -> count, score sum) of all rows, built on first use."""
+        if self._cube is None:
+            with self.lock:
+                if self._cube is None:
+                    self._cube = rollup_frame(self.frame)
+        return self._cube
+
+    @property
+    def text_hashes(self):
+        """64-bit hashes of the text column (see text_hashes), computed on first use."""
+        if self._text_hashes is None:
+            with self.lock:
+                if self._text_hashes is None:
+                    self._text_hashes = text_hashes(self.frame['text'])
+        return self._text_hashes
+
+    def rollups(self, start_date=None, end_date=None, sources=None, sentiments=None):
+        """
+        Returns the cube cells matching the date, source and sentiment filters (see filter_positions).
+        Keyword and entity filters cannot be answered from the cube.
+        """
+        with self.lock:
+            cube = self.cube
+        return filter_rollups(cube, start_date=start_date, end_date=end_date, sources=sources, sentiments=sentiments)
+
+    def append(self, records):
+        """
+        Adds records to the frame, extending the entity and keyword indexes, the text hashes and the
+        cube that were already built. Records older than the newest row are merged into date order:
+        the indexes then follow the moved rows instead of being rebuilt, and generation is bumped.
+
+        Args:
+            records (list or pandas.DataFrame): The records to add.
+        """
+        new_frame = to_view_frame(records)
+        new_frame = new_frame[new_frame['date'].notna()].sort_values('date', kind='stable')
+        if new_frame.empty:
+            return
+
+        with self.lock:
+            first_position = len(self.frame)
+            frame = pd.concat([self.frame.astype({'source': str}), new_frame.astype({'source': str})], ignore_index=True)
+            frame['source'] = frame['source'].astype('category')
+            frame['sentiment'] = pd.Categorical(frame['sentiment'], categories=SENTIMENT_CATEGORIES)
+            order = None
+            if first_position and new_frame['date'].iloc[0] < self.frame['date'].iloc[-1]:
+                order = np.argsort(frame['date'].to_numpy(), kind='stable')
+                frame = frame.take(order).reset_index(drop=True)
+                moved_to = np.empty(len(order), dtype=np.int64) # Position of each concatenated row once sorted
+                moved_to[order] = np.arange(len(order))
+
+            self._index_entities(new_frame['entities'], first_position)
+            if self._keyword_index is not None:
+                self._keyword_index.add(new_frame['text'].fillna('').astype(str).tolist())
+                if order is not None or self._doc_rows is not None:
+                    doc_rows = self._doc_rows if self._doc_rows is not None else np.arange(first_position)
+                    doc_rows = np.concatenate([doc_rows, np.arange(first_position, len(frame))])
+                    self._doc_rows = doc_rows if order is None else moved_to[doc_rows]
+            if self._text_hashes is not None:
+                self._text_hashes = np.concatenate([self._text_hashes, text_hashes(new_frame['text'])])
+                if order is not None:
+                    self._text_hashes = self._text_hashes[order]
+            if self._cube is not None:
+                # Merging cells costs as much as the cube has cells, whatever the number of rows behind them
+                self._cube = (pd.concat([self._cube, rollup_frame(new_frame)], ignore_index=True)
+                              .groupby(ROLLUP_KEY_COLUMNS, as_index=False, observed=True)[['count', 'score_sum']].sum())
+            if order is not None:
+                self.entity_rows = {entity_id: np.sort(moved_to[rows]) for entity_id, rows in self.entity_rows.items()}
+                self.generation += 1
+            self.frame = frame
+            self.dates = frame['date'].to_numpy()
+
+    def _date_bounds(self, start_date, end_date):
+        start = np.searchsorted(self.dates, np.datetime64(start_date, 'D').astype(self.dates.dtype), side='left') if start_date else 0
+        end = (np.searchsorted(self.dates, np.datetime64(end_date + timedelta(days=1), 'D').astype(self.dates.dtype), side='left')
+               if end_date else len(self.dates))
+        return int(start), int(end)
+
+    def filter_positions(self, start_date=None, end_date=None, sources=None, sentiments=None, keyword=None, entities=None):
+        """
+        Returns the row positions matching all filters, in date order.
+
+        Args:
+            start_date (date, optional): First date to include.
+            end_date (date, optional): Last date to include.
+            sources (list, optional): Source names to include.
+            sentiments (list, optional): Sentiment labels to include. No filter if empty.
+            keyword (str, optional): Keyword query (see utils.inverted_index.parse_keyword_query):
+                                     words must all appear in the text, case-insensitively, with
+                                     'OR' alternatives, "quoted phrases" and 'prefix*' words.
+            entities (list, optional): Entity ids; rows mentioning any of them match.
+
+        Returns:
+            numpy.ndarray: Sorted integer row positions into self.frame.
+        """
+        with self.lock:
+            return self._filter_positions(start_date, end_date, sources, sentiments, keyword, entities)
+
+    def _filter_positions(self, start_date, end_date, sources, sentiments, keyword, entities):
+        start, end = self._date_bounds(start_date, end_date)
+        mask = np.ones(max(end - start, 0), dtype=bool)
+
+        if sources is not None:
+            source_codes = [self.frame['source'].cat.categories.get_loc(source)
+                            for source in sources if source in self.frame['source'].cat.categories]
+            mask &= np.isin(self.frame['source'].cat.codes.to_numpy()[start:end], source_codes)
+        if sentiments and set(sentiments) != set(SENTIMENT_CATEGORIES):
+            sentiment_codes = [SENTIMENT_CATEGORIES.index(sentiment) for sentiment in sentiments if sentiment in SENTIMENT_CATEGORIES]
+            mask &= np.isin(self.frame['sentiment'].cat.codes.to_numpy()[start:end], sentiment_codes)
+        if entities:
+            entity_mask = np.zeros_like(mask)
+            for entity_id in entities:
+                rows = self.entity_rows.get(entity_id)
+                if rows is not None:
+                    rows = rows[(rows >= start) & (rows < end)]
+                    entity_mask[rows - start] = True
+            mask &= entity_mask
+        if keyword and mask.any():
+            rows = self.keyword_index.search(keyword)
+            if rows is not None:
+                if self._doc_rows is not None:
+                    rows = np.sort(self._doc_rows[rows])
+                rows = rows[(rows >= start) & (rows < end)]
+                keyword_mask = np.zeros_like(mask)
+                keyword_mask[rows - start] = True
+                mask &= keyword_mask
+
+        return np.flatnonzero(mask) + start
+
+    def filter(self, **filters):
+        """
+        Returns the filtered view (see filter_positions for the filters) as a DataFrame with VIEW_COLUMNS.
+        Its index holds the row positions; attrs['generation'] the generation they belong to.
+        """
+        with self.lock:
+            view = self.frame.take(self.filter_positions(**filters))
+            view.attrs['generation'] = self.generation
+            return view
+
+    def text_hashes_at(self, positions, generation):
+        """
+        Returns the text hashes (see text_hashes) of row positions taken at a generation,
+        or None if the rows have moved since.
+        """
+        with self.lock:
+            if generation != self.generation:
+                return None
+            return self.text_hashes[positions]
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    from datetime import date
+    today = date.today()
+    sample_records = [
+        {'source': 'RSS', 'title': 'A', 'text': 'New ROAD in Uyo', 'date': today, 'sentiment': 'Positive', 'score': 0.9, 'entities': ['umo_eno']},
+        {'source': 'Twitter', 'title': 'B', 'text': 'Prices are up', 'date': today - timedelta(days=3), 'sentiment': 'Negative', 'score': 0.8, 'entities': []},
+        {'source': 'RSS', 'title': 'C', 'text': 'Road budget review', 'date': today - timedelta(days=10), 'sentiment': 'Neutral', 'score': 0.6, 'entities': []},
+    ]
+    record_frame = RecordFrame(sample_records)
+    print(record_frame.filter(start_date=today - timedelta(days=7), end_date=today, keyword='road'))
+    print(record_frame.filter(sources=['RSS'], entities=['umo_eno']))
+    record_frame.append([{'source': 'RSS', 'title': 'D', 'text': 'Roadworks resume', 'date': today, 'sentiment': 'Neutral', 'score': 0.5, 'entities': []}])
+    print(record_frame.filter(keyword='road* OR prices'))
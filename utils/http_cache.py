@@ -0,0 +1,185 @@
+# utils/http_cache.py
+import os
+import json
+import gzip
+import time
+import base64
+import hashlib
+import logging
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Record/replay settings (overridable through environment variables) ---
+# Caching is off unless SCRAPER_CACHE_MODE turns it on (for development and tests).
+# 'off'     : always hit the network, never touch cassettes.
+# 'record'  : always hit the network and (re)write the cassette.
+# 'replay'  : serve a cassette younger than the TTL, otherwise hit the network and record it.
+# 'offline' : serve cassettes of any age and never hit the network (misses raise an error).
+CACHE_MODES = ('off', 'record', 'replay', 'offline')
+CACHE_MODE = os.getenv('SCRAPER_CACHE_MODE', 'off').lower()
+CACHE_TTL = float(os.getenv('SCRAPER_CACHE_TTL', 900)) # Seconds a cassette is served in replay mode
+CASSETTE_DIR = os.getenv('SCRAPER_CASSETTE_DIR', os.path.join('data', 'cassettes'))
+CASSETTE_MAX_AGE = float(os.getenv('SCRAPER_CASSETTE_MAX_AGE', 7 * 24 * 3600)) # Seconds before a cassette is pruned while recording
+PRUNE_INTERVAL = 3600 # Seconds between prunes of the cassette directory in one process
+
+if CACHE_MODE not in CACHE_MODES:
+    logging.warning(f"Unknown SCRAPER_CACHE_MODE '{CACHE_MODE}'. Expected one of {CACHE_MODES}. Using 'off'.")
+    CACHE_MODE = 'off'
+
+_last_prune = {} # Cassette directory -> time it was last pruned
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """Raised in offline mode when no cassette exists for a request."""
+
+def cassette_path(url, params=None, cassette_dir=CASSETTE_DIR):
+    """
+    Returns the cassette file for a GET request. Headers (credentials) are not part of the key.
+
+    Args:
+        url (str): The request URL.
+        params (dict, optional): Query parameters.
+        cassette_dir (str): Root directory holding cassettes.
+
+    Returns:
+        str: Path of the gzip-compressed JSON cassette.
+    """
+    canonical = json.dumps({'url': url, 'params': sorted((params or {}).items())}, default=str)
+    key = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+    host = urlparse(url).netloc or 'local'
+    return os.path.join(cassette_dir, host, f"{key}.json.gz")
+
+def _load_cassette(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+def _save_cassette(path, url, params, response):
+    """
+    Writes a response to its cassette atomically. Only the body and content type are kept.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cassette = {
+        'url': url,
+        'params': params or {},
+        'status_code': response.status_code,
+        'content_type': response.headers.get('Content-Type'),
+        'encoding': response.encoding,
+        'recorded_at': time.time(),
+        'body': base64.b64encode(response.content).decode('ascii')
+    }
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(cassette, f)
+    os.replace(tmp_path, path)
+
+def prune_cassettes(cassette_dir=CASSETTE_DIR, max_age=CASSETTE_MAX_AGE):
+    """
+    Deletes cassettes last written more than max_age seconds ago, and the host directories left empty.
+
+    Args:
+        cassette_dir (str): Root directory holding cassettes.
+        max_age (float): Age in seconds beyond which a cassette is deleted.
+
+    Returns:
+        int: The number of cassettes deleted.
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    for root, _, files in os.walk(cassette_dir, topdown=False):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError as e:
+                logging.warning(f"Could not prune cassette {path}: {e}")
+        if root != cassette_dir and not os.listdir(root):
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+    if removed:
+        logging.info(f"Pruned {removed} cassettes older than {max_age:.0f}s from {cassette_dir}.")
+    return removed
+
+def _response_from_cassette(cassette):
+    """
+    Rebuilds a requests.Response from a cassette so callers cannot tell it apart from a live one.
+    """
+    response = requests.Response()
+    response.status_code = cassette['status_code']
+    response._content = base64.b64decode(cassette['body'])
+    response.headers = CaseInsensitiveDict({'Content-Type': cassette.get('content_type') or ''})
+    response.encoding = cassette.get('encoding')
+    response.url = cassette['url']
+    response.reason = 'OK (replayed)'
+    return response
+
+def cached_get(url, params=None, headers=None, timeout=None, mode=None, ttl=None, cassette_dir=None):
+    """
+    Drop-in replacement for requests.get with record/replay of responses.
+
+    Successful (2xx) responses are recorded to gzip-compressed cassettes keyed by URL
+    and query parameters. Depending on the mode, later identical requests are served
+    from disk instead of the network (see CACHE_MODES). While recording, cassettes older
+    than CASSETTE_MAX_AGE are pruned at most once per PRUNE_INTERVAL.
+
+    Args:
+        url (str): The request URL.
+        params (dict, optional): Query parameters.
+        headers (dict, optional): Request headers (not recorded).
+        timeout (float, optional): Request timeout in seconds for live requests.
+        mode (str, optional): Overrides CACHE_MODE.
+        ttl (float, optional): Overrides CACHE_TTL.
+        cassette_dir (str, optional): Overrides CASSETTE_DIR.
+
+    Returns:
+        requests.Response: The live or replayed response.
+    """
+    mode = mode or CACHE_MODE
+    ttl = CACHE_TTL if ttl is None else ttl
+    if mode == 'off':
+        return requests.get(url, params=params, headers=headers, timeout=timeout)
+
+    path = cassette_path(url, params, cassette_dir or CASSETTE_DIR)
+    if mode in ('replay', 'offline') and os.path.exists(path):
+        try:
+            cassette = _load_cassette(path)
+            age = time.time() - cassette['recorded_at']
+            if mode == 'offline' or age <= ttl:
+                logging.info(f"Replaying cassette for {url} (recorded {age:.0f}s ago).")
+                return _response_from_cassette(cassette)
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable cassette {path}: {e}")
+
+    if mode == 'offline':
+        raise CassetteMissError(f"No cassette recorded for {url} (params {params}) and offline mode forbids network access.")
+
+    response = requests.get(url, params=params, headers=headers, timeout=timeout)
+    if 200 <= response.status_code < 300:
+        try:
+            _save_cassette(path, url, params, response)
+        except OSError as e:
+            logging.warning(f"Could not record cassette for {url}: {e}")
+        root = cassette_dir or CASSETTE_DIR
+        if time.time() - _last_prune.get(root, 0) >= PRUNE_INTERVAL:
+            _last_prune[root] = time.time()
+            prune_cassettes(root)
+    return response
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    test_url = "https://punchng.com/feed/"
+    for attempt in range(2):
+        start = time.perf_counter()
+        try:
+            feed_response = cached_get(test_url, timeout=10, mode='replay')
+            print(f"Attempt {attempt + 1}: status {feed_response.status_code}, {len(feed_response.content)} bytes "
+                  f"in {time.perf_counter() - start:.3f}s ({feed_response.reason}).")
+        except requests.exceptions.RequestException as e:
+            print(f"Attempt {attempt + 1} failed: {e}")
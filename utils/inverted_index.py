@@ -0,0 +1,273 @@
+# utils/inverted_index.py
+import re
+import bisect
+import logging
+from collections import OrderedDict
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Tokens are runs of letters (with their combining marks), digits and underscores in any script.
+# The pattern is RE2 syntax (pyarrow), used for texts and query terms alike.
+TOKEN_SPLIT_PATTERN = r'[^\p{L}\p{M}\p{N}_]+'
+MAX_POSTING_CHUNKS = 8 # Appended chunks per posting list before they are merged into one
+TERM_CACHE_SIZE = 256 # Resolved query terms kept per index
+_QUERY_TERM_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+def parse_keyword_query(query):
+    """
+    Parses a keyword filter into OR-groups of AND-ed terms.
+
+    Words are AND-ed, 'OR' (upper case) separates alternatives, "double quotes" keep a phrase
+    together, and a trailing '*' makes a word match as a word prefix. Matching is case-insensitive.
+    Example: 'road budget OR "ibom air" OR uyo*' -> [[road, budget], ["ibom air"], [uyo*]]
+
+    Args:
+        query (str): The keyword filter text.
+
+    Returns:
+        list: A list of groups, each a list of (term, is_prefix) tuples with lowercased terms.
+    """
+    groups = [[]]
+    for match in _QUERY_TERM_PATTERN.finditer(query or ''):
+        phrase, word = match.groups()
+        if word == 'OR':
+            if groups[-1]:
+                groups.append([])
+            continue
+        term = phrase if phrase is not None else word
+        is_prefix = phrase is None and term.endswith('*') and len(term) > 1
+        term = (term[:-1] if is_prefix else term).lower().strip()
+        if term:
+            groups[-1].append((term, is_prefix))
+    return [group for group in groups if group]
+
+def compress_postings(doc_ids):
+    """
+    Compresses a sorted array of document ids as (first id, gaps in the narrowest unsigned dtype).
+    """
+    if len(doc_ids) == 0:
+        return (0, np.empty(0, dtype=np.uint8))
+    gaps = np.diff(doc_ids)
+    max_gap = int(gaps.max()) if len(gaps) else 0
+    dtype = np.uint8 if max_gap < 2 ** 8 else np.uint16 if max_gap < 2 ** 16 else np.uint32 if max_gap < 2 ** 32 else np.uint64
+    return (int(doc_ids[0]), gaps.astype(dtype))
+
+def decompress_postings(compressed):
+    """
+    Restores the sorted int64 document ids from compress_postings output.
+    """
+    first_id, gaps = compressed
+    doc_ids = np.empty(len(gaps) + 1, dtype=np.int64)
+    doc_ids[0] = first_id
+    np.cumsum(gaps, dtype=np.int64, out=doc_ids[1:])
+    doc_ids[1:] += first_id
+    return doc_ids
+
+def split_words(text):
+    """
+    Splits one (lowercased) string into its non-empty tokens, exactly as texts are tokenized for the index.
+    """
+    words = pc.split_pattern_regex(pa.array([text], type=pa.string()), TOKEN_SPLIT_PATTERN)[0].as_py()
+    return [word for word in words if word]
+
+def _tokenize(lowered_texts, first_doc_id):
+    """
+    Splits lowercased texts into unique (token, doc id) pairs, sorted by token then doc id.
+
+    Returns:
+        tuple: (token strings, sorted doc ids, start offset of each token's run).
+    """
+    tokens = pc.split_pattern_regex(lowered_texts, TOKEN_SPLIT_PATTERN)
+    flat_tokens = pc.list_flatten(tokens)
+    doc_ids = pc.list_parent_indices(tokens).to_numpy().astype(np.int64) + first_doc_id
+    non_empty = pc.greater(pc.utf8_length(flat_tokens), 0)
+    flat_tokens = flat_tokens.filter(non_empty)
+    doc_ids = doc_ids[non_empty.to_numpy(zero_copy_only=False)]
+    if len(flat_tokens) == 0:
+        return [], np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    encoded = pc.dictionary_encode(flat_tokens)
+    codes = encoded.indices.to_numpy().astype(np.int64)
+    vocabulary = encoded.dictionary.to_pylist()
+    # One entry per (token, doc): sort by token then doc and drop repeats within a document
+    pair_keys = np.sort(codes * (int(doc_ids.max()) + 1) + doc_ids)
+    pair_keys = pair_keys[np.r_[True, pair_keys[1:] != pair_keys[:-1]]]
+    codes, doc_ids = np.divmod(pair_keys, int(doc_ids.max()) + 1)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    return [vocabulary[code] for code in codes[starts]], doc_ids, starts
+
+class InvertedIndex:
+    """
+    Token inverted index over a growing list of texts, with compressed posting lists.
+
+    Document ids are the positions of the texts in the order they were added. Plain query terms
+    match any token containing them (the same results as a substring search for single words),
+    'term*' matches tokens starting with it, and phrases are verified against the texts.
+    """
+
+    def __init__(self, texts=None):
+        self.postings = {} # token -> list of compressed posting chunks, in doc id order
+        self.sorted_vocabulary = [] # For prefix lookups
+        self.vocabulary = [] # In the order tokens were first seen, aligned with vocabulary_array
+        self.vocabulary_array = pa.chunked_array([], type=pa.string()) # For substring lookups
+        self.text_chunks = [] # Lowercased texts, kept for phrase verification
+        self.num_docs = 0
+        self.version = 0
+        self._term_cache = OrderedDict()
+        if texts is not None:
+            self.add(texts)
+
+    def __len__(self):
+        return self.num_docs
+
+    def add(self, texts):
+        """
+        Indexes more texts; they get the next document ids. Existing posting lists are appended to,
+        not rebuilt.
+
+        Args:
+            texts (list or pyarrow.Array): The texts to add (None is indexed as empty text).
+
+        Returns:
+            int: The id of the first added document.
+        """
+        first_doc_id = self.num_docs
+        lowered = pc.utf8_lower(pa.array(texts, type=pa.string()).fill_null(''))
+        if len(lowered) == 0:
+            return first_doc_id
+        tokens, doc_ids, starts = _tokenize(lowered, first_doc_id)
+        ends = np.r_[starts[1:], len(doc_ids)]
+
+        new_tokens = []
+        for token, start, end in zip(tokens, starts, ends):
+            chunks = self.postings.get(token)
+            if chunks is None:
+                self.postings[token] = [compress_postings(doc_ids[start:end])]
+                new_tokens.append(token)
+            else:
+                chunks.append(compress_postings(doc_ids[start:end]))
+                if len(chunks) > MAX_POSTING_CHUNKS:
+                    merged = np.concatenate([decompress_postings(chunk) for chunk in chunks])
+                    self.postings[token] = [compress_postings(merged)]
+        if new_tokens:
+            # The substring lookup does not need any order: the new tokens are appended as a chunk
+            self.vocabulary.extend(new_tokens)
+            vocabulary_chunks = self.vocabulary_array.chunks + [pa.array(new_tokens, type=pa.string())]
+            self.vocabulary_array = pa.chunked_array(vocabulary_chunks, type=pa.string())
+            if self.vocabulary_array.num_chunks > MAX_POSTING_CHUNKS:
+                self.vocabulary_array = pa.chunked_array([self.vocabulary_array.combine_chunks()])
+            # The sorted new tokens are merged in: a few by binary insertion, many by one merge of
+            # the two sorted runs (list.sort finds the runs and only merges them)
+            new_tokens.sort()
+            if len(new_tokens) <= 64:
+                for token in new_tokens:
+                    bisect.insort(self.sorted_vocabulary, token)
+            else:
+                self.sorted_vocabulary.extend(new_tokens)
+                self.sorted_vocabulary.sort()
+
+        self.text_chunks.append(lowered)
+        self.num_docs += len(lowered)
+        self.version += 1
+        self._term_cache.clear()
+        return first_doc_id
+
+    def _token_docs(self, token):
+        return np.concatenate([decompress_postings(chunk) for chunk in self.postings[token]])
+
+    def _union(self, doc_id_arrays):
+        # Marking a dense bitmap is cheaper than sorting and deduplicating the concatenated lists
+        if len(doc_id_arrays) == 1:
+            return doc_id_arrays[0]
+        seen = np.zeros(self.num_docs, dtype=bool)
+        for doc_ids in doc_id_arrays:
+            seen[doc_ids] = True
+        return np.flatnonzero(seen)
+
+    def _union_tokens(self, tokens):
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+        return self._union([self._token_docs(token) for token in tokens])
+
+    def _verify_phrase(self, doc_ids, phrase):
+        texts = pa.chunked_array(self.text_chunks, type=pa.string())
+        if doc_ids is None or len(doc_ids) > self.num_docs // 8:
+            # Many candidates: one scan of every text is cheaper than gathering them first
+            matches = pc.match_substring(texts, phrase).to_numpy(zero_copy_only=False)
+            return np.flatnonzero(matches) if doc_ids is None else doc_ids[matches[doc_ids]]
+        texts = texts.take(pa.array(doc_ids, type=pa.int64()))
+        return doc_ids[pc.match_substring(texts, phrase).to_numpy(zero_copy_only=False)]
+
+    def term_docs(self, term, is_prefix=False):
+        """
+        Returns the sorted ids of documents matching one (lowercased) query term.
+        """
+        cache_key = (term, is_prefix)
+        if cache_key in self._term_cache:
+            self._term_cache.move_to_end(cache_key)
+            return self._term_cache[cache_key]
+
+        words = split_words(term)
+        if is_prefix and len(words) == 1 and words[0] == term:
+            start = bisect.bisect_left(self.sorted_vocabulary, term)
+            end = bisect.bisect_left(self.sorted_vocabulary, term + '\U0010ffff')
+            doc_ids = self._union_tokens(self.sorted_vocabulary[start:end])
+        elif not words:
+            # Only punctuation: nothing to look up, check every text
+            doc_ids = self._verify_phrase(None, term)
+        else:
+            # Each word must occur inside some token; a single word needs no further check
+            doc_ids = None
+            for word in words:
+                containing = pc.match_substring(self.vocabulary_array, word).to_numpy(zero_copy_only=False)
+                word_docs = self._union_tokens([self.vocabulary[i] for i in np.flatnonzero(containing)])
+                doc_ids = word_docs if doc_ids is None else np.intersect1d(doc_ids, word_docs, assume_unique=True)
+                if len(doc_ids) == 0:
+                    break
+            if len(doc_ids) and (len(words) > 1 or words[0] != term):
+                doc_ids = self._verify_phrase(doc_ids, term)
+
+        self._term_cache[cache_key] = doc_ids
+        if len(self._term_cache) > TERM_CACHE_SIZE:
+            self._term_cache.popitem(last=False)
+        return doc_ids
+
+    def search(self, query):
+        """
+        Resolves a keyword query (see parse_keyword_query) by posting-list intersection and union.
+
+        Args:
+            query (str): The keyword filter text.
+
+        Returns:
+            numpy.ndarray: Sorted ids of the matching documents, or None if the query has no terms.
+        """
+        groups = parse_keyword_query(query)
+        if not groups:
+            return None
+        group_results = []
+        for group in groups:
+            group_docs = None
+            # Intersect the rarest terms first so the intermediate results stay small
+            for doc_ids in sorted((self.term_docs(term, is_prefix) for term, is_prefix in group), key=len):
+                group_docs = doc_ids if group_docs is None else np.intersect1d(group_docs, doc_ids, assume_unique=True)
+                if len(group_docs) == 0:
+                    break
+            group_results.append(group_docs)
+        return self._union(group_results)
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    index = InvertedIndex([
+        "Governor Umo Eno commissions new road in Uyo",
+        "Ibom Air adds flights to Abuja",
+        "Budget review for Uyo roads",
+    ])
+    index.add(["Residents praise the Ibom Deep Seaport project"])
+    for sample_query in ['road', 'uyo road*', 'ibom OR budget', '"ibom air"', 'port', 'missing']:
+        print(f"{sample_query!r}: {index.search(sample_query)}")
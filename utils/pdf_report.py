@@ -0,0 +1,177 @@
+# utils/pdf_report.py
+import time
+import logging
+from datetime import datetime
+
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+from utils.background_jobs import JobRegistry
+from utils.filter_engine import sort_positions
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+PDF_MAX_DETAIL_ROWS = 500 # Detail rows included in a report; the CSV export has them all
+PDF_ROWS_PER_PAGE = 40 # Detail rows fetched and written per PDF page
+MAX_CACHED_REPORTS = 8 # Finished reports kept in memory (oldest evicted first)
+REPORT_TTL = 15 * 60 # Seconds a finished report is served before it is rebuilt on request
+
+# Detail table layout: (column, header, width in mm, max characters)
+DETAIL_COLUMNS = [
+    ('date', 'Date', 24, 10),
+    ('source', 'Source', 24, 12),
+    ('sentiment', 'Sentiment', 22, 10),
+    ('score', 'Score', 14, 6),
+    ('text', 'Text', 106, 62),
+]
+
+def _pdf_text(value, max_chars=None):
+    # Core PDF fonts only cover Latin-1; anything else is replaced rather than failing the report
+    text = str(value) if value is not None else ''
+    if max_chars is not None and len(text) > max_chars:
+        text = text[:max_chars - 3] + '...'
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+def frame_row_source(frame, sort_by='date', descending=True):
+    """
+    Returns a detail row source (see build_pdf_report) over an in-memory view frame.
+    The sort order is computed on first use, in the worker thread.
+    """
+    order = []
+
+    def fetch_rows(offset, limit):
+        if not order:
+            order.append(sort_positions(frame, sort_by, descending))
+        return frame.iloc[order[0][offset:offset + limit]]
+    return fetch_rows
+
+def build_pdf_report(summary, fetch_rows, total_rows, max_detail_rows=PDF_MAX_DETAIL_ROWS):
+    """
+    Builds a summary-first PDF report of a filtered view.
+
+    The first page holds the filters and the per-sentiment and per-source totals. It is followed by a
+    detail table of at most max_detail_rows rows, fetched and written one page at a time, so the
+    document and the memory used stay bounded however many rows match.
+
+    Args:
+        summary (dict): 'filters' (list of (label, value)), 'total_items' (int), 'sentiment_counts'
+                        and 'source_counts' (dicts of label -> count).
+        fetch_rows (callable): fetch_rows(offset, limit) -> DataFrame of view rows, most relevant first.
+                               Called from the worker thread, so it must not use Streamlit state.
+        total_rows (int): Number of rows matching the view.
+        max_detail_rows (int): Cap on the detail rows.
+
+    Returns:
+        bytes: The PDF document.
+    """
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    # Summary page
+    pdf.set_font("Helvetica", style="B", size=14)
+    pdf.cell(0, 10, text="Sentiment Analysis Report", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
+    pdf.set_font("Helvetica", size=9)
+    pdf.cell(0, 6, text=f"Generated {datetime.now():%Y-%m-%d %H:%M}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="C")
+    pdf.ln(4)
+
+    pdf.set_font("Helvetica", style="B", size=11)
+    pdf.cell(0, 8, text="Filters", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font("Helvetica", size=10)
+    for label, value in summary.get('filters', []):
+        pdf.cell(40, 6, text=_pdf_text(label))
+        pdf.cell(0, 6, text=_pdf_text(value, 90), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(4)
+
+    total_items = summary.get('total_items', 0)
+    for heading, counts in (("Sentiment", summary.get('sentiment_counts', {})), ("Source", summary.get('source_counts', {}))):
+        pdf.set_font("Helvetica", style="B", size=10)
+        pdf.cell(60, 7, text=heading, border=1)
+        pdf.cell(30, 7, text="Items", border=1, align="R")
+        pdf.cell(30, 7, text="Share", border=1, align="R", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_font("Helvetica", size=10)
+        for label, count in sorted(counts.items(), key=lambda item: -item[1]):
+            share = (count / total_items) * 100 if total_items else 0
+            pdf.cell(60, 7, text=_pdf_text(label, 30), border=1)
+            pdf.cell(30, 7, text=str(int(count)), border=1, align="R")
+            pdf.cell(30, 7, text=f"{share:.1f}%", border=1, align="R", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_font("Helvetica", style="B", size=10)
+        pdf.cell(60, 7, text="Total", border=1)
+        pdf.cell(30, 7, text=str(int(total_items)), border=1, align="R")
+        pdf.cell(30, 7, text="", border=1, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.ln(4)
+
+    # Detail table, one page of rows at a time
+    detail_rows = min(total_rows, max_detail_rows)
+    pdf.set_font("Helvetica", size=9)
+    if detail_rows < total_rows:
+        pdf.multi_cell(0, 5, text=f"The detail table lists the {detail_rows} most recent of {total_rows} items. "
+                                  f"Download the CSV export for every item.")
+    for offset in range(0, detail_rows, PDF_ROWS_PER_PAGE):
+        rows = fetch_rows(offset, min(PDF_ROWS_PER_PAGE, detail_rows - offset))
+        if rows.empty:
+            break
+        pdf.add_page()
+        pdf.set_font("Helvetica", style="B", size=9)
+        for _, header, width, _ in DETAIL_COLUMNS:
+            pdf.cell(width, 6, text=header, border=1)
+        pdf.ln()
+        pdf.set_font("Helvetica", size=8)
+        columns = {column: rows[column].tolist() if column in rows.columns else [''] * len(rows) for column, _, _, _ in DETAIL_COLUMNS}
+        for position in range(len(rows)):
+            for column, _, width, max_chars in DETAIL_COLUMNS:
+                value = columns[column][position]
+                if column == 'date' and hasattr(value, 'strftime'):
+                    value = value.strftime('%Y-%m-%d')
+                elif column == 'score' and isinstance(value, float):
+                    value = f"{value:.3f}"
+                pdf.cell(width, 6, text=_pdf_text(value, max_chars), border=1)
+            pdf.ln()
+
+    return bytes(pdf.output())
+
+# Process-wide reports, so every session and rerun asking for the same view shares one build
+_REPORTS = JobRegistry(ttl=REPORT_TTL, max_finished=MAX_CACHED_REPORTS, thread_name="pdf-report", label="PDF report")
+
+def get_report(key):
+    """
+    Returns the report job for a key (dataset version plus filters), or None if there is none or it expired.
+    """
+    return _REPORTS.get(key)
+
+def request_report(key, summary, fetch_rows, total_rows):
+    """
+    Starts building a report in a background thread unless one for the key is running or done.
+    Failed and expired reports are rebuilt.
+
+    Args:
+        key (hashable): Dataset version plus filters; reports are cached under it.
+        summary, fetch_rows, total_rows: See build_pdf_report.
+
+    Returns:
+        BackgroundJob: The job for the key; its result is the PDF bytes.
+    """
+    return _REPORTS.request(key, lambda: build_pdf_report(summary, fetch_rows, total_rows))
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    import pandas as pd
+    from datetime import date, timedelta
+    sample_frame = pd.DataFrame({
+        'date': pd.to_datetime([date.today() - timedelta(days=i % 30) for i in range(2000)]),
+        'source': ['RSS', 'Twitter'] * 1000,
+        'sentiment': ['Positive', 'Neutral', 'Negative', 'Positive'] * 500,
+        'score': [(i % 97) / 97 for i in range(2000)],
+        'text': [f"Item {i} about the new road in Uyo" for i in range(2000)],
+    })
+    sample_summary = {
+        'filters': [('Date range', 'last 30 days'), ('Sources', 'RSS, Twitter')],
+        'total_items': len(sample_frame),
+        'sentiment_counts': sample_frame['sentiment'].value_counts().to_dict(),
+        'source_counts': sample_frame['source'].value_counts().to_dict(),
+    }
+    report = request_report('sample', sample_summary, frame_row_source(sample_frame), len(sample_frame))
+    while report.state == 'running':
+        time.sleep(0.1)
+    print(f"Report {report.state}: {len(report.result or b'')} bytes {report.error or ''}")
@@ -0,0 +1,135 @@
+# utils/pipeline.py
+import queue
+import threading
+import time
+import logging
+
+from utils.sources import iter_source
+from utils.sentiment_analysis import analyze_sentiment
+from utils.entity_tagger import get_default_tagger, tag_records
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+PIPELINE_BATCH_SIZE = 32 # Records per inference micro-batch
+PIPELINE_FLUSH_INTERVAL = 2.0 # Seconds before a partial batch is scored anyway
+PIPELINE_QUEUE_SIZE = 1024 # Records buffered between fetchers and the scorer
+
+_SOURCE_DONE = object() # Queue marker put by a fetcher thread when its source is exhausted
+
+def _put_until_stopped(record_queue, item, stop_event):
+    """
+    Puts an item on the bounded queue, giving up if the consumer has stopped.
+
+    Returns:
+        bool: True if the item was queued.
+    """
+    while not stop_event.is_set():
+        try:
+            record_queue.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _fetch_into_queue(source_name, source_kwargs, record_queue, stop_event):
+    """
+    Fetcher thread body: streams one source's records into the shared queue.
+    """
+    try:
+        for record in iter_source(source_name, **source_kwargs):
+            if not _put_until_stopped(record_queue, (source_name, record), stop_event):
+                return
+    except Exception as e:
+        logging.error(f"Source '{source_name}' failed while fetching: {e}")
+    finally:
+        _put_until_stopped(record_queue, (source_name, _SOURCE_DONE), stop_event)
+
+def run_pipeline(source_names, source_kwargs=None, batch_size=PIPELINE_BATCH_SIZE,
+                 flush_interval=PIPELINE_FLUSH_INTERVAL, stats=None, tagger=None):
+    """
+    Fetches from several sources concurrently and scores their records in micro-batches.
+
+    Each source runs in its own thread and streams records into a bounded queue. The
+    calling thread drains the queue and calls analyze_sentiment on every batch_size
+    records (or after flush_interval seconds), so scoring overlaps with network I/O of
+    the sources that are still fetching. Every record is tagged with the watched
+    entities it mentions ('entities') before it is scored.
+
+    Args:
+        source_names (list): Registered source names (see utils.sources).
+        source_kwargs (dict, optional): Source name -> keyword arguments for that source.
+        batch_size (int): Records per inference micro-batch.
+        flush_interval (float): Seconds to wait before scoring a partial batch.
+        stats (dict, optional): If given, filled with 'fetched' (records per source),
+                                'scored', 'batches' and 'elapsed' (seconds).
+        tagger (EntityTagger, optional): Entity watchlist to tag with. Defaults to get_default_tagger().
+
+    Yields:
+        list: Each scored micro-batch, as returned by analyze_sentiment.
+    """
+    source_kwargs = source_kwargs or {}
+    tagger = tagger or get_default_tagger()
+    if stats is None:
+        stats = {}
+    stats.update({'fetched': {name: 0 for name in source_names}, 'scored': 0, 'batches': 0, 'elapsed': 0.0})
+    if not source_names:
+        return
+
+    start = time.perf_counter()
+    record_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    stop_event = threading.Event()
+    for name in source_names:
+        threading.Thread(
+            target=_fetch_into_queue,
+            args=(name, source_kwargs.get(name, {}), record_queue, stop_event),
+            name=f"fetch-{name}",
+            daemon=True
+        ).start()
+
+    pending_sources = set(source_names)
+    batch = []
+    last_flush = time.perf_counter()
+    try:
+        while pending_sources or batch:
+            if pending_sources:
+                try:
+                    source_name, item = record_queue.get(timeout=flush_interval)
+                    if item is _SOURCE_DONE:
+                        pending_sources.discard(source_name)
+                        logging.info(f"Source '{source_name}' finished with {stats['fetched'][source_name]} records.")
+                    else:
+                        batch.append(item)
+                        stats['fetched'][source_name] += 1
+                except queue.Empty:
+                    pass
+
+            batch_due = len(batch) >= batch_size or time.perf_counter() - last_flush >= flush_interval
+            if batch and (batch_due or not pending_sources):
+                scored_batch = analyze_sentiment(tag_records(batch, tagger))
+                stats['scored'] += len(scored_batch)
+                stats['batches'] += 1
+                batch = []
+                last_flush = time.perf_counter()
+                yield scored_batch
+    finally:
+        stop_event.set() # Unblock fetchers if the consumer stopped early
+        stats['elapsed'] = round(time.perf_counter() - start, 3)
+        logging.info(f"Pipeline scored {stats['scored']} records in {stats['batches']} batches "
+                     f"from {len(source_names)} sources in {stats['elapsed']}s.")
+
+def run_pipeline_to_list(source_names, source_kwargs=None, batch_size=PIPELINE_BATCH_SIZE, stats=None):
+    """
+    Runs the pipeline to completion and returns all scored records in one list.
+    """
+    analyzed = []
+    for scored_batch in run_pipeline(source_names, source_kwargs=source_kwargs, batch_size=batch_size, stats=stats):
+        analyzed.extend(scored_batch)
+    return analyzed
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    pipeline_stats = {}
+    for scored in run_pipeline(["RSS", "Twitter", "Facebook", "Instagram", "TikTok"], stats=pipeline_stats):
+        print(f"Scored batch of {len(scored)} records.")
+    print(f"Pipeline stats: {pipeline_stats}")
@@ -0,0 +1,578 @@
+# utils/record_store.py
+import os
+import json
+import time
+import shutil
+import uuid
+import hashlib
+from datetime import date, timedelta
+from urllib.parse import quote, unquote
+import logging
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Parquet dataset holding every scored record, partitioned as <root>/date=YYYY-MM-DD/source=<name>/part-*.parquet
+DEFAULT_STORE_PATH = os.path.join('data', 'records')
+VERSION_FILE = '_VERSION' # Rewritten after every append or compaction; readers use it as a cache key
+READ_ATTEMPTS = 3 # Reads retried when a listed file was merged away or expired meanwhile
+DEDUP_WINDOW_DAYS = 30 # Days of history whose keys are loaded to skip re-ingested items
+
+# Columns stored inside each file; 'date' and 'source' live in the partition path
+RECORD_SCHEMA = pa.schema([
+    ('title', pa.string()),
+    ('text', pa.string()),
+    ('sentiment', pa.string()),
+    ('score', pa.float64()),
+    ('entities', pa.list_(pa.string())),
+    ('record_key', pa.string()),
+])
+STORE_COLUMNS = ['source', 'date'] + RECORD_SCHEMA.names
+
+# Rollup cube: daily per-source, per-sentiment counts and score histograms of every stored record.
+# Appends add their records' cells; raw partitions dropped past retention keep their counts here.
+ROLLUP_DIR = '_rollups'
+# In ROLLUP_DIR: the rollup files that make up the cube and whether it covers every stored record.
+# Replaced atomically, so readers see a merge or a backfill entirely or not at all; files it does
+# not list (being written, or left by an interrupted backfill) are ignored.
+ROLLUP_MANIFEST_FILE = '_MANIFEST'
+CUBE_MARKER_FILE = '_CUBE' # Marked a complete cube in stores written before the manifest
+MAX_ROLLUP_FILES = 64 # Rollup files (one per append) merged into one past this count
+SCORE_BINS = 20 # Equal-width confidence score bins over [0, 1]
+ROLLUP_SCHEMA = pa.schema([
+    ('date', pa.date32()),
+    ('source', pa.string()),
+    ('sentiment', pa.string()),
+    ('score_bin', pa.int32()),
+    ('count', pa.int64()),
+    ('score_sum', pa.float64()),
+])
+ROLLUP_KEY_COLUMNS = ['date', 'source', 'sentiment', 'score_bin']
+
+def record_key(record):
+    """
+    Returns a stable identity for a record, used to avoid storing the same item twice.
+
+    Args:
+        record (dict): A record with 'source', 'date' and 'text' fields.
+
+    Returns:
+        str: A hex digest of the record's source, date and text.
+    """
+    raw_key = f"{record.get('source')}|{record.get('date')}|{record.get('text')}"
+    return hashlib.sha1(raw_key.encode('utf-8')).hexdigest()
+
+def store_version(store_path=DEFAULT_STORE_PATH):
+    """
+    Returns a value that changes whenever the store is written to, or None if it does not exist.
+    """
+    try:
+        with open(os.path.join(store_path, VERSION_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def _bump_version(store_path):
+    version_path = os.path.join(store_path, VERSION_FILE)
+    with open(f"{version_path}.tmp", 'w', encoding='utf-8') as f:
+        f.write(str(time.time_ns()))
+    os.replace(f"{version_path}.tmp", version_path)
+
+def _partition_dir(store_path, partition_date, source):
+    return os.path.join(store_path, f"date={partition_date.isoformat()}", f"source={quote(source, safe='')}")
+
+def list_partitions(store_path=DEFAULT_STORE_PATH, start_date=None, end_date=None, sources=None):
+    """
+    Lists the partitions matching a date range and source list, without opening any data file.
+
+    Args:
+        store_path (str): Root of the store.
+        start_date (date, optional): First date to include.
+        end_date (date, optional): Last date to include.
+        sources (list, optional): Source names to include. All sources if not given.
+
+    Returns:
+        list: (partition_date, source, directory) tuples, sorted by date.
+    """
+    partitions = []
+    if not os.path.isdir(store_path):
+        return partitions
+    wanted_sources = set(sources) if sources is not None else None
+    for date_entry in sorted(os.listdir(store_path)):
+        if not date_entry.startswith('date='):
+            continue
+        try:
+            partition_date = date.fromisoformat(date_entry[len('date='):])
+        except ValueError:
+            continue
+        if (start_date and partition_date < start_date) or (end_date and partition_date > end_date):
+            continue
+        date_dir = os.path.join(store_path, date_entry)
+        for source_entry in sorted(os.listdir(date_dir)):
+            if not source_entry.startswith('source='):
+                continue
+            source = unquote(source_entry[len('source='):])
+            if wanted_sources is None or source in wanted_sources:
+                partitions.append((partition_date, source, os.path.join(date_dir, source_entry)))
+    return partitions
+
+def _partition_files(partition_dir):
+    return sorted(
+        os.path.join(partition_dir, name) for name in os.listdir(partition_dir)
+        if name.endswith('.parquet') and not name.startswith(('.', '_'))
+    )
+
+def _records_to_table(records):
+    return pa.Table.from_pydict({
+        'title': [record.get('title') or '' for record in records],
+        'text': [record.get('text') for record in records],
+        'sentiment': [record.get('sentiment') for record in records],
+        'score': [float(record.get('score') or 0.0) for record in records],
+        'entities': [list(record.get('entities') or []) for record in records],
+        'record_key': [record_key(record) for record in records],
+    }, schema=RECORD_SCHEMA)
+
+def write_partition_file(table, store_path, partition_date, source):
+    """
+    Writes a table into a partition as a new file, atomically (readers never see partial files).
+
+    Args:
+        table (pyarrow.Table): Rows with RECORD_SCHEMA columns.
+        store_path (str): Root of the store.
+        partition_date (date): The partition date.
+        source (str): The partition source.
+
+    Returns:
+        str: Path of the written file.
+    """
+    tmp_path, final_path = _stage_partition_file(table, store_path, partition_date, source)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+def _stage_partition_file(table, store_path, partition_date, source):
+    # Written under a hidden name that readers skip; returns (hidden path, final path)
+    partition_dir = _partition_dir(store_path, partition_date, source)
+    os.makedirs(partition_dir, exist_ok=True)
+    file_name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+    tmp_path = os.path.join(partition_dir, f".{file_name}.tmp")
+    pq.write_table(table, tmp_path, compression='zstd')
+    return tmp_path, os.path.join(partition_dir, file_name)
+
+def append_records(records, store_path=DEFAULT_STORE_PATH, seen_keys=None):
+    """
+    Appends scored records to the store, skipping any whose key is already known.
+
+    Records are grouped by (date, source) and each group is written as one new file
+    in its partition. The files are written under hidden names and only renamed into place once
+    their cells are in the cube; the renames still due are kept in the rollup manifest, so an
+    interrupted append is finished by the next write instead of leaving the two out of step.
+
+    Args:
+        records (list): Scored records (with 'sentiment' and 'score').
+        store_path (str): Root of the store. Created if missing.
+        seen_keys (set, optional): Keys already stored. Updated in place with the new keys.
+                                   Loaded from the last DEDUP_WINDOW_DAYS of the store if not given.
+
+    Returns:
+        int: The number of records appended.
+    """
+    _finish_pending(store_path) # Before the keys are loaded, so an interrupted append's records count as stored
+    if seen_keys is None:
+        seen_keys = load_record_keys(store_path)
+
+    groups = {}
+    for record in records:
+        if 'sentiment' not in record or not isinstance(record.get('date'), date):
+            continue # Unscored items (e.g. invalid text) are not stored
+        key = record_key(record)
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        groups.setdefault((record['date'], record['source']), []).append(record)
+
+    if not groups:
+        return 0
+    _ensure_cube(store_path)
+    appended = 0
+    staged = []
+    for (partition_date, source), group in groups.items():
+        staged.append(_stage_partition_file(_records_to_table(group), store_path, partition_date, source))
+        appended += len(group)
+    # Add the new records to the cube: one small file of cells, merged with the others now and then
+    rollup_name = _write_rollup_file(rollup_frame(pd.DataFrame([record for group in groups.values() for record in group])), store_path)
+    _publish_rollups(store_path, added=[rollup_name],
+                     pending=[[os.path.relpath(path, store_path) for path in paths] for paths in staged])
+    _finish_pending(store_path)
+    if len(_rollup_files(store_path)) > MAX_ROLLUP_FILES:
+        _merge_rollup_files(store_path)
+    _bump_version(store_path)
+    return appended
+
+def list_data_files(store_path=DEFAULT_STORE_PATH, start_date=None, end_date=None, sources=None):
+    """
+    Lists the data files of the partitions matching the filters (see list_partitions), so a reader
+    that already holds some of them can read only the new ones.
+
+    Returns:
+        list: (partition_date, source, file_path) tuples, sorted by date.
+    """
+    return [(partition_date, source, file_path)
+            for partition_date, source, partition_dir in list_partitions(store_path, start_date, end_date, sources)
+            for file_path in _partition_files(partition_dir)]
+
+def _drop_duplicate_keys(table):
+    # A partition being compacted briefly holds its records twice: in the merged file and the originals
+    keys = table.column('record_key').to_pandas()
+    duplicated = (keys.duplicated() & keys.notna()).to_numpy()
+    return table.filter(pa.array(~duplicated)) if duplicated.any() else table
+
+def read_files(data_files, columns=None):
+    """
+    Reads data files listed by list_data_files into a DataFrame (see read_frame for the columns),
+    keeping one row per record key.
+
+    Raises:
+        FileNotFoundError: If a listed file was merged away or expired since it was listed.
+    """
+    columns = columns or STORE_COLUMNS
+    file_columns = [column for column in RECORD_SCHEMA.names if column in columns or column == 'record_key']
+    tables = []
+    for partition_date, source, file_path in data_files:
+        table = pq.read_table(file_path, columns=file_columns)
+        table = table.append_column('date', pa.array([partition_date] * table.num_rows, type=pa.date32()))
+        table = table.append_column('source', pa.array([source] * table.num_rows, type=pa.string()))
+        tables.append(table)
+
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    return _drop_duplicate_keys(pa.concat_tables(tables)).select(columns).to_pandas()
+
+def read_frame(store_path=DEFAULT_STORE_PATH, start_date=None, end_date=None, sources=None, columns=None):
+    """
+    Reads records from the store into a DataFrame, opening only partitions that match the filters.
+
+    Args:
+        store_path (str): Root of the store.
+        start_date (date, optional): First date to include.
+        end_date (date, optional): Last date to include.
+        sources (list, optional): Source names to include. All sources if not given.
+        columns (list, optional): Columns to return (see STORE_COLUMNS). All if not given.
+
+    Returns:
+        pandas.DataFrame: One row per record, with 'date' holding datetime.date values.
+    """
+    for attempt in range(READ_ATTEMPTS):
+        try:
+            return read_files(list_data_files(store_path, start_date, end_date, sources), columns=columns)
+        except FileNotFoundError:
+            if attempt == READ_ATTEMPTS - 1:
+                raise # Compaction removed the listed files each time
+
+def load_records(store_path=DEFAULT_STORE_PATH, start_date=None, end_date=None, sources=None, data_files=None):
+    """
+    Reads records from the store as a list of dictionaries (see read_frame for the filters).
+    If data_files (see list_data_files) is given, only those files are read.
+    """
+    if data_files is None:
+        frame = read_frame(store_path, start_date=start_date, end_date=end_date, sources=sources)
+    else:
+        frame = read_files(data_files)
+    records = frame.drop(columns=['record_key']).to_dict('records')
+    for record in records:
+        record['entities'] = list(record['entities']) if record['entities'] is not None else []
+    return records
+
+def load_record_keys(store_path=DEFAULT_STORE_PATH, window_days=DEDUP_WINDOW_DAYS):
+    """
+    Returns the keys of records stored for the last window_days days.
+
+    Sources rarely re-deliver items older than that, so older partitions are not read.
+    """
+    start_date = date.today() - timedelta(days=window_days) if window_days is not None else None
+    frame = read_frame(store_path, start_date=start_date, columns=['record_key'])
+    return set(frame['record_key'])
+
+def score_bins(scores):
+    """
+    Maps confidence scores in [0, 1] to their histogram bin (0 .. SCORE_BINS - 1).
+    """
+    scores = np.nan_to_num(np.asarray(scores, dtype='float64'), nan=0.0)
+    return np.clip((scores * SCORE_BINS).astype('int64'), 0, SCORE_BINS - 1)
+
+def rollup_frame(frame):
+    """
+    Aggregates raw records into rollup rows (see ROLLUP_SCHEMA).
+
+    Args:
+        frame (pandas.DataFrame): Records with 'date', 'source', 'sentiment' and 'score' columns.
+
+    Returns:
+        pandas.DataFrame: One row per date, source, sentiment and score bin, with 'count' and 'score_sum'.
+    """
+    binned = pd.DataFrame({
+        'date': frame['date'],
+        'source': frame['source'].astype(str),
+        'sentiment': frame['sentiment'].astype(object).fillna('unknown').astype(str),
+        'score_bin': score_bins(frame['score']).astype('int32'),
+        'score': frame['score'].astype('float64').fillna(0.0),
+    })
+    return (binned.groupby(ROLLUP_KEY_COLUMNS, observed=True)['score']
+            .agg(count='size', score_sum='sum').reset_index())
+
+def _read_manifest(store_path):
+    rollup_dir = os.path.join(store_path, ROLLUP_DIR)
+    try:
+        with open(os.path.join(rollup_dir, ROLLUP_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Written before the manifest: every rollup file counts
+        if not os.path.isdir(rollup_dir):
+            return {'files': [], 'complete': False}
+        return {'files': [os.path.basename(file_path) for file_path in _partition_files(rollup_dir)],
+                'complete': os.path.exists(os.path.join(rollup_dir, CUBE_MARKER_FILE))}
+
+def _rollup_files(store_path):
+    rollup_dir = os.path.join(store_path, ROLLUP_DIR)
+    return [os.path.join(rollup_dir, name) for name in _read_manifest(store_path)['files']]
+
+def _write_rollup_file(frame, store_path):
+    """
+    Writes rollup rows as a new file, not yet part of the cube (see _publish_rollups).
+
+    Returns:
+        str: The file name.
+    """
+    rollup_dir = os.path.join(store_path, ROLLUP_DIR)
+    os.makedirs(rollup_dir, exist_ok=True)
+    file_name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+    tmp_path = os.path.join(rollup_dir, f".{file_name}.tmp")
+    table = pa.Table.from_pandas(frame[ROLLUP_SCHEMA.names], schema=ROLLUP_SCHEMA, preserve_index=False)
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, os.path.join(rollup_dir, file_name))
+    return file_name
+
+def _publish_rollups(store_path, added=(), removed=(), complete=None, pending=None):
+    """
+    Adds and removes rollup files from the cube in one atomic manifest update, then deletes the
+    removed files. Only one process writes to a store at a time.
+
+    Args:
+        pending (list, optional): Replaces the partition renames still due, as [hidden path, final path]
+                                  pairs relative to store_path; a compaction merge adds a third item,
+                                  the files the renamed one replaces (deleted once it is in place).
+    """
+    rollup_dir = os.path.join(store_path, ROLLUP_DIR)
+    manifest = _read_manifest(store_path)
+    removed = set(removed)
+    manifest['files'] = [name for name in manifest['files'] if name not in removed] + list(added)
+    if complete is not None:
+        manifest['complete'] = complete
+    if pending is not None:
+        manifest['pending'] = pending
+    manifest_path = os.path.join(rollup_dir, ROLLUP_MANIFEST_FILE)
+    os.makedirs(rollup_dir, exist_ok=True)
+    with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    for name in removed:
+        try:
+            os.remove(os.path.join(rollup_dir, name))
+        except FileNotFoundError:
+            pass
+
+def _finish_pending(store_path):
+    # Renames the partition files of an append (whose cells are already in the cube) or of a
+    # compaction merge into place, and deletes the files a merge replaces
+    pending = _read_manifest(store_path).get('pending')
+    if not pending:
+        return
+    for tmp_path, final_path, *replaced in pending:
+        if os.path.exists(os.path.join(store_path, tmp_path)):
+            os.replace(os.path.join(store_path, tmp_path), os.path.join(store_path, final_path))
+        if replaced and os.path.exists(os.path.join(store_path, final_path)):
+            for file_path in replaced[0]:
+                try:
+                    os.remove(os.path.join(store_path, file_path))
+                except FileNotFoundError:
+                    pass
+    _publish_rollups(store_path, pending=[])
+    _bump_version(store_path)
+
+def _sum_rollup_files(file_paths):
+    # Sums rows for the same cell, so the result has one row per cell
+    rollups = pd.concat([pq.read_table(file_path).to_pandas() for file_path in file_paths], ignore_index=True)
+    return rollups.groupby(ROLLUP_KEY_COLUMNS, as_index=False)[['count', 'score_sum']].sum()
+
+def _merge_rollup_files(store_path):
+    rollup_paths = _rollup_files(store_path)
+    if len(rollup_paths) < 2:
+        return
+    merged_name = _write_rollup_file(_sum_rollup_files(rollup_paths), store_path)
+    _publish_rollups(store_path, added=[merged_name], removed=[os.path.basename(file_path) for file_path in rollup_paths])
+
+def cube_complete(store_path=DEFAULT_STORE_PATH):
+    """
+    Returns True if the rollups cover every stored record. Stores written before the cube existed
+    only have rollups of compacted days until their next append or compaction.
+    """
+    return _read_manifest(store_path)['complete']
+
+def _ensure_cube(store_path):
+    # One-time backfill: add the raw records of a store written before the cube existed. The cells
+    # are written to unlisted files and published together with the completion flag, so an
+    # interrupted backfill leaves the cube as it was and is simply redone
+    _finish_pending(store_path)
+    if cube_complete(store_path):
+        return
+    rollup_dir = os.path.join(store_path, ROLLUP_DIR)
+    if not os.path.exists(os.path.join(rollup_dir, ROLLUP_MANIFEST_FILE)):
+        _publish_rollups(store_path) # Pins the files of a store written before the manifest
+    listed = _read_manifest(store_path)['files']
+    if os.path.isdir(rollup_dir):
+        for file_path in _partition_files(rollup_dir):
+            if os.path.basename(file_path) not in listed:
+                os.remove(file_path) # Left by an interrupted backfill
+    backfill_names = []
+    if os.path.isdir(store_path):
+        for partition_date in sorted({partition_date for partition_date, _, _ in list_partitions(store_path)}):
+            raw = read_frame(store_path, start_date=partition_date, end_date=partition_date,
+                             columns=['source', 'date', 'sentiment', 'score'])
+            if not raw.empty:
+                backfill_names.append(_write_rollup_file(rollup_frame(raw), store_path))
+    file_names = listed + backfill_names
+    added = []
+    if file_names:
+        added = [_write_rollup_file(_sum_rollup_files([os.path.join(rollup_dir, name) for name in file_names]), store_path)]
+    _publish_rollups(store_path, added=added, removed=file_names, complete=True)
+    logging.info(f"Built the rollup cube of {store_path}.")
+
+def filter_rollups(rollups, start_date=None, end_date=None, sources=None, sentiments=None):
+    """
+    Selects the rollup cells within a date range, sources and sentiments. Works on cells,
+    so the cost does not depend on how many records they count.
+
+    Args:
+        rollups (pandas.DataFrame): Rollup rows (see ROLLUP_SCHEMA); 'date' as datetime.date or datetime64.
+        start_date (date, optional): First date to include.
+        end_date (date, optional): Last date to include.
+        sources (list, optional): Source names to include.
+        sentiments (list, optional): Sentiment labels to include. No filter if empty.
+
+    Returns:
+        pandas.DataFrame: The matching rows.
+    """
+    mask = pd.Series(True, index=rollups.index)
+    if start_date or end_date:
+        dates = pd.to_datetime(rollups['date'])
+        if start_date:
+            mask &= dates >= pd.Timestamp(start_date)
+        if end_date:
+            mask &= dates <= pd.Timestamp(end_date)
+    if sources is not None:
+        mask &= rollups['source'].isin(sources)
+    if sentiments:
+        mask &= rollups['sentiment'].isin(sentiments)
+    return rollups[mask].reset_index(drop=True)
+
+def rollup_sentiment_counts(rollups):
+    """
+    Returns the number of records per sentiment counted by a set of rollup cells.
+
+    Returns:
+        dict: Sentiment label -> count.
+    """
+    return {sentiment: int(count) for sentiment, count in rollups.groupby('sentiment')['count'].sum().items()}
+
+def read_rollups(store_path=DEFAULT_STORE_PATH, start_date=None, end_date=None, sources=None, sentiments=None):
+    """
+    Reads the cells of the rollup cube (see cube_complete), filtered by date range, sources and sentiments.
+
+    Returns:
+        pandas.DataFrame: Rollup rows (see ROLLUP_SCHEMA), with 'date' holding datetime.date values.
+    """
+    for attempt in range(READ_ATTEMPTS):
+        try:
+            frames = [pq.read_table(file_path).to_pandas() for file_path in _rollup_files(store_path)]
+            break
+        except FileNotFoundError:
+            if attempt == READ_ATTEMPTS - 1:
+                raise # A merge removed the listed files each time; the cube is being rewritten
+    if not frames:
+        return pd.DataFrame(columns=ROLLUP_SCHEMA.names)
+    rollups = pd.concat(frames, ignore_index=True)
+    return filter_rollups(rollups, start_date=start_date, end_date=end_date, sources=sources, sentiments=sentiments)
+
+def compact_store(store_path=DEFAULT_STORE_PATH, retention_days=90):
+    """
+    Applies retention to the store and merges small files.
+
+    Partitions of raw records older than retention_days are deleted; their counts stay in the rollup
+    cube. Partitions holding several files (one per ingestion cycle) are rewritten as a single file,
+    and the rollup files are merged into one. Merged files are written under hidden names and the
+    swaps recorded in the rollup manifest before any file is renamed or deleted, so an interrupted
+    compaction is finished by the next write; readers drop the duplicate keys seen meanwhile.
+
+    Args:
+        store_path (str): Root of the store.
+        retention_days (int): Days of raw records to keep.
+
+    Returns:
+        dict: 'rolled_up' (raw records dropped; still counted in the cube), 'merged_partitions' and 'rollup_rows'.
+    """
+    stats = {'rolled_up': 0, 'merged_partitions': 0, 'rollup_rows': 0}
+    if not os.path.isdir(store_path):
+        return stats
+    cutoff = date.today() - timedelta(days=retention_days)
+    _ensure_cube(store_path)
+
+    # 1. Drop expired partitions (already counted in the cube), one date at a time
+    expired_dates = sorted({partition_date for partition_date, _, _ in list_partitions(store_path, end_date=cutoff - timedelta(days=1))})
+    for expired_date in expired_dates:
+        for _, _, partition_dir in list_partitions(store_path, start_date=expired_date, end_date=expired_date):
+            stats['rolled_up'] += sum(pq.ParquetFile(file_path).metadata.num_rows for file_path in _partition_files(partition_dir))
+        shutil.rmtree(os.path.join(store_path, f"date={expired_date.isoformat()}"))
+
+    # 2. Merge the small files written by each ingestion cycle
+    swaps = []
+    for partition_date, source, partition_dir in list_partitions(store_path):
+        for name in os.listdir(partition_dir):
+            if name.startswith('.') and name.endswith('.tmp'):
+                os.remove(os.path.join(partition_dir, name)) # Staged by a merge interrupted before it was recorded
+        file_paths = _partition_files(partition_dir)
+        if len(file_paths) < 2:
+            continue
+        merged = _drop_duplicate_keys(pa.concat_tables([pq.read_table(file_path) for file_path in file_paths]))
+        tmp_path, final_path = _stage_partition_file(merged, store_path, partition_date, source)
+        swaps.append([os.path.relpath(tmp_path, store_path), os.path.relpath(final_path, store_path),
+                      [os.path.relpath(file_path, store_path) for file_path in file_paths]])
+        stats['merged_partitions'] += 1
+    if swaps:
+        _publish_rollups(store_path, pending=swaps)
+        _finish_pending(store_path)
+
+    # 3. Merge the rollup files written by each append
+    _merge_rollup_files(store_path)
+    stats['rollup_rows'] = sum(pq.ParquetFile(file_path).metadata.num_rows for file_path in _rollup_files(store_path))
+
+    if stats['rolled_up']:
+        _bump_version(store_path)
+    logging.info(f"Compacted {store_path}: {stats}")
+    return stats
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    sample_records = [
+        {'source': 'RSS', 'title': 'Sample', 'text': 'Great news today!', 'date': date.today(), 'sentiment': 'Positive', 'score': 0.95},
+        {'source': 'RSS', 'title': 'Sample', 'text': 'Great news today!', 'date': date.today(), 'sentiment': 'Positive', 'score': 0.95},
+        {'source': 'Twitter', 'title': 'Tweet', 'text': 'Roads are bad.', 'date': date.today() - timedelta(days=1), 'sentiment': 'Negative', 'score': 0.8},
+    ]
+    appended = append_records(sample_records, store_path='test_records')
+    print(f"Appended {appended} records (duplicates skipped). Partitions: {len(list_partitions('test_records'))}")
+    print(read_frame('test_records', start_date=date.today(), sources=['RSS']))
+    print(compact_store('test_records', retention_days=0))
+    print(read_rollups('test_records'))
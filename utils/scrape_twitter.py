@@ -1,10 +1,14 @@
 # utils/scrape_twitter.py
 import os
+import json
 import requests
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 import logging
 from dotenv import load_dotenv
 
+from utils.http_cache import cached_get
+from utils.circuit_breaker import CircuitOpenError, get_breaker
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -13,6 +17,14 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 BEARER_TOKEN = os.getenv('TWITTER_BEARER_TOKEN')
 
+# Newest tweet id seen per query, used for since_id incremental polling. A poll cut short by
+# MAX_INCREMENTAL_PAGES also leaves its unfinished range under BACKFILL_STATE_KEY.
+TWITTER_STATE_FILE = os.getenv('TWITTER_STATE_FILE', os.path.join('data', 'twitter_since_ids.json'))
+TWITTER_EPOCH_MS = 1288834974657 # Snowflake epoch used by tweet ids
+RECENT_SEARCH_WINDOW = timedelta(days=7) # How far back the recent search endpoint reaches
+MAX_INCREMENTAL_PAGES = 10 # Upper bound on pages followed per incremental poll
+BACKFILL_STATE_KEY = '_backfill' # State entry: query -> {'until_id', 'newest_id'} of a poll still to be finished
+
 def create_headers():
     """
     Creates the necessary headers for Twitter API requests.
@@ -25,7 +37,116 @@ def create_headers():
         "Authorization": f"Bearer {BEARER_TOKEN}"
     }
 
-def get_twitter_data(query="Umo Eno", max_results=10):
+def tweet_id_to_datetime(tweet_id):
+    """
+    Decodes the creation time embedded in a (snowflake) tweet id.
+
+    Args:
+        tweet_id (str or int): The tweet id.
+
+    Returns:
+        datetime: The UTC creation time of the tweet.
+    """
+    timestamp_ms = (int(tweet_id) >> 22) + TWITTER_EPOCH_MS
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+def _load_since_ids(state_file):
+    """
+    Loads the per-query newest tweet ids. Returns an empty dict if the file is missing or unreadable.
+    """
+    if not os.path.exists(state_file):
+        return {}
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not read Twitter since_id state from {state_file}: {e}. Starting fresh.")
+        return {}
+
+def _save_since_ids(since_ids, state_file):
+    """
+    Persists the per-query newest tweet ids, replacing the file atomically.
+    """
+    state_dir = os.path.dirname(state_file)
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(since_ids, f, indent=2)
+    os.replace(tmp_file, state_file)
+
+def _in_search_window(tweet_id):
+    # Leave a minute of slack so an id right at the edge is not rejected mid-request
+    window_start = datetime.now(timezone.utc) - RECENT_SEARCH_WINDOW + timedelta(minutes=1)
+    return tweet_id_to_datetime(tweet_id) >= window_start
+
+def _resolve_since_id(query, since_ids):
+    """
+    Returns the stored since_id for a query, or None if there is none or it has
+    fallen out of the recent search window (the API rejects such ids).
+    """
+    since_id = since_ids.get(query)
+    if not since_id:
+        return None
+    if not _in_search_window(since_id):
+        logging.warning(f"Stored since_id {since_id} for '{query}' is older than the 7-day search window. "
+                        f"Tweets between it and the window start cannot be recovered; polling the full window.")
+        return None
+    return since_id
+
+def _search_recent_tweets(query, params, incremental):
+    """
+    Calls the recent search endpoint, following pagination in incremental mode.
+
+    Args:
+        query (str): The search query (for logging).
+        params (dict): Request parameters, including 'since_id' (and 'until_id' when finishing a
+                       cut-short poll) when polling incrementally.
+        incremental (bool): Follow next_token pages (up to MAX_INCREMENTAL_PAGES).
+
+    Returns:
+        tuple: (tweets, newest_id, oldest_id, truncated): the raw tweet objects, the newest and
+               oldest ids reported by the API, and whether pages were left unread.
+
+    Raises:
+        ValueError: If the bearer token is missing.
+        requests.exceptions.RequestException: If a request fails.
+    """
+    search_url = "https://api.twitter.com/2/tweets/search/recent"
+    headers = create_headers() # This will raise ValueError if token is missing
+    params = dict(params)
+    tweets = []
+    newest_id = oldest_id = None
+    truncated = False
+    for page_number in range(MAX_INCREMENTAL_PAGES if incremental else 1):
+        response = cached_get(search_url, headers=headers, params=params)
+        if response.status_code == 400 and 'since_id' in params:
+            # The stored id is no longer accepted (e.g. it aged out of the window): re-poll from the
+            # first page without it (a next_token belongs to the rejected query)
+            logging.warning(f"since_id {params['since_id']} rejected for '{query}': {response.text}. Retrying without it.")
+            del params['since_id']
+            params.pop('next_token', None)
+            tweets, newest_id = [], None
+            response = cached_get(search_url, headers=headers, params=params)
+        response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
+
+        tweets_data = response.json()
+        tweets.extend(tweets_data.get("data", []))
+        meta = tweets_data.get("meta", {})
+        if newest_id is None:
+            newest_id = meta.get("newest_id") # Results are newest-first, so the first page holds it
+        oldest_id = meta.get("oldest_id", oldest_id)
+        next_token = meta.get("next_token")
+        if not incremental or not next_token:
+            break
+        if page_number == MAX_INCREMENTAL_PAGES - 1:
+            logging.warning(f"Stopped after {MAX_INCREMENTAL_PAGES} pages for '{query}'; the older new tweets are read on the next poll.")
+            truncated = True
+            break
+        params['next_token'] = next_token
+    return tweets, newest_id, oldest_id, truncated
+
+def get_twitter_data(query="Umo Eno", max_results=10, incremental=False, state_file=TWITTER_STATE_FILE):
     """
     Fetches recent tweets from the Twitter API based on a query.
     Includes fallback dummy data if the real API call fails or token is missing.
@@ -34,6 +155,16 @@ def get_twitter_data(query="Umo Eno", max_results=10):
     Args:
         query (str): The search query for tweets.
         max_results (int): The maximum number of tweets to retrieve (up to 100 for recent search).
+                           In incremental mode this is the page size.
+        incremental (bool): If True, only tweets newer than the last poll for this query are
+                            returned. The newest tweet id is stored per query in state_file and
+                            sent as since_id, following pagination until all new tweets are read.
+                            A poll stopped by MAX_INCREMENTAL_PAGES keeps the old since_id and
+                            records where it stopped; the next polls finish that range (with
+                            until_id) before the since_id moves on.
+                            An empty list means there was nothing new, and failures return an
+                            empty list instead of dummy data so they are never stored as real tweets.
+        state_file (str): JSON file holding the newest tweet id per query.
 
     Returns:
         list: A list of dictionaries, where each dictionary represents a tweet
@@ -43,12 +174,8 @@ def get_twitter_data(query="Umo Eno", max_results=10):
         logging.warning(f"max_results should be between 1 and 100. Using default of 10 instead of {max_results}.")
         max_results = 10
 
-    search_url = "https://api.twitter.com/2/tweets/search/recent"
-    
     # --- Attempt to fetch real Twitter data ---
     try:
-        headers = create_headers() # This will raise ValueError if token is missing
-        
         params = {
             'query': query,
             'max_results': max_results,
@@ -57,12 +184,36 @@ def get_twitter_data(query="Umo Eno", max_results=10):
             'user.fields': 'username,name'
         }
 
-        logging.info(f"Attempting to fetch Twitter data for query: '{query}'")
-        response = requests.get(search_url, headers=headers, params=params)
-        response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
-        
-        tweets_data = response.json()
-        tweets = tweets_data.get("data", [])
+        since_ids = {}
+        backfill = None
+        if incremental:
+            since_ids = _load_since_ids(state_file)
+            backfill = since_ids.get(BACKFILL_STATE_KEY, {}).get(query)
+            if backfill and not _in_search_window(backfill['until_id']):
+                logging.warning(f"The unfinished poll for '{query}' stopped at {backfill['until_id']}, which is now older "
+                                f"than the 7-day search window. Its older tweets cannot be recovered.")
+                since_ids[query] = backfill['newest_id']
+                del since_ids[BACKFILL_STATE_KEY][query]
+                backfill = None
+            since_id = _resolve_since_id(query, since_ids)
+            if since_id:
+                params['since_id'] = since_id
+            if backfill:
+                params['until_id'] = backfill['until_id']
+
+        logging.info(f"Attempting to fetch Twitter data for query: '{query}'"
+                     + (f" since id {params['since_id']}" if 'since_id' in params else "")
+                     + (f" until id {params['until_id']}" if 'until_id' in params else ""))
+        try:
+            # Incremental polls send a new since_id every time, so their results are never served again
+            tweets, newest_id, oldest_id, truncated = get_breaker("Twitter").call(
+                _search_recent_tweets, query, params, incremental, remember=not incremental)
+        except CircuitOpenError as e:
+            # Twitter is known to be down: don't wait on it, serve the last good result for this query if any
+            if incremental or not e.last_good:
+                raise
+            logging.warning(f"{e} Serving the last good tweets for '{query}'.")
+            tweets, newest_id, oldest_id, truncated = e.last_good
 
         processed_tweets = []
         if tweets:
@@ -81,12 +232,34 @@ def get_twitter_data(query="Umo Eno", max_results=10):
                 except ValueError as e:
                     logging.error(f"Error parsing date for tweet: {tweet.get('created_at', 'N/A')}. Error: {e}")
             logging.info(f"Successfully fetched {len(processed_tweets)} tweets for '{query}'.")
+
+        if incremental:
+            backfills = since_ids.setdefault(BACKFILL_STATE_KEY, {})
+            if truncated and oldest_id:
+                # Keep the since_id and continue below the oldest tweet read on the next poll; the
+                # newest id of the range is only stored once all of it has been read
+                backfills[query] = {'until_id': oldest_id, 'newest_id': backfill['newest_id'] if backfill else newest_id}
+            elif backfill:
+                since_ids[query] = backfill['newest_id']
+                del backfills[query]
+            elif newest_id:
+                since_ids[query] = newest_id
+            else:
+                logging.info(f"No new tweets for '{query}' since the last poll.")
+            if not backfills:
+                del since_ids[BACKFILL_STATE_KEY]
+            _save_since_ids(since_ids, state_file)
+            return processed_tweets
+
+        if tweets:
             return processed_tweets # Return real data if successful
         else:
             logging.warning(f"No real tweets found for query '{query}'.")
 
     except (ValueError, requests.exceptions.RequestException, Exception) as e:
         logging.error(f"Failed to fetch real Twitter data for '{query}': {e}")
+        if incremental:
+            return [] # Keep the stored since_id so the next poll retries the same range
         # Continue to dummy data fallback
 
     # --- Fallback to dummy data if real fetch fails or token is missing ---
@@ -141,3 +314,7 @@ if __name__ == "__main__":
     print("\nAttempting to fetch with an invalid max_results (should default to 10 and use dummy if token missing)...")
     invalid_results_tweets = get_twitter_data(query="Nigeria", max_results=150)
     print(f"Number of tweets fetched: {len(invalid_results_tweets)}")
+
+    print("\nPolling 'Umo Eno' incrementally (only tweets newer than the previous poll are returned)...")
+    new_tweets = get_twitter_data(query="Umo Eno", max_results=100, incremental=True)
+    print(f"Number of new tweets since last poll: {len(new_tweets)}")
@@ -0,0 +1,136 @@
+# utils/sources.py
+from datetime import datetime, date
+import logging
+
+from utils.fetch_rss import iter_rss_articles_from_feeds
+from utils.scrape_twitter import get_twitter_data
+from utils.scrape_facebook import get_facebook_data
+from utils.scrape_instagram import get_instagram_data
+from utils.scrape_tiktok import get_tiktok_data
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Fields every record yielded by a source carries (the common schema)
+RECORD_FIELDS = ('source', 'title', 'text', 'date')
+
+# Source name -> {'fetch': generator function, 'defaults': default keyword arguments}
+SOURCE_REGISTRY = {}
+
+def register_source(name, **default_kwargs):
+    """
+    Decorator registering a generator function as a data source plugin.
+
+    The decorated function is called with the registered defaults, overridden by
+    any keyword arguments passed to iter_source, and must yield record dictionaries.
+
+    Args:
+        name (str): The source name, as shown in the dashboard's source selector.
+        **default_kwargs: Default keyword arguments for the source.
+    """
+    def decorator(fetch_func):
+        if name in SOURCE_REGISTRY:
+            logging.warning(f"Source '{name}' is already registered. Replacing it.")
+        SOURCE_REGISTRY[name] = {'fetch': fetch_func, 'defaults': default_kwargs}
+        return fetch_func
+    return decorator
+
+def available_sources():
+    """
+    Returns the names of all registered sources, in registration order.
+    """
+    return list(SOURCE_REGISTRY)
+
+def normalize_record(record, source_name):
+    """
+    Coerces a raw record into the common schema.
+
+    Args:
+        record (dict): A record yielded by a source.
+        source_name (str): The registered source name, used if the record has no 'source'.
+
+    Returns:
+        dict: A record with exactly the RECORD_FIELDS keys and 'date' as a datetime.date,
+              or None if the record has no usable text or date.
+    """
+    if not isinstance(record, dict) or not isinstance(record.get('text'), str) or not record['text'].strip():
+        logging.warning(f"Skipping record from '{source_name}' with missing or invalid 'text': {record}")
+        return None
+
+    record_date = record.get('date')
+    try:
+        if isinstance(record_date, datetime):
+            record_date = record_date.date()
+        elif isinstance(record_date, str):
+            record_date = datetime.fromisoformat(record_date).date()
+        elif not isinstance(record_date, date):
+            raise ValueError(f"unsupported date value {record_date!r}")
+    except ValueError as e:
+        logging.warning(f"Skipping record from '{source_name}' with invalid 'date': {e}")
+        return None
+
+    return {
+        'source': record.get('source') or source_name,
+        'title': record.get('title') or '',
+        'text': record['text'],
+        'date': record_date
+    }
+
+def iter_source(name, **kwargs):
+    """
+    Runs a registered source and yields its records in the common schema as they arrive.
+
+    Args:
+        name (str): The registered source name.
+        **kwargs: Overrides for the source's default keyword arguments.
+
+    Yields:
+        dict: Normalized records (see normalize_record).
+    """
+    if name not in SOURCE_REGISTRY:
+        raise KeyError(f"Unknown source '{name}'. Available sources: {available_sources()}")
+    plugin = SOURCE_REGISTRY[name]
+    source_kwargs = {**plugin['defaults'], **kwargs}
+    for record in plugin['fetch'](**source_kwargs):
+        normalized = normalize_record(record, name)
+        if normalized is not None:
+            yield normalized
+
+# --- Built-in sources ---
+
+@register_source("RSS", feeds=None, config_path=None, fallback_to_dummy=False)
+def rss_source(feeds=None, config_path=None, feed_stats=None, fallback_to_dummy=False):
+    """
+    Yields RSS articles feed by feed, as each concurrent fetch completes. The dummy articles are
+    only yielded when no feed responds and fallback_to_dummy is explicitly set.
+    """
+    yield from iter_rss_articles_from_feeds(feeds, config_path=config_path, fallback_to_dummy=fallback_to_dummy,
+                                            feed_stats=feed_stats)
+
+@register_source("Twitter", query="Umo Eno Akwa Ibom", max_results=50)
+def twitter_source(query, max_results, incremental=False):
+    """Yields tweets for a search query."""
+    yield from get_twitter_data(query=query, max_results=max_results, incremental=incremental)
+
+@register_source("Facebook", query="Akwa Ibom Governor", max_results=20)
+def facebook_source(query, max_results):
+    """Yields (dummy) Facebook posts."""
+    yield from get_facebook_data(query=query, max_results=max_results)
+
+@register_source("Instagram", query="Umo Eno Akwa Ibom", max_results=20)
+def instagram_source(query, max_results):
+    """Yields (dummy) Instagram media items."""
+    yield from get_instagram_data(query=query, max_results=max_results)
+
+@register_source("TikTok", query="Akwa Ibom Governor", max_results=20)
+def tiktok_source(query, max_results):
+    """Yields (dummy) TikTok videos."""
+    yield from get_tiktok_data(query=query, max_results=max_results)
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    for source_name in available_sources():
+        records = list(iter_source(source_name))
+        print(f"Source: {source_name}, Records: {len(records)}")
+        for record in records[:2]:
+            print(f"  Date: {record['date']}, Text: {record['text'][:80]}...")
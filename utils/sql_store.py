@@ -0,0 +1,481 @@
+# utils/sql_store.py
+import os
+import json
+import sqlite3
+import time
+from datetime import date, timedelta
+import logging
+
+import pandas as pd
+
+from utils.record_store import SCORE_BINS, record_key
+from utils.inverted_index import parse_keyword_query
+from utils.filter_engine import SORTABLE_COLUMNS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Embedded SQLite database holding scored records, used when SENTIMENT_STORE_BACKEND=sqlite
+DEFAULT_SQL_STORE_PATH = os.path.join('data', 'records.sqlite3')
+ALL_SENTIMENTS = {"Positive", "Neutral", "Negative"}
+MIN_FTS_KEYWORD_LENGTH = 3 # The trigram index needs at least three characters; shorter keywords use LIKE
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    record_key TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    title TEXT,
+    text TEXT NOT NULL,
+    sentiment TEXT,
+    score REAL,
+    entities TEXT
+);
+-- Each index carries date, source and sentiment, so filtered counts never touch the table rows
+CREATE INDEX IF NOT EXISTS idx_records_date_sentiment ON records (date, sentiment, source);
+CREATE INDEX IF NOT EXISTS idx_records_source_date ON records (source, date, sentiment);
+CREATE INDEX IF NOT EXISTS idx_records_sentiment_date ON records (sentiment, date, source);
+
+CREATE TABLE IF NOT EXISTS record_entities (
+    record_id INTEGER NOT NULL REFERENCES records (id) ON DELETE CASCADE,
+    entity_id TEXT NOT NULL,
+    PRIMARY KEY (entity_id, record_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_record_entities_record ON record_entities (record_id);
+
+-- Trigram full-text index over text: case-insensitive substring search without scanning every row
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5 (
+    text, content='records', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records BEGIN
+    INSERT INTO records_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN
+    INSERT INTO records_fts (records_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+
+-- Rollup cube: daily per-source, per-sentiment counts and score histograms of every stored record.
+-- Kept up to date on insert (see _CUBE_SQL); raw rows deleted past retention keep their counts here.
+CREATE TABLE IF NOT EXISTS record_rollups (
+    date TEXT NOT NULL,
+    source TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    score_bin INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    PRIMARY KEY (date, source, sentiment, score_bin)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Cube cell of a record: its date, source, sentiment and score bin (see record_store.score_bins)
+_CUBE_BIN_SQL = f"MIN(MAX(CAST(COALESCE({{score}}, 0) * {SCORE_BINS} AS INTEGER), 0), {SCORE_BINS - 1})"
+_CUBE_SQL = f"""
+-- Adds each inserted record to its cube cell, so aggregates never have to rescan raw rows
+CREATE TRIGGER IF NOT EXISTS records_cube_insert AFTER INSERT ON records BEGIN
+    INSERT INTO record_rollups (date, source, sentiment, score_bin, count, score_sum)
+    VALUES (new.date, new.source, COALESCE(new.sentiment, 'unknown'), {_CUBE_BIN_SQL.format(score='new.score')},
+            1, COALESCE(new.score, 0))
+    ON CONFLICT (date, source, sentiment, score_bin)
+    DO UPDATE SET count = count + 1, score_sum = score_sum + excluded.score_sum;
+END;
+"""
+
+def connect(db_path=DEFAULT_SQL_STORE_PATH):
+    """
+    Opens the store, creating the schema on first use.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: A connection in WAL mode (readers do not block the writer).
+    """
+    db_dir = os.path.dirname(db_path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    connection = sqlite3.connect(db_path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    connection.executescript(_SCHEMA_SQL)
+    _ensure_cube(connection)
+    return connection
+
+def _ensure_cube(connection):
+    """
+    Installs the cube trigger. A database written before the cube existed only has rollups of
+    compacted days, so its remaining raw records are added to the cube in the same transaction.
+    """
+    if connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'records_cube_insert'").fetchone():
+        return
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        if not connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'records_cube_insert'").fetchone():
+            connection.execute(f"""
+                INSERT INTO record_rollups (date, source, sentiment, score_bin, count, score_sum)
+                SELECT date, source, COALESCE(sentiment, 'unknown'), {_CUBE_BIN_SQL.format(score='score')} AS score_bin,
+                       COUNT(*), TOTAL(score)
+                FROM records
+                GROUP BY date, source, COALESCE(sentiment, 'unknown'), score_bin
+                ON CONFLICT (date, source, sentiment, score_bin)
+                DO UPDATE SET count = count + excluded.count, score_sum = score_sum + excluded.score_sum
+            """)
+            connection.execute(_CUBE_SQL)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+def store_version(db_path=DEFAULT_SQL_STORE_PATH):
+    """
+    Returns a value that changes whenever records are written, or None if the store does not exist.
+    """
+    return get_meta(db_path, 'version')
+
+def get_meta(db_path, key):
+    """
+    Returns a value from the store's metadata table, or None if it (or the store) does not exist.
+    """
+    if not os.path.exists(db_path):
+        return None
+    connection = connect(db_path)
+    try:
+        row = connection.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+    finally:
+        connection.close()
+    return row[0] if row else None
+
+def set_meta(db_path, key, value):
+    """
+    Stores a value in the store's metadata table.
+    """
+    connection = connect(db_path)
+    try:
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (key, str(value)))
+    finally:
+        connection.close()
+
+def reset_store(db_path):
+    """
+    Deletes the database file (and its WAL files) so it can be rebuilt from scratch.
+    """
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+def append_records(records, db_path=DEFAULT_SQL_STORE_PATH):
+    """
+    Inserts scored records, ignoring any already stored (same record key).
+
+    Args:
+        records (list): Scored records (with 'sentiment' and 'score').
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        int: The number of records inserted.
+    """
+    rows = []
+    for record in records:
+        if 'sentiment' not in record or not isinstance(record.get('date'), date):
+            continue # Unscored items (e.g. invalid text) are not stored
+        entity_ids = list(record.get('entities') or [])
+        rows.append(((
+            record_key(record), record['source'], record['date'].isoformat(), record.get('title') or '',
+            record['text'], record['sentiment'], float(record.get('score') or 0.0), json.dumps(entity_ids)
+        ), entity_ids))
+    if not rows:
+        return 0
+
+    inserted = 0
+    connection = connect(db_path)
+    try:
+        with connection: # One transaction for the whole batch
+            for row, entity_ids in rows:
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO records (record_key, source, date, title, text, sentiment, score, entities) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row
+                )
+                if not cursor.rowcount:
+                    continue # Already stored
+                inserted += 1
+                connection.executemany(
+                    "INSERT OR IGNORE INTO record_entities (record_id, entity_id) VALUES (?, ?)",
+                    [(cursor.lastrowid, entity_id) for entity_id in entity_ids]
+                )
+            if inserted:
+                _bump_version(connection)
+    finally:
+        connection.close()
+    return inserted
+
+def build_where_clause(start_date=None, end_date=None, sources=None, sentiments=None, keyword=None, entities=None):
+    """
+    Compiles the dashboard filters into a SQL WHERE clause over the records table.
+
+    Args:
+        start_date (date, optional): First date to include.
+        end_date (date, optional): Last date to include.
+        sources (list, optional): Source names to include.
+        sentiments (list, optional): Sentiment labels to include. No clause if all three are selected.
+        keyword (str, optional): Keyword query (see utils.inverted_index.parse_keyword_query). Each
+                                 word or phrase is a case-insensitive substring match; 'prefix*'
+                                 words are matched as substrings here too.
+        entities (list, optional): Entity ids; records mentioning any of them match.
+
+    Returns:
+        tuple: (sql, params) where sql starts with 'WHERE' (or is empty) and params are its bind values.
+    """
+    clauses = []
+    params = []
+    if start_date:
+        clauses.append("r.date >= ?")
+        params.append(start_date.isoformat())
+    if end_date:
+        clauses.append("r.date <= ?")
+        params.append(end_date.isoformat())
+    if sources is not None:
+        clauses.append(f"r.source IN ({','.join('?' * len(sources))})" if sources else "0")
+        params.extend(sources)
+    if sentiments and set(sentiments) != ALL_SENTIMENTS:
+        clauses.append(f"r.sentiment IN ({','.join('?' * len(sentiments))})")
+        params.extend(sentiments)
+    keyword_groups = parse_keyword_query(keyword) if keyword else []
+    if keyword_groups:
+        group_clauses = []
+        for group in keyword_groups:
+            term_clauses = []
+            for term, _ in group:
+                if len(term) >= MIN_FTS_KEYWORD_LENGTH:
+                    term_clauses.append("r.id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)")
+                    params.append('"' + term.replace('"', '""') + '"')
+                else:
+                    term_clauses.append("r.text LIKE ? ESCAPE '\\'")
+                    params.append('%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+            group_clauses.append("(" + " AND ".join(term_clauses) + ")")
+        clauses.append("(" + " OR ".join(group_clauses) + ")")
+    if entities:
+        clauses.append(f"EXISTS (SELECT 1 FROM record_entities e WHERE e.record_id = r.id "
+                       f"AND e.entity_id IN ({','.join('?' * len(entities))}))")
+        params.extend(entities)
+    return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def query_frame(db_path=DEFAULT_SQL_STORE_PATH, limit=None, offset=0, order_by="r.date, r.id", **filters):
+    """
+    Returns the records matching the filters (see build_where_clause) as a DataFrame.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        limit (int, optional): Maximum number of rows.
+        offset (int): Rows to skip (with limit, for paging).
+        order_by (str): SQL ORDER BY expression over the 'r' alias.
+        **filters: Passed to build_where_clause.
+
+    Returns:
+        pandas.DataFrame: Columns source, date (datetime.date), title, text, sentiment, score, entities (list).
+    """
+    where_sql, params = build_where_clause(**filters)
+    sql = f"SELECT r.source, r.date, r.title, r.text, r.sentiment, r.score, r.entities FROM records r {where_sql} ORDER BY {order_by}"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params = params + [int(limit), int(offset)]
+    connection = connect(db_path)
+    try:
+        frame = pd.read_sql_query(sql, connection, params=params)
+    finally:
+        connection.close()
+    frame['date'] = pd.to_datetime(frame['date']).dt.date
+    frame['entities'] = frame['entities'].map(lambda value: json.loads(value) if value else [])
+    return frame
+
+def iter_query_chunks(db_path=DEFAULT_SQL_STORE_PATH, chunk_size=50000, **filters):
+    """
+    Yields the records matching the filters in date order, chunk_size rows at a time, from one
+    cursor, so exports of any size never hold more than one chunk.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        chunk_size (int): Rows per chunk.
+        **filters: Passed to build_where_clause.
+
+    Yields:
+        pandas.DataFrame: A chunk (see query_frame for the columns).
+    """
+    where_sql, params = build_where_clause(**filters)
+    sql = f"SELECT r.source, r.date, r.title, r.text, r.sentiment, r.score, r.entities FROM records r {where_sql} ORDER BY r.date, r.id"
+    connection = connect(db_path)
+    try:
+        for frame in pd.read_sql_query(sql, connection, params=params, chunksize=chunk_size):
+            frame['date'] = pd.to_datetime(frame['date']).dt.date
+            frame['entities'] = frame['entities'].map(lambda value: json.loads(value) if value else [])
+            yield frame
+    finally:
+        connection.close()
+
+def query_page(db_path=DEFAULT_SQL_STORE_PATH, sort_by='date', descending=False, offset=0, limit=50, **filters):
+    """
+    Returns one page of the records matching the filters, ordered by a column.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        sort_by (str): One of SORTABLE_COLUMNS.
+        descending (bool): Sort in descending order.
+        offset (int): Rows to skip.
+        limit (int): Page size.
+        **filters: Passed to build_where_clause.
+
+    Returns:
+        pandas.DataFrame: The page (see query_frame for the columns).
+
+    Raises:
+        ValueError: If sort_by is not one of SORTABLE_COLUMNS.
+    """
+    if sort_by not in SORTABLE_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort_by}'. Choose one of {SORTABLE_COLUMNS}.")
+    direction = 'DESC' if descending else 'ASC'
+    # The id tie-breaker keeps pages stable when many rows share a value
+    return query_frame(db_path, limit=limit, offset=offset, order_by=f"r.{sort_by} {direction}, r.id {direction}", **filters)
+
+def query_records(db_path=DEFAULT_SQL_STORE_PATH, **filters):
+    """
+    Returns the records matching the filters as a list of dictionaries.
+    """
+    return query_frame(db_path, **filters).to_dict('records')
+
+def count_by_sentiment(db_path=DEFAULT_SQL_STORE_PATH, **filters):
+    """
+    Counts matching records per sentiment with one indexed aggregate query.
+
+    Returns:
+        dict: Sentiment label -> count.
+    """
+    where_sql, params = build_where_clause(**filters)
+    connection = connect(db_path)
+    try:
+        rows = connection.execute(f"SELECT r.sentiment, COUNT(*) FROM records r {where_sql} GROUP BY r.sentiment", params).fetchall()
+    finally:
+        connection.close()
+    return {sentiment: count for sentiment, count in rows}
+
+def count_by_entity(db_path=DEFAULT_SQL_STORE_PATH, **filters):
+    """
+    Counts entity mentions of the matching records per entity and sentiment with one aggregate query.
+
+    Returns:
+        pandas.DataFrame: Columns entity_id, sentiment, count.
+    """
+    where_sql, params = build_where_clause(**filters)
+    connection = connect(db_path)
+    try:
+        return pd.read_sql_query(
+            f"SELECT m.entity_id, r.sentiment, COUNT(*) AS count FROM records r "
+            f"JOIN record_entities m ON m.record_id = r.id {where_sql} GROUP BY 1, 2",
+            connection, params=params
+        )
+    finally:
+        connection.close()
+
+def aggregate_records(db_path=DEFAULT_SQL_STORE_PATH, **filters):
+    """
+    Groups the raw records matching the filters into the cells of the rollup cube (date, source,
+    sentiment, score bin) in SQL. Keyword and entity filters cannot be answered from the cube
+    itself; this gives the same shape without bringing the matching rows into Python.
+
+    Returns:
+        pandas.DataFrame: Columns date (datetime.date), source, sentiment, score_bin, count, score_sum.
+    """
+    where_sql, params = build_where_clause(**filters)
+    connection = connect(db_path)
+    try:
+        frame = pd.read_sql_query(
+            f"SELECT r.date, r.source, COALESCE(r.sentiment, 'unknown') AS sentiment, "
+            f"{_CUBE_BIN_SQL.format(score='r.score')} AS score_bin, COUNT(*) AS count, TOTAL(r.score) AS score_sum "
+            f"FROM records r {where_sql} GROUP BY 1, 2, 3, 4",
+            connection, params=params
+        )
+    finally:
+        connection.close()
+    frame['date'] = pd.to_datetime(frame['date']).dt.date
+    return frame
+
+def _bump_version(connection):
+    connection.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('version', ?)", (str(time.time_ns()),))
+
+def query_rollups(db_path=DEFAULT_SQL_STORE_PATH, start_date=None, end_date=None, sources=None, sentiments=None):
+    """
+    Reads the cells of the rollup cube (every stored record, including days whose raw rows were
+    compacted away), filtered like the raw records. Cost depends on the number of cells, not records.
+
+    Returns:
+        pandas.DataFrame: Columns date (datetime.date), source, sentiment, score_bin, count, score_sum.
+    """
+    where_sql, params = build_where_clause(start_date=start_date, end_date=end_date, sources=sources, sentiments=sentiments)
+    connection = connect(db_path)
+    try:
+        frame = pd.read_sql_query(
+            f"SELECT r.date, r.source, r.sentiment, r.score_bin, r.count, r.score_sum FROM record_rollups r {where_sql}",
+            connection, params=params
+        )
+    finally:
+        connection.close()
+    frame['date'] = pd.to_datetime(frame['date']).dt.date
+    return frame
+
+def compact_store(db_path=DEFAULT_SQL_STORE_PATH, retention_days=90):
+    """
+    Applies retention to the store: raw records older than retention_days are deleted. Their counts
+    and score histograms are already in the rollup cube (record_rollups), which keeps them.
+
+    Afterwards the full-text index segments are merged and, if rows were dropped, the file is
+    vacuumed to return the space.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        retention_days (int): Days of raw records to keep.
+
+    Returns:
+        dict: 'rolled_up' (raw records deleted; still counted in the cube) and 'rollup_rows'.
+    """
+    if not os.path.exists(db_path):
+        return {'rolled_up': 0, 'rollup_rows': 0}
+    cutoff = (date.today() - timedelta(days=retention_days)).isoformat()
+    connection = connect(db_path)
+    try:
+        with connection:
+            rolled_up = connection.execute("DELETE FROM records WHERE date < ?", (cutoff,)).rowcount
+            connection.execute("INSERT INTO records_fts (records_fts) VALUES ('optimize')")
+            if rolled_up:
+                _bump_version(connection)
+        if rolled_up:
+            connection.execute("VACUUM")
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        rollup_rows = connection.execute("SELECT COUNT(*) FROM record_rollups").fetchone()[0]
+    finally:
+        connection.close()
+    stats = {'rolled_up': rolled_up, 'rollup_rows': rollup_rows}
+    logging.info(f"Compacted {db_path}: {stats}")
+    return stats
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    from datetime import timedelta
+    sample_records = [
+        {'source': 'RSS', 'title': 'Sample', 'text': 'Great news about the new road today!', 'date': date.today(),
+         'sentiment': 'Positive', 'score': 0.95, 'entities': ['umo_eno']},
+        {'source': 'Twitter', 'title': 'Tweet', 'text': 'Roads are bad.', 'date': date.today() - timedelta(days=1),
+         'sentiment': 'Negative', 'score': 0.8, 'entities': []},
+    ]
+    inserted = append_records(sample_records, db_path='test_records.sqlite3')
+    print(f"Inserted {inserted} records.")
+    print(count_by_sentiment('test_records.sqlite3', keyword='road'))
+    print(query_frame('test_records.sqlite3', entities=['umo_eno']))
+    print(aggregate_records('test_records.sqlite3', keyword='road'))
+    print(count_by_entity('test_records.sqlite3'))
+    print(compact_store('test_records.sqlite3', retention_days=0))
+    print(query_rollups('test_records.sqlite3'))
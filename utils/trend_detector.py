@@ -0,0 +1,314 @@
+# utils/trend_detector.py
+import os
+import json
+import math
+import logging
+from collections import OrderedDict, deque
+from datetime import date, datetime
+
+from utils.record_store import record_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+WINDOW_DAYS = 7 # Days in the rolling net-sentiment window; records older than this are too late to count
+EWMA_ALPHA = 0.3 # Weight of the newest day in the exponentially weighted averages
+BASELINE_ALPHA = 0.1 # Slower weight for the spike baselines, so a surge does not quickly become normal
+SEASON_LENGTH = 7 # Days per seasonal cycle: each weekday keeps its own baseline
+MIN_SEASON_DAYS = 3 # Observations of a weekday needed before its baseline replaces the all-days one
+MIN_BASELINE_DAYS = 7 # Closed days needed before spikes are flagged at all (one full season)
+SPIKE_Z_THRESHOLD = 3.5 # Standard deviations above the baseline that count as a spike
+MIN_SPIKE_COUNT = 5 # Negative records needed in a day before it can be a spike
+MAX_ALERTS = 50 # Most recent alerts kept
+MAX_RECENT_KEYS = 10000 # Record keys remembered so re-fetched records are not counted twice
+SENTIMENT_SLOTS = {'Positive': 0, 'Neutral': 1, 'Negative': 2}
+
+def trends_path(store_path):
+    """
+    Returns the path of the trend state kept next to a record store (file or directory).
+    """
+    return f"{store_path.rstrip(os.sep)}.trends.json"
+
+def _day_ordinal(value):
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if hasattr(value, 'to_pydatetime'): # pandas.Timestamp
+        return value.to_pydatetime().date().toordinal()
+    return None
+
+class _EwStats:
+    """Exponentially weighted mean and variance of a daily value (O(1) update, two floats)."""
+
+    def __init__(self, mean=0.0, var=0.0, n=0):
+        self.mean, self.var, self.n = mean, var, n
+
+    def update(self, value, alpha=EWMA_ALPHA):
+        if self.n == 0:
+            self.mean, self.var = float(value), 0.0
+        else:
+            delta = value - self.mean
+            self.mean += alpha * delta
+            self.var = (1 - alpha) * (self.var + alpha * delta * delta)
+        self.n += 1
+
+    def z_score(self, value):
+        # Counts are at least Poisson-noisy, so the spread never drops below sqrt(mean)
+        spread = math.sqrt(max(self.var, self.mean, 1.0))
+        return (value - self.mean) / spread
+
+class _Series:
+    """
+    Rolling state of one series (all records, one source or one entity): a ring of the last
+    WINDOW_DAYS daily counts with running sums, EWMAs, and negative-count baselines per weekday.
+    Days in the ring are open; a day is closed into the EWMAs and baselines once the newest day
+    has moved WINDOW_DAYS past it, so records arriving out of order within the window still count.
+    """
+
+    def __init__(self):
+        self.day = None # Ordinal of the newest day seen
+        self.closed_through = None # Ordinal of the newest day folded into the baselines
+        self.ring = [[None, 0, 0, 0] for _ in range(WINDOW_DAYS)] # [day, positive, neutral, negative]
+        self.sums = [0, 0, 0]
+        self.daily_rate = _EwStats()
+        self.negative_share = _EwStats()
+        self.baseline = _EwStats()
+        self.seasonal = [_EwStats() for _ in range(SEASON_LENGTH)]
+        self.last_alert_day = None
+
+    def _slot(self, day):
+        slot = self.ring[day % WINDOW_DAYS]
+        if slot[0] != day:
+            for i in range(3):
+                self.sums[i] -= slot[i + 1]
+            slot[:] = [day, 0, 0, 0]
+        return slot
+
+    def _close_day(self, day):
+        slot = self.ring[day % WINDOW_DAYS]
+        counts = slot[1:] if slot[0] == day else [0, 0, 0]
+        total = sum(counts)
+        self.daily_rate.update(total)
+        if total:
+            self.negative_share.update(counts[2] / total)
+        self.baseline.update(counts[2], BASELINE_ALPHA)
+        self.seasonal[day % SEASON_LENGTH].update(counts[2], BASELINE_ALPHA)
+
+    def _advance(self, day):
+        # Close the days leaving the window (including empty ones). Only the old window can hold
+        # counts; of an empty gap after it only the last WINDOW_DAYS are replayed, so the cost per
+        # record stays bounded
+        first_open = day - WINDOW_DAYS + 1
+        for closed in range(self.closed_through + 1, min(first_open, self.day + 1)):
+            self._close_day(closed)
+        for closed in range(max(self.day + 1, first_open - WINDOW_DAYS), first_open):
+            self._close_day(closed)
+        self.closed_through = max(self.closed_through, first_open - 1)
+        self.day = day
+
+    def add(self, day, slot_index):
+        """Counts one record; returns False if it is older than the window."""
+        if self.day is None:
+            self.day, self.closed_through = day, day - 1
+        elif day > self.day:
+            self._advance(day)
+        elif day <= self.day - WINDOW_DAYS:
+            return False
+        if day <= self.closed_through and self.daily_rate.n == 0:
+            # Before any day has closed, an older record in the window opens its day
+            self.closed_through = day - 1
+        slot = self._slot(day)
+        slot[slot_index + 1] += 1
+        self.sums[slot_index] += 1
+        return True
+
+    def expected_negative(self):
+        seasonal = self.seasonal[self.day % SEASON_LENGTH]
+        return seasonal if seasonal.n >= MIN_SEASON_DAYS else self.baseline
+
+    def today(self):
+        slot = self.ring[self.day % WINDOW_DAYS]
+        return slot[1:] if slot[0] == self.day else [0, 0, 0]
+
+    def to_dict(self):
+        stats = lambda s: [s.mean, s.var, s.n]
+        return {'day': self.day, 'closed_through': self.closed_through, 'ring': self.ring, 'sums': self.sums,
+                'daily_rate': stats(self.daily_rate),
+                'negative_share': stats(self.negative_share), 'baseline': stats(self.baseline),
+                'seasonal': [stats(s) for s in self.seasonal], 'last_alert_day': self.last_alert_day}
+
+    @classmethod
+    def from_dict(cls, state):
+        series = cls()
+        series.day, series.ring, series.sums = state['day'], state['ring'], state['sums']
+        # State saved before days were kept open had closed every day before the newest one
+        series.closed_through = state.get('closed_through', series.day - 1 if series.day is not None else None)
+        series.daily_rate = _EwStats(*state['daily_rate'])
+        series.negative_share = _EwStats(*state['negative_share'])
+        series.baseline = _EwStats(*state['baseline'])
+        series.seasonal = [_EwStats(*s) for s in state['seasonal']]
+        series.last_alert_day = state['last_alert_day']
+        return series
+
+class TrendDetector:
+    """
+    Streaming sentiment trends and negative-spike alerts over scored records.
+
+    Each record updates a fixed set of series ('all', 'source:<name>' and 'entity:<id>') in O(1):
+    daily counts in a WINDOW_DAYS ring give the rolling net-sentiment index, EWMAs give per-day
+    rates and the negative share, and per-weekday baselines of the negative count give the
+    expected value a day is compared with. Memory depends on the number of series, not records.
+    """
+
+    def __init__(self):
+        self.series = {}
+        self.alerts = deque(maxlen=MAX_ALERTS)
+        self.recent_keys = OrderedDict()
+        self.records_seen = 0
+        self.late_records = 0
+
+    def _seen(self, record):
+        key = record_key(record)
+        if key in self.recent_keys:
+            return True
+        self.recent_keys[key] = None
+        if len(self.recent_keys) > MAX_RECENT_KEYS:
+            self.recent_keys.popitem(last=False)
+        return False
+
+    def update(self, records):
+        """
+        Feeds newly scored records (with 'source', 'date', 'sentiment' and optionally 'entities').
+        A batch may be in any order: it is counted oldest day first.
+
+        Returns:
+            list: Alerts raised by these records (see check).
+        """
+        touched = set()
+        dated = [(_day_ordinal(record.get('date')), record) for record in records]
+        dated = sorted((item for item in dated if item[0] is not None), key=lambda item: item[0])
+        for day, record in dated:
+            slot_index = SENTIMENT_SLOTS.get(record.get('sentiment'))
+            if slot_index is None or self._seen(record):
+                continue
+            self.records_seen += 1
+            names = ['all', f"source:{record.get('source')}"] + [f"entity:{entity_id}" for entity_id in record.get('entities') or []]
+            for name in names:
+                series = self.series.get(name)
+                if series is None:
+                    series = self.series[name] = _Series()
+                if series.add(day, slot_index):
+                    touched.add(name)
+                elif name == 'all':
+                    self.late_records += 1
+        return [alert for alert in (self.check(name) for name in touched) if alert]
+
+    def check(self, name):
+        """
+        Flags the newest day of a series if its negative count is a spike against the baseline
+        for that weekday. Each series raises at most one alert per day.
+
+        Returns:
+            dict or None: The alert ('series', 'date', 'negative', 'expected', 'z', 'net_index').
+        """
+        series = self.series[name]
+        expected = series.expected_negative()
+        negative = series.today()[2]
+        if series.baseline.n < MIN_BASELINE_DAYS or negative < MIN_SPIKE_COUNT or series.last_alert_day == series.day:
+            return None
+        z = expected.z_score(negative)
+        if z < SPIKE_Z_THRESHOLD:
+            return None
+        series.last_alert_day = series.day
+        alert = {'series': name, 'date': date.fromordinal(series.day).isoformat(), 'negative': negative,
+                 'expected': round(expected.mean, 1), 'z': round(z, 1), 'net_index': self._net_index(series)}
+        self.alerts.append(alert)
+        logging.warning(f"Negative sentiment spike in '{name}' on {alert['date']}: {negative} negative "
+                        f"vs {alert['expected']} expected (z={alert['z']}).")
+        return alert
+
+    @staticmethod
+    def _net_index(series):
+        total = sum(series.sums)
+        return round((series.sums[0] - series.sums[2]) / total, 3) if total else None
+
+    def snapshot(self):
+        """
+        Returns the current metrics of every series, most active first.
+
+        Returns:
+            list: Dicts with 'series', 'date', 'negative_today', 'expected_negative', 'z',
+                  'net_index_window', 'records_window', 'daily_rate_ewma' and 'negative_share_ewma'.
+        """
+        rows = []
+        for name, series in self.series.items():
+            expected = series.expected_negative()
+            negative = series.today()[2]
+            rows.append({
+                'series': name,
+                'date': date.fromordinal(series.day).isoformat(),
+                'negative_today': negative,
+                'expected_negative': round(expected.mean, 1) if expected.n else None,
+                'z': round(expected.z_score(negative), 1) if series.baseline.n >= MIN_BASELINE_DAYS else None,
+                'net_index_window': self._net_index(series),
+                'records_window': sum(series.sums),
+                'daily_rate_ewma': round(series.daily_rate.mean, 1) if series.daily_rate.n else None,
+                'negative_share_ewma': round(series.negative_share.mean, 3) if series.negative_share.n else None,
+            })
+        return sorted(rows, key=lambda row: (row['series'] != 'all', -row['records_window']))
+
+    def to_dict(self):
+        return {'series': {name: series.to_dict() for name, series in self.series.items()},
+                'alerts': list(self.alerts), 'recent_keys': list(self.recent_keys),
+                'records_seen': self.records_seen, 'late_records': self.late_records}
+
+    @classmethod
+    def from_dict(cls, state):
+        detector = cls()
+        detector.series = {name: _Series.from_dict(series) for name, series in state.get('series', {}).items()}
+        detector.alerts.extend(state.get('alerts', []))
+        detector.recent_keys = OrderedDict.fromkeys(state.get('recent_keys', [])[-MAX_RECENT_KEYS:])
+        detector.records_seen = state.get('records_seen', 0)
+        detector.late_records = state.get('late_records', 0)
+        return detector
+
+def load_detector(path):
+    """
+    Loads a TrendDetector saved with save_detector, or returns a new one if the file is missing or unreadable.
+    """
+    if not os.path.exists(path):
+        return TrendDetector()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return TrendDetector.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logging.warning(f"Could not read trend state '{path}', starting fresh: {e}")
+        return TrendDetector()
+
+def save_detector(detector, path):
+    """
+    Writes a TrendDetector's state as JSON, atomically.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(detector.to_dict(), f)
+    os.replace(f"{path}.tmp", path)
+
+# Example usage (for testing)
+if __name__ == "__main__":
+    import random
+    from datetime import timedelta
+    random.seed(3)
+    detector = TrendDetector()
+    start = date.today() - timedelta(days=30)
+    for offset in range(31):
+        negative_rate = 0.8 if offset == 30 else 0.2 # A surge on the last day
+        day_records = [{'source': random.choice(['RSS', 'Twitter']), 'date': start + timedelta(days=offset),
+                        'text': f"day {offset} item {i}", 'entities': ['umo_eno'] if i % 2 else [],
+                        'sentiment': 'Negative' if random.random() < negative_rate else random.choice(['Positive', 'Neutral'])}
+                       for i in range(40)]
+        for alert in detector.update(day_records):
+            print(f"ALERT: {alert}")
+    for row in detector.snapshot():
+        print(row)
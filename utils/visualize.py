@@ -4,38 +4,86 @@ import pandas as pd
 import altair as alt
 import logging
 
+from utils.record_store import SCORE_BINS, score_bins
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def show_charts(data):
+# Charts only receive aggregated rows. Long ranges are bucketed into weeks or months so the time
+# chart keeps a bounded number of bars.
+DAILY_MAX_DAYS = 92 # Date spans up to this many days are charted per day
+WEEKLY_MAX_DAYS = 730 # Longer spans up to this are charted per week, beyond it per month
+TIME_GRANULARITIES = { # granularity -> (axis title, axis date format)
+    'day': ('Date', '%Y-%m-%d'),
+    'week': ('Week starting', '%Y-%m-%d'),
+    'month': ('Month', '%b %Y'),
+}
+
+def choose_time_granularity(first_date, last_date):
     """
-    Displays various charts in a Streamlit application based on sentiment analysis data.
+    Picks the time bucket for a date span: 'day', 'week' or 'month'.
+    """
+    span_days = (pd.Timestamp(last_date) - pd.Timestamp(first_date)).days
+    if span_days <= DAILY_MAX_DAYS:
+        return 'day'
+    return 'week' if span_days <= WEEKLY_MAX_DAYS else 'month'
+
+def bucket_dates(dates, granularity):
+    """
+    Maps datetime64 values to the start of their day, week (Monday) or month.
+    """
+    if granularity == 'day':
+        return dates.dt.normalize()
+    return dates.dt.to_period('W' if granularity == 'week' else 'M').dt.start_time
+
+def build_charts(data, rollups=None):
+    """
+    Aggregates sentiment analysis data and builds the dashboard's charts, without rendering them,
+    so the result can be cached and rendered on later reruns (see render_charts).
+
+    All aggregation happens here: each chart gets only counts per date bucket (see
+    choose_time_granularity), sentiment or score bin, never the raw rows.
 
     Args:
-        data (list): A list of dictionaries, where each dictionary is expected to have
-                     'date', 'sentiment', and optionally 'score' and 'source' keys.
+        data (list or pandas.DataFrame): A list of dictionaries (or a DataFrame of them), where each is
+                     expected to have 'date', 'sentiment', and optionally 'score' and 'source' keys.
                      Example: [{'date': date_obj, 'sentiment': 'Positive', 'score': 0.9, 'text': '...'}]
-    """
-    if not isinstance(data, list):
-        logging.error("Input 'data' must be a list. Received type: %s", type(data))
-        st.error("Error: Invalid data format for visualization. Please provide a list.")
-        return
+        rollups (pandas.DataFrame, optional): Rollup cube cells ('date', 'sentiment', 'score_bin', 'count'
+                     columns, as returned by the stores' rollup readers) counting records that are not in
+                     `data`. They are added into the time, breakdown and score charts, so charts can be
+                     drawn from the cells alone by passing an empty `data`.
 
-    # Convert list of dictionaries to DataFrame
-    df = pd.DataFrame(data)
+    Returns:
+        list: (subheader, Altair chart) sections in display order. Empty if there is no data to chart.
+
+    Raises:
+        ValueError: If the data is not a list/DataFrame, lacks required columns or has unparseable dates.
+    """
+    if not isinstance(data, (list, pd.DataFrame)):
+        logging.error("Input 'data' must be a list or DataFrame. Received type: %s", type(data))
+        raise ValueError("Invalid data format for visualization. Please provide a list.")
+
+    # Convert list of dictionaries to DataFrame (a DataFrame is copied, as columns are converted below;
+    # only the charted columns are kept)
+    if isinstance(data, pd.DataFrame):
+        df = data[[column for column in ('date', 'sentiment', 'score') if column in data.columns]].copy()
+    else:
+        df = pd.DataFrame(data, columns=None if data else ['date', 'sentiment', 'score'])
+    if rollups is not None and not rollups.empty:
+        rollups = rollups.assign(date=pd.to_datetime(rollups['date']), sentiment=rollups['sentiment'].astype(str))
+    else:
+        rollups = None
 
     # Basic data validation after DataFrame creation
-    if df.empty:
-        st.warning("No data available to display charts. Please ensure data is loaded.")
-        return
+    if df.empty and rollups is None:
+        return []
 
     # Ensure required columns exist
     required_columns = ['date', 'sentiment']
     if not all(col in df.columns for col in required_columns):
         missing_cols = [col for col in required_columns if col not in df.columns]
         logging.error("Missing required columns in DataFrame: %s. Available columns: %s", missing_cols, df.columns.tolist())
-        st.error(f"Error: Data is missing required columns for visualization ({', '.join(missing_cols)}).")
-        return
+        raise ValueError(f"Data is missing required columns for visualization ({', '.join(missing_cols)}).")
 
     # --- Data Preprocessing for Visualization ---
     # Ensure 'date' column is in datetime format for proper charting
@@ -45,44 +93,51 @@ def show_charts(data):
             df['date'] = pd.to_datetime(df['date'])
         except Exception as e:
             logging.error(f"Could not convert 'date' column to datetime: {e}")
-            st.error("Error: 'date' column could not be parsed. Please ensure dates are in a valid format.")
-            return
+            raise ValueError("'date' column could not be parsed. Please ensure dates are in a valid format.")
 
     # Ensure 'sentiment' is categorical for consistent plotting
     if 'sentiment' in df.columns:
         df['sentiment'] = df['sentiment'].astype('category')
 
-    # Add a title to the visualization section
-    st.title("Sentiment Analysis Dashboard")
+    sections = []
 
     # --- 1. Sentiment Over Time (Original Chart, improved) ---
-    st.subheader("Sentiment Distribution Over Time")
 
     # Aggregate sentiment counts by date
-    sentiment_count = df.groupby(['date', 'sentiment']).size().reset_index(name='count')
+    sentiment_count = df.groupby(['date', 'sentiment'], observed=True).size().reset_index(name='count')
+    sentiment_count['sentiment'] = sentiment_count['sentiment'].astype(str)
+    if rollups is not None:
+        # A record is counted either in `data` or in the rollups, never both
+        sentiment_count = (pd.concat([sentiment_count, rollups[['date', 'sentiment', 'count']]], ignore_index=True)
+                           .groupby(['date', 'sentiment'], as_index=False)['count'].sum())
+
+    # Bucket long ranges into weeks or months
+    granularity = choose_time_granularity(sentiment_count['date'].min(), sentiment_count['date'].max())
+    axis_title, axis_format = TIME_GRANULARITIES[granularity]
+    if granularity != 'day':
+        sentiment_count = (sentiment_count.assign(date=bucket_dates(sentiment_count['date'], granularity))
+                           .groupby(['date', 'sentiment'], as_index=False)['count'].sum())
 
     # Create the Altair chart
     # Use 'utcoffset=False' for date axis to prevent unexpected UTC conversions
     chart_sentiment_time = alt.Chart(sentiment_count).mark_bar().encode(
-        x=alt.X('date:T', title='Date', axis=alt.Axis(format='%Y-%m-%d')),
+        x=alt.X('date:T', title=axis_title, axis=alt.Axis(format=axis_format)),
         y=alt.Y('count:Q', title='Number of Items'),
         color=alt.Color('sentiment:N', title='Sentiment',
                         scale=alt.Scale(domain=['Positive', 'Negative', 'Neutral'],
                                         range=['#2ca02c', '#d62728', '#1f77b4'])), # Custom colors
-        tooltip=['date:T', 'sentiment:N', 'count:Q'] # Add tooltips for interactivity
+        tooltip=[alt.Tooltip('date:T', title=axis_title, format=axis_format), 'sentiment:N', 'count:Q'] # Add tooltips for interactivity
     ).properties(
-        title='Sentiment Distribution Over Time'
+        title=f'Sentiment Distribution Over Time (per {granularity})'
     ).interactive() # Enable zooming and panning
 
-    st.altair_chart(chart_sentiment_time, use_container_width=True)
+    sections.append(("Sentiment Distribution Over Time", chart_sentiment_time))
 
 
     # --- 2. Overall Sentiment Breakdown (Pie Chart/Donut Chart) ---
-    st.subheader("Overall Sentiment Breakdown")
 
     # Count overall sentiment occurrences
-    overall_sentiment_counts = df['sentiment'].value_counts().reset_index()
-    overall_sentiment_counts.columns = ['sentiment', 'count']
+    overall_sentiment_counts = sentiment_count.groupby('sentiment', as_index=False)['count'].sum()
 
     # Create a pie/donut chart
     chart_overall_sentiment = alt.Chart(overall_sentiment_counts).mark_arc(outerRadius=120).encode(
@@ -102,31 +157,67 @@ def show_charts(data):
         color=alt.value("black") # Set text color to black for better contrast
     )
 
-    st.altair_chart(chart_overall_sentiment + text_overall_sentiment, use_container_width=True)
-
-
-    # --- 3. Sentiment Score Distribution (if 'score' column exists) ---
-    if 'score' in df.columns:
-        st.subheader("Sentiment Score Distribution")
-        
-        # Create a histogram for sentiment scores
-        chart_score_distribution = alt.Chart(df).mark_bar().encode(
-            x=alt.X('score:Q', bin=alt.Bin(maxbins=20), title='Confidence Score'),
-            y=alt.Y('count()', title='Number of Items'),
+    sections.append(("Overall Sentiment Breakdown", chart_overall_sentiment + text_overall_sentiment))
+
+
+    # --- 3. Sentiment Score Distribution (if scores exist) ---
+    if rollups is not None or 'score' in df.columns:
+        # Scores are binned here, the same way as in the rollups, and only the bin counts are charted
+        score_frames = []
+        if rollups is not None:
+            score_frames.append(rollups.groupby(['score_bin', 'sentiment'], as_index=False)['count'].sum())
+        if 'score' in df.columns and not df.empty:
+            raw_scores = pd.to_numeric(df['score'], errors='coerce').fillna(0.0)
+            score_frames.append(pd.DataFrame({'score_bin': score_bins(raw_scores), 'sentiment': df['sentiment'].astype(str)})
+                                .groupby(['score_bin', 'sentiment'], as_index=False).size().rename(columns={'size': 'count'}))
+        score_counts = pd.concat(score_frames).groupby(['score_bin', 'sentiment'], as_index=False)['count'].sum()
+        score_counts['bin_start'] = score_counts['score_bin'] / SCORE_BINS
+        score_counts['bin_end'] = (score_counts['score_bin'] + 1) / SCORE_BINS
+
+        chart_score_distribution = alt.Chart(score_counts).mark_bar().encode(
+            x=alt.X('bin_start:Q', bin='binned', title='Confidence Score'),
+            x2='bin_end:Q',
+            y=alt.Y('count:Q', title='Number of Items'),
             color=alt.Color('sentiment:N', title='Sentiment',
                             scale=alt.Scale(domain=['Positive', 'Negative', 'Neutral'],
                                             range=['#2ca02c', '#d62728', '#1f77b4'])),
-            tooltip=['score:Q', 'count()']
+            tooltip=['bin_start:Q', 'sentiment:N', 'count:Q']
         ).properties(
             title="Distribution of Sentiment Confidence Scores"
         ).interactive()
 
-        st.altair_chart(chart_score_distribution, use_container_width=True)
+        sections.append(("Sentiment Score Distribution", chart_score_distribution))
+
+    return sections
 
-    # --- 4. Data Table (for inspection) ---
-    st.subheader("Raw Data Table")
-    # Display the DataFrame with a maximum height for scrollability
-    st.dataframe(df, height=300)
+def render_charts(sections):
+    """
+    Renders chart sections built by build_charts in a Streamlit application.
+    """
+    if not sections:
+        st.warning("No data available to display charts. Please ensure data is loaded.")
+        return
+
+    # Add a title to the visualization section
+    st.title("Sentiment Analysis Dashboard")
+    for subheader, chart in sections:
+        st.subheader(subheader)
+        st.altair_chart(chart, use_container_width=True)
+
+def show_charts(data, rollups=None):
+    """
+    Displays various charts in a Streamlit application based on sentiment analysis data.
+
+    Args:
+        data (list or pandas.DataFrame): Records to chart (see build_charts).
+        rollups (pandas.DataFrame, optional): Rollup cube cells (see build_charts).
+    """
+    try:
+        sections = build_charts(data, rollups=rollups)
+    except ValueError as e:
+        st.error(f"Error: {e}")
+        return
+    render_charts(sections)
 
 # Example Usage (for testing)
 if __name__ == "__main__":